@@ -0,0 +1,227 @@
+import hashlib
+import json
+import logging
+import time
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+
+import requests
+
+from rasa_model_report.backends.nlu_backend import NluBackend
+from rasa_model_report.backends.nlu_backend import NluBackendUnavailableError
+from rasa_model_report.helpers import constants
+from rasa_model_report.helpers import type_aliases
+from rasa_model_report.helpers import utils
+from rasa_model_report.helpers.adaptive_concurrency import AdaptiveConcurrency
+from rasa_model_report.helpers.endpoint_pool import EndpointPool
+
+
+class HttpNluBackend(NluBackend):
+    """
+    NLU backend that requests the sentences to the Rasa API.
+    """
+    name: str = "Rasa API"
+
+    def __init__(
+        self,
+        urls: List[str],
+        timeout: float = constants.RASA_API_TIMEOUT,
+        pool_size: int = constants.NLU_POOL_SIZE,
+        retries: int = constants.RASA_API_RETRIES,
+        concurrency: Optional[AdaptiveConcurrency] = None,
+        batch_url: Optional[str] = None,
+        batch_size: int = constants.NLU_BATCH_SIZE
+    ) -> None:
+        """
+        __init__ method.
+
+        :param urls: URLs of Rasa API replicas.
+        :param timeout: Timeout in seconds of each request.
+        :param pool_size: Number of HTTP connections kept alive.
+        :param retries: Number of retries of a failed request.
+        :param concurrency: Adaptive concurrency controller. If None, the requests aren't limited.
+        :param batch_url: URL of an endpoint that parses a list of sentences in a single request.
+        :param batch_size: Number of sentences sent in each request to the batch endpoint.
+        """
+        super().__init__(batch_size if batch_url else None)
+        self.urls: List[str] = list(dict.fromkeys(urls))
+        self.url: str = self.urls[0]
+        self.timeout: float = timeout
+        self.pool_size: int = pool_size
+        self.concurrency: Optional[AdaptiveConcurrency] = concurrency
+        self.batch_url: Optional[str] = batch_url
+        self.retries: int = retries
+        self.session: requests.Session = utils.create_session(
+            pool_size=pool_size,
+            retries=retries,
+            backoff_factor=(
+                constants.RASA_API_ADAPTIVE_BACKOFF_FACTOR if concurrency else constants.RASA_API_BACKOFF_FACTOR
+            )
+        )
+        self.endpoints: EndpointPool = EndpointPool(self.urls)
+        self._status: Optional[Dict[str, Any]] = None
+
+    def is_available(self) -> bool:
+        """
+        Check if Rasa API is available. Each Rasa API URL is checked and the unhealthy ones are
+        removed from the endpoints pool.
+
+        :return: True if is available or False.
+        """
+        self.endpoints = EndpointPool(self.urls)
+        self._status = None
+        for url in self.urls:
+            if not self._check_endpoint(url):
+                self.endpoints.eject(url)
+        healthy = self.endpoints.healthy
+        if healthy:
+            self.url = healthy[0]
+            if len(self.urls) > 1:
+                logging.info(f"{len(healthy)} of {len(self.urls)} Rasa API endpoints are healthy.")
+        return bool(healthy)
+
+    def _check_endpoint(self, url: str) -> bool:
+        """
+        Check if a Rasa API endpoint is available.
+
+        :param url: Rasa API URL.
+        :return: True if is available or False.
+        """
+        response = utils.request(url, session=self.session, timeout=self.timeout)
+        return isinstance(response, requests.Response) and response.status_code == 200
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Get the status of the Rasa API from the /status endpoint. The status is requested once and
+        reused until the Rasa API availability is checked again.
+
+        :return: Rasa API status or an empty dict if it couldn't be read.
+        """
+        if self._status is None:
+            response = utils.request(f"{self.url}/status", session=self.session, timeout=self.timeout)
+            try:
+                status = response.json() if response is not None and response.status_code == 200 else {}
+            except ValueError:
+                status = {}
+            self._status = status if isinstance(status, dict) else {}
+        return self._status
+
+    def get_model_fingerprint(self) -> Optional[str]:
+        """
+        Get the fingerprint of the model loaded in the Rasa API from the /status endpoint.
+
+        :return: Model fingerprint hash or None if the Rasa API didn't inform it.
+        """
+        status = self.get_status()
+        fingerprint = status.get("fingerprint") or status.get("model_id") or status.get("model_file")
+        if not fingerprint:
+            return None
+        return hashlib.sha1(json.dumps(fingerprint, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def get_model_file(self) -> Optional[str]:
+        """
+        Get the file name of the model loaded in the Rasa API from the /status endpoint.
+
+        :return: Model file name or None if the Rasa API didn't inform it.
+        """
+        return self.get_status().get("model_file")
+
+    def parse(self, text: str) -> type_aliases.nlu_payload:
+        """
+        Request the NLU payload of a sentence to the Rasa API /model/parse endpoint.
+
+        The request is sent to the Rasa API endpoint with fewer outstanding requests. If it fails
+        and the endpoint is unhealthy, the endpoint is removed from the pool and another one is
+        tried. In adaptive mode, the request waits until the adaptive concurrency limit allows it.
+
+        :param text: Sentence.
+        :return: NLU payload or an empty dict if the request failed.
+        :raises NluBackendUnavailableError: If all endpoints were removed from the pool.
+        """
+        data = None
+        while data is None:
+            if self.concurrency:
+                self.concurrency.acquire()
+            url = self.endpoints.acquire()
+            if url is None:
+                if self.concurrency:
+                    self.concurrency.cancel()
+                raise NluBackendUnavailableError("All Rasa API endpoints were ejected from the pool as unhealthy.")
+            try:
+                response = self._post(f"{url}/model/parse", {"text": text}, text)
+            finally:
+                self.endpoints.release(url)
+            if response is not None and response.status_code == 200:
+                try:
+                    data = response.json()
+                except ValueError:
+                    data = None
+                if not isinstance(data, dict):
+                    logging.warning(f"Rasa API {url} returned an invalid NLU payload for the sentence: {text}")
+                    data = {}
+            elif self._check_endpoint(url):
+                data = {}
+            else:
+                self.endpoints.eject(url)
+        return data
+
+    def parse_batch(self, texts: List[str]) -> List[type_aliases.nlu_payload]:
+        """
+        Request the NLU payloads of several sentences to the batch endpoint.
+
+        The endpoint receives a JSON object with the "texts" list and returns the list of parse
+        results, in the same order, or a JSON object with it in the "results" key. If the batch
+        endpoint isn't configured or the request fails, the sentences are requested one by one.
+
+        :param texts: Sentences.
+        :return: NLU payloads, in the same order of the sentences.
+        """
+        if not self.batch_url:
+            return super().parse_batch(texts)
+        if self.concurrency:
+            self.concurrency.acquire()
+        response = self._post(self.batch_url, {"texts": texts}, f"[batch of {len(texts)}] {texts[0]}")
+        results = None
+        if response is not None and response.status_code == 200:
+            try:
+                results = response.json()
+            except ValueError:
+                results = None
+            if isinstance(results, dict):
+                results = results.get("results")
+        if not isinstance(results, list) or len(results) != len(texts):
+            logging.warning(
+                f"Batch endpoint {self.batch_url} failed. {len(texts)} sentence(s) will be requested one by one."
+            )
+            return super().parse_batch(texts)
+        return results
+
+    def _post(self, url: str, data: dict, label: str) -> Optional[requests.Response]:
+        """
+        Send a request to the Rasa API and record its latency. In adaptive mode, the adaptive
+        concurrency limit must be acquired before and it's released here.
+
+        :param url: Request URL.
+        :param data: JSON body.
+        :param label: Sentence recorded in the latency histogram.
+        :return: Response object or None if the request failed.
+        """
+        response = None
+        start = time.perf_counter()
+        try:
+            response = utils.request(
+                method="POST",
+                url=url,
+                json=data,
+                session=self.session,
+                timeout=self.timeout
+            )
+        finally:
+            end = time.perf_counter()
+            error = response is None or response.status_code >= 500
+            self.latency.record(start, end, label, error=error)
+            if self.concurrency:
+                self.concurrency.release(end - start, error=error, retries=utils.count_retries(response, self.retries))
+        return response
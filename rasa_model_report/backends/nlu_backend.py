@@ -0,0 +1,73 @@
+from typing import List
+from typing import Optional
+
+from rasa_model_report.helpers import type_aliases
+from rasa_model_report.helpers.latency_histogram import LatencyHistogram
+
+
+class NluBackendUnavailableError(Exception):
+    """
+    Raised when the NLU backend can't parse sentences anymore, e.g. when all Rasa API endpoints were
+    removed from the pool as unhealthy.
+    """
+
+
+class NluBackend:
+    """
+    NLU backend base class. A backend parses the NLU sentences for NluController.
+    """
+    name: str = "NLU backend"
+
+    def __init__(self, batch_size: Optional[int] = None) -> None:
+        """
+        __init__ method.
+
+        :param batch_size: Number of sentences parsed by each parse_batch call. If None, the
+            sentences are parsed one by one.
+        """
+        self.batch_size: Optional[int] = batch_size
+        self.latency: LatencyHistogram = LatencyHistogram()
+
+    def is_available(self) -> bool:
+        """
+        Check if the backend can parse sentences.
+
+        :return: True if is available or False.
+        """
+        raise NotImplementedError
+
+    def get_model_fingerprint(self) -> Optional[str]:
+        """
+        Get the fingerprint of the model used by the backend.
+
+        :return: Model fingerprint hash or None if it's unknown.
+        """
+        return None
+
+    def get_model_file(self) -> Optional[str]:
+        """
+        Get the file name of the model used by the backend.
+
+        :return: Model file name or None if it's unknown.
+        """
+        return None
+
+    def parse(self, text: str) -> type_aliases.nlu_payload:
+        """
+        Parse a sentence.
+
+        :param text: Sentence.
+        :return: NLU payload, in the format of the Rasa API /model/parse endpoint.
+        :raises NluBackendUnavailableError: If the backend can't parse sentences anymore.
+        """
+        raise NotImplementedError
+
+    def parse_batch(self, texts: List[str]) -> List[Optional[type_aliases.nlu_payload]]:
+        """
+        Parse several sentences.
+
+        :param texts: Sentences.
+        :return: NLU payloads, in the same order of the sentences. A backend may return None for the
+            sentences that couldn't be parsed.
+        """
+        return [self.parse(text) for text in texts]
@@ -0,0 +1,146 @@
+import asyncio
+import glob
+import hashlib
+import importlib.util
+import logging
+import os.path
+import threading
+import time
+from typing import Any
+from typing import Callable
+from typing import List
+from typing import Optional
+
+from rasa_model_report.backends.nlu_backend import NluBackend
+from rasa_model_report.helpers import constants
+from rasa_model_report.helpers import type_aliases
+
+
+class RasaNluBackend(NluBackend):
+    """
+    NLU backend that loads a Rasa model archive in-process and parses the sentences directly,
+    without a Rasa API. Rasa must be installed in the same environment.
+    """
+    name: str = "Rasa model"
+
+    def __init__(self, model_path: str, batch_size: int = constants.NLU_BATCH_SIZE) -> None:
+        """
+        __init__ method.
+
+        :param model_path: Rasa model archive or directory of model archives, where the latest is used.
+        :param batch_size: Number of sentences parsed at once.
+        """
+        super().__init__(batch_size)
+        self.model_path: str = model_path
+        self.agent: Any = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock: threading.Lock = threading.Lock()
+
+    @property
+    def model_file(self) -> Optional[str]:
+        """
+        Get the model archive. When the model path is a directory, its latest archive is used.
+
+        :return: Model archive path or None if there is no archive.
+        """
+        if os.path.isdir(self.model_path):
+            files = glob.glob(os.path.join(self.model_path, "*.tar.gz"))
+            return max(files, key=os.path.getmtime) if files else None
+        return self.model_path if os.path.isfile(self.model_path) else None
+
+    def is_available(self) -> bool:
+        """
+        Load the Rasa model, if Rasa is installed and the model archive exists.
+
+        :return: True if the model was loaded or False.
+        """
+        if self.agent is not None:
+            return True
+        if importlib.util.find_spec("rasa") is None:
+            logging.warning("Rasa isn't installed in this environment. The model can't be loaded in-process.")
+            return False
+        model_file = self.model_file
+        if not model_file:
+            logging.warning(f"No Rasa model archive was found in {self.model_path}.")
+            return False
+        logging.info(f"Loading Rasa model {model_file}.")
+        try:
+            from rasa.core.agent import Agent
+            self.agent = Agent.load(model_file)
+        except Exception as error:
+            logging.error(f"Could not load the Rasa model {model_file}. Error: {error}")
+            return False
+        self._loop = asyncio.new_event_loop()
+        return True
+
+    def get_model_fingerprint(self) -> Optional[str]:
+        """
+        Get the fingerprint of the model archive, hashing its content.
+
+        :return: Model fingerprint hash or None if there is no archive.
+        """
+        model_file = self.model_file
+        if not model_file:
+            return None
+        digest = hashlib.sha1()
+        file = open(model_file, "rb")
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(chunk)
+        file.close()
+        return digest.hexdigest()
+
+    def get_model_file(self) -> Optional[str]:
+        """
+        Get the file name of the model archive.
+
+        :return: Model file name or None if there is no archive.
+        """
+        model_file = self.model_file
+        return os.path.basename(model_file) if model_file else None
+
+    def parse(self, text: str) -> type_aliases.nlu_payload:
+        """
+        Parse a sentence with the loaded model.
+
+        :param text: Sentence.
+        :return: NLU payload or an empty dict if the model couldn't parse it.
+        """
+        return self.parse_batch([text])[0] or {}
+
+    def parse_batch(self, texts: List[str]) -> List[Optional[type_aliases.nlu_payload]]:
+        """
+        Parse several sentences with the loaded model. The model is used by a worker at a time. A
+        sentence that fails doesn't discard the payloads of the other sentences of the batch.
+
+        :param texts: Sentences.
+        :return: NLU payloads, in the same order of the sentences, or None for the sentences that
+            couldn't be parsed.
+        """
+        # Rasa 3 agents parse with parse_message, and Rasa 2 agents with parse_message_using_nlu_interpreter.
+        parse_message = getattr(self.agent, "parse_message", None) or self.agent.parse_message_using_nlu_interpreter
+        label = texts[0] if len(texts) == 1 else f"[batch of {len(texts)}] {texts[0]}"
+        with self._lock:
+            start = time.perf_counter()
+            try:
+                payloads = self._loop.run_until_complete(self._gather(parse_message, texts))
+            except Exception as error:
+                payloads = [error] * len(texts)
+            errors = [payload for payload in payloads if isinstance(payload, Exception)]
+            self.latency.record(start, time.perf_counter(), label, error=bool(errors))
+        if errors:
+            logging.error(
+                f"Rasa model could not parse {len(errors)} of {len(texts)} sentence(s). Error: {errors[0]}"
+            )
+        return [None if isinstance(payload, Exception) else payload or {} for payload in payloads]
+
+    @staticmethod
+    async def _gather(parse_message: Callable, texts: List[str]) -> List[Any]:
+        """
+        Parse the sentences concurrently in the backend event loop.
+
+        :param parse_message: Parse coroutine function of the Rasa agent.
+        :param texts: Sentences.
+        :return: NLU payloads, in the same order of the sentences, or the exception raised by each
+            sentence that failed.
+        """
+        return await asyncio.gather(*[parse_message(text) for text in texts], return_exceptions=True)
@@ -10,6 +10,7 @@ from typing import Union
 from rasa_model_report.controllers.controller import Controller
 from rasa_model_report.controllers.json_controller import JsonController
 from rasa_model_report.helpers import utils
+from rasa_model_report.helpers.project_index import ProjectIndex
 
 
 class E2ECoverageController(Controller):
@@ -52,6 +53,7 @@ class E2ECoverageController(Controller):
         self._rate_items: Dict[str, Union[float, List[str]]] = {}
         self._total_rate: float = 0
         self._excluded_items = exclude
+        self.project_index: ProjectIndex = kwargs.get("project_index") or ProjectIndex(self.rasa_path)
         self.json: JsonController = JsonController(
             rasa_path, output_path, project_name, project_version
         )
@@ -64,28 +66,11 @@ class E2ECoverageController(Controller):
         """
         Load domain file data.
         """
-        files = []
-        paths = [
-            f"{self.nlu_path}/**/*.yml",
-            f"{self.nlu_path}/*.yml",
-            f"{self.rasa_path}/*.yml",
-        ]
-        for path in paths:
-            files.extend(glob.glob(path))
-        for file in files:
-            file_data = utils.load_yaml_file(file)
-            if file_data:
-                for element in ["intents", "entities", "responses", "actions"]:
-                    data = []
-                    for item in file_data.get(element, []):
-                        if isinstance(item, str):
-                            data.append(item)
-                        else:
-                            data.append(list(item.keys())[0])
-                    if element == "responses":
-                        self._items["actions"] += data
-                    else:
-                        self._items[element] += data
+        for element, data in self.project_index.domain_elements.items():
+            if element == "responses":
+                self._items["actions"] += data
+            else:
+                self._items[element] += data
         self._items["actions"] = list(dict.fromkeys(self._items["actions"]))
         self._update_not_covered_actions()
 
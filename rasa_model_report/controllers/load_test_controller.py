@@ -0,0 +1,300 @@
+import json
+import logging
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+
+from rasa_model_report.controllers.nlu_controller import NluController
+from rasa_model_report.helpers import constants
+from rasa_model_report.helpers import utils
+from rasa_model_report.helpers.latency_histogram import LatencyHistogram
+
+
+class LoadTestController(NluController):
+    """
+    Controller responsible for load testing the Rasa API with the NLU sentences.
+
+    The sentences are replayed against the /model/parse endpoint by an open-loop scheduler: each
+    request is sent at its scheduled time, whether the previous ones were answered or not. The
+    latency is measured from the scheduled time, so the queueing delay of a saturated Rasa API
+    is accounted for. A request whose scheduled time comes when *max_in_flight* requests are
+    still waiting for the Rasa API is dropped and counted as an error, instead of being sent late.
+    """
+    def __init__(
+        self,
+        rasa_path: str,
+        output_path: str,
+        project_name: str,
+        project_version: str,
+        qps: float,
+        duration: float = constants.LOAD_TEST_DURATION,
+        ramp_to: Optional[float] = None,
+        **kwargs: Dict[str, Any]
+    ) -> None:
+        """
+        __init__ method.
+
+        :param rasa_path: Rasa project path.
+        :param output_path: Output directory of the load test report.
+        :param project_name: Project name.
+        :param project_version: Project version.
+        :param qps: Requests per second at the start of the load test.
+        :param duration: Load test duration in seconds.
+        :param ramp_to: Requests per second at the end of the load test. The rate grows linearly
+            from *qps*. If None, the rate is fixed.
+        """
+        self.qps: float = qps
+        self.duration: float = duration
+        self.ramp_to: float = ramp_to if ramp_to is not None else qps
+        self.max_in_flight: int = kwargs.get("max_in_flight") or constants.LOAD_TEST_MAX_IN_FLIGHT
+        self.window: float = kwargs.get("window") or constants.LOAD_TEST_WINDOW
+        self.latency_target: float = kwargs.get("nlu_latency_target") or constants.NLU_LATENCY_TARGET
+        self._windows: List[LatencyHistogram] = []
+        self._dropped: List[int] = []
+        self._in_flight: int = 0
+        self._lock: threading.Lock = threading.Lock()
+        self._result: Dict[str, Any] = {}
+        kwargs = dict(
+            kwargs, no_nlu_cache=True, rasa_api_retries=0, nlu_pool_size=self.max_in_flight, nlu_backend=None,
+            nlu_model=None, nlu_adaptive=False, nlu_batch_url=None
+        )
+        super().__init__(rasa_path, output_path, project_name, project_version, **kwargs)
+        self.output_report_path: str = utils.remove_duplicate_slashs(f"{self.output_path}/load_test_report.md")
+        self.result_path: str = f"{self.results_path}/load_test.json"
+
+    def _process(self) -> None:
+        """
+        Load the NLU sentences. They are only requested when the load test runs.
+        """
+        self._load_nlu()
+
+    @property
+    def result(self) -> Dict[str, Any]:
+        """
+        Return a copy of the load test result.
+
+        :return: Copy of load test result.
+        """
+        return self._result.copy()
+
+    def _scheduled_time(self, index: int) -> float:
+        """
+        Calculate when a request is sent, from the start of the load test. With a linear ramp,
+        the number of requests sent until the time t is qps * t + (ramp_to - qps) * t² / (2 * duration).
+
+        :param index: Request index.
+        :return: Scheduled time in seconds.
+        """
+        slope = (self.ramp_to - self.qps) / (2 * self.duration)
+        if not slope:
+            return index / self.qps
+        discriminant = self.qps ** 2 + 4 * slope * index
+        if discriminant < 0:
+            return math.inf
+        return (math.sqrt(discriminant) - self.qps) / (2 * slope)
+
+    def schedule(self) -> List[float]:
+        """
+        Build the load test schedule.
+
+        :return: Scheduled time of each request, from the start of the load test.
+        """
+        schedule = []
+        scheduled_time = self._scheduled_time(0)
+        while scheduled_time < self.duration:
+            schedule.append(scheduled_time)
+            scheduled_time = self._scheduled_time(len(schedule))
+        return schedule
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Run the load test.
+
+        :return: Load test result.
+        """
+        if not self.health_check_rasa_api():
+            logging.error("Load test can't be run without Rasa API.")
+            return {}
+        sentences = [text for _, text in self._list_sentences()]
+        if not sentences:
+            logging.error("No NLU sentences were found. Load test can't be run.")
+            return {}
+        schedule = self.schedule()
+        self.backend.latency = LatencyHistogram()
+        self._windows = [LatencyHistogram() for _ in range(max(1, math.ceil(self.duration / self.window)))]
+        self._dropped = [0] * len(self._windows)
+        self._in_flight = 0
+        logging.info(
+            f"Load testing Rasa API with {len(schedule)} request(s) in {self.duration}s, "
+            f"from {self.qps} to {self.ramp_to} request(s) per second."
+        )
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+            start = time.perf_counter()
+            for index, scheduled_time in enumerate(schedule):
+                delay = start + scheduled_time - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                window = min(int(scheduled_time / self.window), len(self._windows) - 1)
+                with self._lock:
+                    dropped = self._in_flight >= self.max_in_flight
+                    if not dropped:
+                        self._in_flight += 1
+                if dropped:
+                    self._dropped[window] += 1
+                    continue
+                executor.submit(
+                    self._send, sentences[index % len(sentences)], start + scheduled_time, self._windows[window]
+                )
+        if sum(self._dropped):
+            logging.warning(
+                f"{sum(self._dropped)} request(s) were dropped, because {self.max_in_flight} request(s) were "
+                "still waiting for the Rasa API at their scheduled time."
+            )
+        self._result = self._build_result(len(schedule))
+        logging.info(
+            f"Load test finished: {self._result['requests']} request(s), {self._result['error_rate'] * 100:.1f}% "
+            f"of errors, p99 of {self._result['p99']:.3f}s and throughput of {self._result['throughput']:.1f} "
+            "request(s) per second."
+        )
+        return self.result
+
+    def _send(self, text: str, scheduled_time: float, window: LatencyHistogram) -> None:
+        """
+        Send a sentence to the Rasa API and record its latency.
+
+        :param text: Sentence.
+        :param scheduled_time: Scheduled time, from time.perf_counter.
+        :param window: Histogram of the load test window.
+        """
+        url = self.backend.endpoints.acquire()
+        response = None
+        try:
+            response = utils.request(
+                method="POST",
+                url=f"{url}/model/parse",
+                json={"text": text},
+                session=self.backend.session,
+                timeout=self.backend.timeout
+            )
+        finally:
+            end = time.perf_counter()
+            self.backend.endpoints.release(url)
+            with self._lock:
+                self._in_flight -= 1
+            error = response is None or response.status_code != 200
+            self.backend.latency.record(scheduled_time, end, text, error=error)
+            window.record(scheduled_time, end, text, error=error)
+
+    def _build_result(self, scheduled: int) -> Dict[str, Any]:
+        """
+        Build the load test result. The saturation point is the offered rate of the first window
+        whose error rate or p95 latency exceeded the limits. The dropped requests are counted as
+        errors and in the offered rate. The throughput is the rate of successful
+        responses from the first scheduled request to the last response, so the requests still
+        answered after the load test duration are accounted for.
+
+        :param scheduled: Number of scheduled requests.
+        :return: Load test result.
+        """
+        windows = []
+        saturation_qps = None
+        for index, histogram in enumerate(self._windows):
+            length = min(self.window, self.duration - index * self.window)
+            dropped = self._dropped[index]
+            offered = histogram.requests + dropped
+            window = {
+                "start": index * self.window,
+                "offered_qps": offered / length,
+                "throughput": histogram.throughput * (1 - histogram.errors / histogram.requests)
+                if histogram.requests else 0,
+                "requests": histogram.requests,
+                "errors": histogram.errors,
+                "dropped": dropped,
+                "error_rate": (histogram.errors + dropped) / offered if offered else 0,
+                "p50": histogram.percentile(50),
+                "p95": histogram.percentile(95),
+                "p99": histogram.percentile(99)
+            }
+            saturated = window["error_rate"] > constants.LOAD_TEST_ERROR_RATE or window["p95"] > self.latency_target
+            if saturated and saturation_qps is None and offered:
+                saturation_qps = window["offered_qps"]
+            windows.append(window)
+        summary = self.backend.latency.summary()
+        dropped = sum(self._dropped)
+        offered = summary["requests"] + dropped
+        return {
+            "rasa_api": self.backend.urls,
+            "qps": self.qps,
+            "ramp_to": self.ramp_to,
+            "duration": self.duration,
+            "latency_target": self.latency_target,
+            "scheduled": scheduled,
+            "requests": summary["requests"],
+            "errors": summary["errors"],
+            "dropped": dropped,
+            "error_rate": (summary["errors"] + dropped) / offered if offered else 0,
+            "p50": summary["p50"],
+            "p90": summary["p90"],
+            "p99": summary["p99"],
+            "max": summary["max"],
+            "throughput": summary["throughput"] * (1 - summary["errors"] / summary["requests"])
+            if summary["requests"] else 0,
+            "saturation_qps": saturation_qps,
+            "windows": windows,
+            "slowest": summary["slowest"]
+        }
+
+    def build_report(self) -> str:
+        """
+        Build the load test report.
+
+        :return: Load test report in markdown format.
+        """
+        result = self._result
+        text = "# Load test report\n"
+        text += f"Load test of the {self.project_name} Rasa API ({', '.join(self.backend.urls)}) " \
+            f"with {result['qps']:g} to {result['ramp_to']:g} request(s) per second for {result['duration']:g}s.\n\n"
+        text += "## Summary\n"
+        text += "|Requests|Dropped|Error rate|p50|p90|p99|Max|Throughput|\n"
+        text += "|:-:|:-:|:-:|:-:|:-:|:-:|:-:|:-:|\n"
+        text += f"|{result['requests']}|{result['dropped']}|{result['error_rate'] * 100:.1f}%" \
+            f"|{result['p50'] * 1000:.1f} ms|{result['p90'] * 1000:.1f} ms|{result['p99'] * 1000:.1f} ms" \
+            f"|{result['max'] * 1000:.1f} ms|{result['throughput']:.1f} req/s|\n\n"
+        if result["saturation_qps"] is None:
+            text += "The Rasa API wasn't saturated: the error rate and the p95 latency stayed under " \
+                f"{constants.LOAD_TEST_ERROR_RATE * 100:g}% and {self.latency_target:g}s.\n\n"
+        else:
+            text += f"The Rasa API was saturated at **{result['saturation_qps']:.1f} request(s) per second**, " \
+                f"when the error rate exceeded {constants.LOAD_TEST_ERROR_RATE * 100:g}% " \
+                f"or the p95 latency exceeded {self.latency_target:g}s.\n\n"
+        text += "## Windows\n"
+        text += "|Start|Offered|Throughput|Dropped|Error rate|p50|p95|p99|\n"
+        text += "|:-:|:-:|:-:|:-:|:-:|:-:|:-:|:-:|\n"
+        for window in result["windows"]:
+            text += f"|{window['start']:g}s|{window['offered_qps']:.1f} req/s|{window['throughput']:.1f} req/s" \
+                f"|{window['dropped']}|{window['error_rate'] * 100:.1f}%|{window['p50'] * 1000:.1f} ms" \
+                f"|{window['p95'] * 1000:.1f} ms|{window['p99'] * 1000:.1f} ms|\n"
+        return text
+
+    def save(self) -> None:
+        """
+        Save the load test result to the JSON file and the load test report to the markdown file.
+        """
+        if not self._result:
+            return None
+        for filename, data in [
+            (self.result_path, json.dumps(self._result, indent=4) + "\n"),
+            (self.output_report_path, self.build_report())
+        ]:
+            try:
+                file = open(filename, "w", encoding="utf-8")
+                file.write(data)
+                file.close()
+                logging.info(f"{filename} file successfully saved.")
+            except FileNotFoundError as error:
+                logging.error(f"Could not save the file: {filename}. Error: {error}.")
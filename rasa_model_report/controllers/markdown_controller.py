@@ -3,6 +3,7 @@ import os.path
 from typing import Any
 from typing import Dict
 from typing import List
+from typing import Optional
 from typing import Union
 
 from rasa_model_report.controllers.controller import Controller
@@ -13,6 +14,8 @@ from rasa_model_report.controllers.nlu_controller import NluController
 from rasa_model_report.helpers import constants
 from rasa_model_report.helpers import type_aliases
 from rasa_model_report.helpers import utils
+from rasa_model_report.helpers.project_index import ProjectIndex
+from rasa_model_report.helpers.yaml_cache import YamlCache
 
 
 class MarkdownController(Controller):
@@ -49,13 +52,49 @@ class MarkdownController(Controller):
         self.precision: int = kwargs.get("precision", constants.SCORE_PRECISION)
         self.json: JsonController = JsonController(rasa_path, output_path, project_name, project_version)
         self.csv: CsvController = CsvController(rasa_path, output_path, project_name, project_version)
+        self.yaml_cache: YamlCache = YamlCache(
+            f"{self.results_path}/yaml_cache.bin",
+            max_bytes=kwargs.get("yaml_cache_size", constants.YAML_CACHE_SIZE) * 1024 * 1024,
+            verify_hash=kwargs.get("yaml_cache_hash", constants.YAML_CACHE_HASH)
+        )
+        if kwargs.get("clear_cache", constants.CLEAR_CACHE):
+            self.yaml_cache.clear()
+        if utils.YAML_LOADER.__name__ == "CSafeLoader":
+            logging.info("Using the libyaml C YAML loader (CSafeLoader).")
+        else:
+            logging.info("Using the pure-Python YAML loader (SafeLoader). Install PyYAML with libyaml to parse faster.")
+        self.project_index: ProjectIndex = ProjectIndex(
+            self.rasa_path, self.yaml_cache, kwargs.get("jobs", constants.JOBS)
+        )
         self.nlu: NluController = NluController(
             rasa_path,
             output_path,
             project_name,
             project_version,
             url=kwargs.get("rasa_api_url", constants.RASA_API_URL),
-            disable_nlu=kwargs.get("disable_nlu", constants.DISABLE_NLU)
+            baseline_url=kwargs.get("rasa_api_baseline"),
+            disable_nlu=kwargs.get("disable_nlu", constants.DISABLE_NLU),
+            nlu_adaptive=kwargs.get("nlu_adaptive", constants.NLU_ADAPTIVE),
+            nlu_batch_size=kwargs.get("nlu_batch_size", constants.NLU_BATCH_SIZE),
+            nlu_batch_url=kwargs.get("nlu_batch_url"),
+            nlu_cache_size=kwargs.get("nlu_cache_size", constants.NLU_CACHE_SIZE),
+            nlu_concurrency=kwargs.get("nlu_concurrency", constants.NLU_CONCURRENCY),
+            nlu_fail_threshold=kwargs.get("nlu_fail_threshold"),
+            nlu_incremental=kwargs.get("nlu_incremental", constants.NLU_INCREMENTAL),
+            nlu_latency_target=kwargs.get("nlu_latency_target", constants.NLU_LATENCY_TARGET),
+            nlu_max_per_intent=kwargs.get("nlu_max_per_intent"),
+            nlu_model=kwargs.get("nlu_model"),
+            nlu_pool_size=kwargs.get("nlu_pool_size"),
+            nlu_predictions=kwargs.get("nlu_predictions"),
+            nlu_sample_rate=kwargs.get("nlu_sample_rate", constants.NLU_SAMPLE_RATE),
+            nlu_streaming=kwargs.get("nlu_streaming", constants.NLU_STREAMING),
+            nlu_time_budget=kwargs.get("nlu_time_budget"),
+            no_nlu_cache=kwargs.get("no_nlu_cache", constants.NO_NLU_CACHE),
+            project_index=self.project_index,
+            rasa_api_retries=kwargs.get("rasa_api_retries", constants.RASA_API_RETRIES),
+            rasa_api_timeout=kwargs.get("rasa_api_timeout", constants.RASA_API_TIMEOUT),
+            resume=kwargs.get("resume", constants.RESUME),
+            shard=kwargs.get("shard")
         )
         self.e2e_coverage: E2ECoverageController = E2ECoverageController(
             rasa_path,
@@ -63,13 +102,31 @@ class MarkdownController(Controller):
             kwargs.get("actions_path"),
             kwargs.get("exclude", []),
             project_name,
-            project_version
+            project_version,
+            project_index=self.project_index
         )
 
-        self.json.update_overview({
+        overview = {
             "nlu": self.nlu.overall_score,
             "e2e_coverage": self.e2e_coverage.total_rate
-        })
+        }
+        if self.nlu.confidence_interval:
+            overview["nlu_confidence_interval"] = list(self.nlu.confidence_interval)
+        if self.nlu.performance:
+            overview["nlu_performance"] = self.nlu.performance
+        if self.nlu.partial:
+            overview["nlu_partial"] = self.nlu.partial
+        if self.nlu.baseline_aggregator:
+            overview["nlu_baseline"] = {
+                "url": self.nlu.baseline_url,
+                "score": self.nlu.baseline_score,
+                "changed_sentences": len(self.nlu.baseline_changes),
+                "missing_sentences": self.nlu.baseline_missing
+            }
+        if self.nlu.is_connected() and self.nlu.fingerprint:
+            overview["nlu_model"] = {"fingerprint": self.nlu.fingerprint, "model_file": self.nlu.model_file}
+            overview["nlu_data_hash"] = self.nlu.nlu_data_hash
+        self.json.update_overview(overview)
         if self.no_images:
             logging.info("--no-images activated. Images will not be displayed in the report.")
 
@@ -138,6 +195,7 @@ class MarkdownController(Controller):
             sections.insert(1, " - [Config](#configs)\n")
         if self.nlu.is_connected():
             sections.insert(4, " - [NLU](#nlu)\n")
+            sections.insert(5, " - [Inference performance](#performance)\n")
 
         return f"## Index\n{''.join(sections)}\n"
 
@@ -228,7 +286,7 @@ class MarkdownController(Controller):
         intents = len(self.e2e_coverage.items["intents"])
         entities = len(self.e2e_coverage.items["entities"])
         utters_actions = len(self.e2e_coverage.items["actions"])
-        stories_rules = utils.count_stories_and_rules(self.rasa_path)
+        stories_rules = self.project_index.count_stories_and_rules()
         stories = stories_rules.get("stories")
         rules = stories_rules.get("rules")
         data = [
@@ -510,6 +568,22 @@ class MarkdownController(Controller):
         """
         title = "## NLU <a name='nlu'></a>\n"
         description = "Section that discusses metrics about NLU and its example phrases.\n"
+        if self.nlu.confidence_interval:
+            lower, upper = self.nlu.confidence_interval
+            description += "\n> NLU score estimated from a stratified sample of the example phrases: " \
+                f"**{utils.change_scale(self.nlu.overall_score, 10, self.precision)}** " \
+                f"(95% confidence interval: {utils.change_scale(lower, 10, self.precision)} - " \
+                f"{utils.change_scale(upper, 10, self.precision)}).\n"
+        if self.nlu.partial:
+            reasons = {
+                "time_budget": "the time budget ran out",
+                "fail_threshold": "the NLU score can't reach the minimum score anymore",
+                "endpoints_ejected": "all Rasa API endpoints were removed from the pool as unhealthy",
+                "failed_requests": f"the requests of {self.nlu.partial.get('failed', 0)} of them failed"
+            }
+            description += f"\n> ⚠️ **Partial results**: only {self.nlu.partial['analyzed']} of " \
+                f"{self.nlu.partial['total']} example phrases were analyzed, because " \
+                f"{reasons.get(self.nlu.partial['reason'], 'the NLU processing was stopped')}.\n"
         return title + description
 
     def build_nlu_table(self) -> str:
@@ -520,6 +594,12 @@ class MarkdownController(Controller):
         """
         title = "### Sentences\n"
         description = "Table with metrics for bot training phrases.\n"
+        if self.nlu.aggregator:
+            predictions_path = utils.path_to(self.output_path, self.results_path) + \
+                os.path.basename(self.nlu.nlu_predictions_path)
+            description += "\n> Only the sentences with the highest and the lowest confidences of the " \
+                f"{self.nlu.total_sentences} analyzed sentences are listed. All of them are in the " \
+                f"`{predictions_path}` file.\n"
         title += description + "\n"
         data = self.nlu.data
         table_data = [[
@@ -582,6 +662,134 @@ class MarkdownController(Controller):
             text = "\nThere are no sentences that were not understood in this model.\n"
             return title + text
 
+    def build_nlu_entity_table(self) -> str:
+        """
+        Build the report NLU entities table block.
+
+        :return: Table block in markdown format.
+        """
+        title = "### Entities\n"
+        description = "Table with metrics for the entities annotated in the bot training phrases, " \
+            "compared to the entities predicted by the model.\n"
+        title += description + "\n"
+        table_data = [[
+            "",
+            "Entity",
+            "Precision",
+            "Recall",
+            "F1 Score",
+            "Examples"
+        ]]
+        for item in self.nlu.entity_scores:
+            table_data.append(self._build_line_table(item))
+        if len(table_data) > 1:
+            self.csv.save(table_data, "nlu_entity_report.csv")
+            return title + self.build_table(table_data)
+        else:
+            text = "\nNo entities were annotated or predicted in the example phrases.\n"
+            return title + text
+
+    def build_nlu_baseline_table(self) -> Optional[str]:
+        """
+        Build the report table block of the sentences whose prediction changed from the baseline model.
+
+        :return: Table block in markdown format or None if the models weren't compared.
+        """
+        if not self.nlu.baseline_aggregator:
+            return None
+        title = "### Comparison with the baseline model\n"
+        description = f"Table with the sentences whose prediction changed between the baseline model " \
+            f"({self.nlu.baseline_url}) and this model.\n"
+        description += f"\n> NLU score of the baseline model: " \
+            f"**{utils.change_scale(self.nlu.baseline_score, 10, self.precision)}**. " \
+            f"NLU score of this model: **{utils.change_scale(self.nlu.overall_score, 10, self.precision)}**.\n"
+        if self.nlu.baseline_missing:
+            description += f"\n> ⚠️ {self.nlu.baseline_missing} sentence(s) couldn't be predicted by the baseline " \
+                "model and weren't compared.\n"
+        title += description + "\n"
+        table_data = [[
+            "",
+            "Text",
+            "Intent",
+            "Baseline predicted intent",
+            "Predicted intent",
+            "Baseline confidence",
+            "Confidence",
+            "Understood"
+        ]]
+        for item in self.nlu.baseline_changes:
+            table_data.append([
+                utils.get_color(item["confidence"]),
+                item["text"],
+                item["intent"],
+                item["baseline_predicted_intent"],
+                item["predicted_intent"],
+                f"{item['baseline_confidence'] * 100:.1f}%",
+                f"{item['confidence'] * 100:.1f}%",
+                f"{utils.check(not item['baseline_understood'])} → {utils.check(not item['understood'])}"
+            ])
+        if len(table_data) > 1:
+            self.csv.save(table_data, "nlu_baseline_report.csv")
+            return title + self.build_table(table_data)
+        else:
+            text = "\nNo sentence changed its prediction between the baseline model and this model.\n"
+            return title + text
+
+    def build_performance_title(self) -> str:
+        """
+        Build the report inference performance title block.
+
+        :return: Title block in markdown format.
+        """
+        title = "## Inference performance <a name='performance'></a>\n"
+        description = "Section that shows the Rasa API latency while the NLU example phrases were predicted.\n"
+        return title + description
+
+    def build_performance_overview(self) -> str:
+        """
+        Build the report inference performance overview block.
+
+        :return: Overview block in markdown format.
+        """
+        performance = self.nlu.performance
+        if not performance:
+            return "\nNo requests were sent to the Rasa API, all predictions were reused.\n"
+        text = "|Requests|Errors|p50|p90|p99|Max|Throughput|\n"
+        text += "|:-:|:-:|:-:|:-:|:-:|:-:|:-:|\n"
+        text += f"|{performance['requests']}\
+            |{performance['errors']}\
+            |{performance['p50'] * 1000:.1f} ms\
+            |{performance['p90'] * 1000:.1f} ms\
+            |{performance['p99'] * 1000:.1f} ms\
+            |{performance['max'] * 1000:.1f} ms\
+            |{performance['throughput']:.1f} req/s|\n"
+        if performance.get("saved_requests"):
+            text += f"\n{performance['saved_requests']} request(s) were saved by requesting duplicated " \
+                "sentences once.\n"
+        return text
+
+    def build_performance_table(self) -> str:
+        """
+        Build the report slowest sentences table block.
+
+        :return: Table block in markdown format.
+        """
+        title = "### Slowest sentences\n"
+        description = "Table with the example phrases that took longer to be predicted.\n"
+        title += description + "\n"
+        performance = self.nlu.performance
+        table_data = [[
+            "Text",
+            "Latency"
+        ]]
+        for item in performance.get("slowest", []) if performance else []:
+            table_data.append([item["text"], f"{item['latency'] * 1000:.1f} ms"])
+        if len(table_data) > 1:
+            return title + self.build_table(table_data)
+        else:
+            text = "\nNo requests were sent to the Rasa API.\n"
+            return title + text
+
     def build_config_report(self) -> str:
         """
         Build the report config block.
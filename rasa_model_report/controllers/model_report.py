@@ -95,6 +95,13 @@ class ModelReport:
                 self.markdown.add_text(self.markdown.build_nlu_title())
                 self.markdown.add_text(self.markdown.build_nlu_table())
                 self.markdown.add_text(self.markdown.build_nlu_errors_table())
+                self.markdown.add_text(self.markdown.build_nlu_entity_table())
+                self.markdown.add_text(self.markdown.build_nlu_baseline_table())
+
+                # Inference performance
+                self.markdown.add_text(self.markdown.build_performance_title())
+                self.markdown.add_text(self.markdown.build_performance_overview())
+                self.markdown.add_text(self.markdown.build_performance_table())
 
             # Core
             self.markdown.add_text(self.markdown.build_core_title())
@@ -111,6 +118,7 @@ class ModelReport:
             # Save report and overview files
             self.markdown.save_report()
             self.markdown.save_overview()
+            self.markdown.project_index.save_cache()
 
             logging.info("Script successfully completed.")
         else:
@@ -1,18 +1,40 @@
-import glob
+import copy
+import hashlib
+import itertools
+import json
 import logging
-import re
+import math
+import operator
+import os.path
+import random
+import time
+from collections import Counter
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 from typing import Dict
+from typing import Iterable
+from typing import Iterator
 from typing import List
 from typing import Optional
+from typing import Tuple
 from typing import Union
 
-import requests.exceptions
-
+from rasa_model_report.backends.http_nlu_backend import HttpNluBackend
+from rasa_model_report.backends.nlu_backend import NluBackend
+from rasa_model_report.backends.nlu_backend import NluBackendUnavailableError
+from rasa_model_report.backends.rasa_nlu_backend import RasaNluBackend
 from rasa_model_report.controllers.controller import Controller
+from rasa_model_report.controllers.json_controller import JsonController
 from rasa_model_report.helpers import constants
 from rasa_model_report.helpers import type_aliases
 from rasa_model_report.helpers import utils
+from rasa_model_report.helpers.adaptive_concurrency import AdaptiveConcurrency
+from rasa_model_report.helpers.nlu_aggregator import NluAggregator
+from rasa_model_report.helpers.nlu_cache import NluCache
+from rasa_model_report.helpers.nlu_predictions import NluPredictions
+from rasa_model_report.helpers.nlu_record import NluRecord
+from rasa_model_report.helpers.project_index import ProjectIndex
 
 
 class NluController(Controller):
@@ -25,7 +47,7 @@ class NluController(Controller):
         output_path: str,
         project_name: str,
         project_version: str,
-        url: str = "http://localhost:5005",
+        url: Union[str, List[str]] = "http://localhost:5005",
         **kwargs: Dict[str, Any]
     ) -> None:
         """
@@ -35,21 +57,114 @@ class NluController(Controller):
         :param output_path: Output directory of CSV files.
         :param project_name: Project name.
         :param project_version: Project version.
-        :param url: Rasa API URL (default: "http://localhost:5005")
+        :param url: Rasa API URL or list of URLs of Rasa API replicas (default: "http://localhost:5005")
         """
         super().__init__(rasa_path, output_path, project_name, project_version)
-        self._data: List[type_aliases.nlu_payload] = []
-        self._problem_sentences: List[type_aliases.nlu_payload] = []
+        self._data: List[NluRecord] = []
+        self._problem_sentences: List[NluRecord] = []
         self._overall_score: Optional[float] = None
         self._connected: bool = False
         self._disable_nlu: bool = kwargs.get("disable_nlu", constants.DISABLE_NLU)
-        self.url: str = url
+        self.project_index: ProjectIndex = kwargs.get("project_index") or ProjectIndex(self.rasa_path)
+        self.nlu_concurrency: int = max(1, kwargs.get("nlu_concurrency") or constants.NLU_CONCURRENCY)
+        self.backend: NluBackend = kwargs.get("nlu_backend") or self._create_backend(url, **kwargs)
+        self._no_nlu_cache: bool = kwargs.get("no_nlu_cache", constants.NO_NLU_CACHE)
+        self.nlu_cache_size: int = kwargs.get("nlu_cache_size") or constants.NLU_CACHE_SIZE
+        self.nlu_cache_path: str = f"{self.results_path}/nlu_cache.json"
+        self.cache: Optional[NluCache] = None
+        self.fingerprint: Optional[str] = None
+        self._gold_entities: Dict[Tuple[str, str], List[type_aliases.entity]] = {}
+        self._entity_scores: Dict[str, Dict[str, Union[str, float, int]]] = {}
+        self.model_file: Optional[str] = None
+        self.nlu_data_hash: Optional[str] = None
+        self.reused: bool = False
+        self.shard: Optional[Tuple[int, int]] = kwargs.get("shard")
+        shard_suffix = f".shard-{self.shard[0]}-of-{self.shard[1]}" if self.shard else ""
+        self.nlu_incremental: bool = kwargs.get("nlu_incremental", constants.NLU_INCREMENTAL)
+        self.nlu_incremental_path: str = f"{self.results_path}/nlu_incremental{shard_suffix}.jsonl"
+        self.resume: bool = kwargs.get("resume", constants.RESUME)
+        self.nlu_predictions_path: str = f"{self.results_path}/nlu_predictions{shard_suffix}.jsonl"
+        self.nlu_predictions_files: List[str] = kwargs.get("nlu_predictions") or []
+        self.nlu_sample_rate: float = kwargs.get("nlu_sample_rate") or constants.NLU_SAMPLE_RATE
+        self.nlu_max_per_intent: Optional[int] = kwargs.get("nlu_max_per_intent")
+        self.nlu_sample_seed: int = kwargs.get("nlu_sample_seed", constants.NLU_SAMPLE_SEED)
+        self._population: Dict[str, int] = {}
+        self._confidence_interval: Optional[Tuple[float, float]] = None
+        self.deduplicated: int = 0
+        self.nlu_time_budget: Optional[float] = kwargs.get("nlu_time_budget")
+        self.nlu_fail_threshold: Optional[float] = kwargs.get("nlu_fail_threshold")
+        self._deadline: Optional[float] = None
+        self._stop_reason: Optional[str] = None
+        self.failed_sentences: int = 0
+        self._partial: Optional[Dict[str, Union[str, int]]] = None
+        self.nlu_streaming: bool = kwargs.get("nlu_streaming", constants.NLU_STREAMING)
+        self.aggregator: Optional[NluAggregator] = None
+        self.baseline_url: Optional[str] = kwargs.get("baseline_url")
+        self.baseline: Optional[NluBackend] = None
+        if self.baseline_url:
+            self.baseline = HttpNluBackend(
+                [self.baseline_url],
+                timeout=kwargs.get("rasa_api_timeout", constants.RASA_API_TIMEOUT),
+                pool_size=kwargs.get("nlu_pool_size") or max(constants.NLU_POOL_SIZE, self.nlu_concurrency),
+                retries=kwargs.get("rasa_api_retries", constants.RASA_API_RETRIES)
+            )
+        self.baseline_aggregator: Optional[NluAggregator] = None
+        self._baseline_score: Optional[float] = None
+        self._baseline_changes: List[Dict[str, Any]] = []
+        self.baseline_missing: int = 0
+        self._process()
+
+    def _create_backend(self, url: Union[str, List[str]], **kwargs: Dict[str, Any]) -> NluBackend:
+        """
+        Create the NLU backend. The Rasa model is loaded in-process when *nlu_model* is informed,
+        otherwise the sentences are requested to the Rasa API.
+
+        :param url: Rasa API URL or list of URLs of Rasa API replicas.
+        :return: NLU backend.
+        """
+        if kwargs.get("nlu_model"):
+            return RasaNluBackend(kwargs["nlu_model"], kwargs.get("nlu_batch_size") or constants.NLU_BATCH_SIZE)
+        concurrency = None
+        if kwargs.get("nlu_adaptive", constants.NLU_ADAPTIVE):
+            concurrency = AdaptiveConcurrency(
+                self.nlu_concurrency,
+                kwargs.get("nlu_latency_target") or constants.NLU_LATENCY_TARGET
+            )
+        return HttpNluBackend(
+            [url] if isinstance(url, str) else url,
+            timeout=kwargs.get("rasa_api_timeout", constants.RASA_API_TIMEOUT),
+            pool_size=kwargs.get("nlu_pool_size") or max(constants.NLU_POOL_SIZE, self.nlu_concurrency),
+            retries=kwargs.get("rasa_api_retries", constants.RASA_API_RETRIES),
+            concurrency=concurrency,
+            batch_url=kwargs.get("nlu_batch_url"),
+            batch_size=kwargs.get("nlu_batch_size") or constants.NLU_BATCH_SIZE
+        )
 
-        if self.health_check_rasa_api():
+    def _process(self) -> None:
+        """
+        Process the NLU sentences, requesting them to the Rasa API or merging the predictions files.
+        """
+        if self.nlu_predictions_files:
+            self._connected = True
             self._load_nlu()
-            self._generate_data()
+            self._merge_predictions()
             self._load_problem_sentences()
             self._calculate_overall_score()
+            self._calculate_entity_scores()
+        elif self.health_check_rasa_api():
+            self.fingerprint = self.get_model_fingerprint()
+            self.model_file = self.backend.get_model_file()
+            self._load_nlu()
+            if self.baseline and not self.baseline.is_available():
+                logging.warning(f"Baseline Rasa API {self.baseline_url} is unavailable. Models will not be compared.")
+                self.baseline = None
+            if self.baseline or not self._reuse_previous_run():
+                self._load_cache()
+                self._generate_data()
+                self._save_cache()
+            self._load_problem_sentences()
+            self._calculate_overall_score()
+            self._calculate_entity_scores()
 
     def is_connected(self) -> bool:
         """
@@ -61,90 +176,766 @@ class NluController(Controller):
 
     def health_check_rasa_api(self) -> bool:
         """
-        Check if Rasa API is available.
+        Check if the NLU backend is available. With the Rasa API backend, each Rasa API URL is
+        checked and the unhealthy ones are removed from the endpoints pool.
 
         :return: True if is available or False.
         """
         self._connected = False
         if self._disable_nlu:
-            logging.warn("Rasa API is disabled. NLU section will not be generated.")
+            logging.warn(f"{self.backend.name} is disabled. NLU section will not be generated.")
         else:
-            response = utils.request(self.url)
-            if isinstance(response, requests.Response):
-                self._connected = response.status_code == 200
-                if self._connected:
-                    logging.info("Rasa API is enabled.")
-                else:
-                    logging.warning("Rasa API has some problem. NLU section will not be generated.")
+            self._connected = self.backend.is_available()
+            if self._connected:
+                logging.info(f"{self.backend.name} is enabled.")
+            else:
+                logging.warning(f"{self.backend.name} has some problem. NLU section will not be generated.")
         return self._connected
 
+    def get_model_fingerprint(self) -> Optional[str]:
+        """
+        Get the fingerprint of the model used by the NLU backend.
+
+        :return: Model fingerprint hash or None if the backend didn't inform it.
+        """
+        return self.backend.get_model_fingerprint()
+
+    def _load_cache(self) -> Optional[NluCache]:
+        """
+        Load the NLU predictions cache of the model loaded in the Rasa API.
+
+        :return: Cache object or None if the cache is disabled.
+        """
+        self.cache = None
+        if self._no_nlu_cache:
+            logging.info("--no-nlu-cache activated. NLU predictions will not be cached.")
+            return None
+        if self.fingerprint:
+            self.cache = NluCache(self.nlu_cache_path, self.fingerprint, self.nlu_cache_size)
+        else:
+            logging.warning("Could not get the model fingerprint from Rasa API. NLU predictions will not be cached.")
+        return self.cache
+
+    def _save_cache(self) -> None:
+        """
+        Save the NLU predictions cache.
+        """
+        if self.cache is not None:
+            logging.info(f"NLU cache: {self.cache.hits} hit(s) and {self.cache.misses} miss(es).")
+            self.cache.save()
+
     def _load_nlu(self) -> Dict[str, Union[str, List[str]]]:
         """
-        Load all NLU sentences from project of Rasa files.
+        Load all NLU sentences from project of Rasa files. In shard mode, only the intents of the
+        shard are kept and, in sampling mode, only a stratified sample of each intent's sentences.
 
         :return: A dictionary that contains the sentences separeted by intent.
         """
         logging.info("Looking for Rasa's NLU files.")
-        files = glob.glob(f"{self.nlu_path}/**/*.yml") + glob.glob(f"{self.nlu_path}/*.yml")
         nlu = {}
-        for filename in files:
-            file = utils.load_yaml_file(filename)
-            if file and file.get("nlu"):
-                data = {i["intent"]: i["examples"] for i in file["nlu"] if i.get("intent")}
-                if data:
-                    logging.info(f"Found sentences in {filename} file.")
-                    for intent, text in data.items():
-                        data[intent] = self._extract_sentences(text)
-                        logging.info(f" - Intent {intent}: {len(data[intent])} sentence(s).")
-                    nlu.update(data)
+        for filename, data in self.project_index.nlu_examples.items():
+            logging.info(f"Found sentences in {filename} file.")
+            for intent, text in data.items():
+                data[intent] = self._extract_sentences(text)
+                logging.info(f" - Intent {intent}: {len(data[intent])} sentence(s).")
+            nlu.update(data)
+        if self.shard:
+            index, total = self.shard
+            intents = sorted(nlu)[index - 1::total]
+            nlu = {intent: examples for intent, examples in nlu.items() if intent in intents}
+            logging.info(f"Shard {index}/{total}: {len(nlu)} intent(s) will be analyzed.")
+        self._population = {intent: len(examples) for intent, examples in nlu.items()}
+        if self.is_sampled():
+            nlu = {intent: self._sample_examples(intent, examples) for intent, examples in nlu.items()}
+            logging.info(
+                f"Stratified sample of {sum(len(examples) for examples in nlu.values())} "
+                f"of {sum(self._population.values())} sentence(s) will be analyzed."
+            )
         self._data = nlu
+        self.nlu_data_hash = self._hash_examples(nlu)
         return nlu
 
-    def _generate_data(self) -> List[type_aliases.nlu_payload]:
+    def is_sampled(self) -> bool:
         """
-        Load and process the NLU sentences data.
+        If only a sample of the NLU sentences is analyzed.
 
-        :return: Processed NLU sentences data.
+        :return bool: True if the sampling mode is enabled.
         """
-        logging.info("Formatting extracted data.")
-        data = []
-        index = 1
+        return self.nlu_sample_rate < 1 or self.nlu_max_per_intent is not None
+
+    def _sample_examples(self, intent: str, examples: List[str]) -> List[str]:
+        """
+        Draw the sample of an intent's examples. The sample is reproducible, as the random
+        generator is seeded with *nlu_sample_seed* and the intent name.
+
+        :param intent: Intent name.
+        :param examples: Intent examples.
+        :return: Sampled examples, in the same order of the NLU files.
+        """
+        size = min(len(examples), max(1, math.ceil(len(examples) * self.nlu_sample_rate)))
+        if self.nlu_max_per_intent is not None:
+            size = min(size, self.nlu_max_per_intent)
+        indexes = random.Random(f"{self.nlu_sample_seed}-{intent}").sample(range(len(examples)), size)
+        return [examples[index] for index in sorted(indexes)]
+
+    def _list_sentences(self) -> List[Tuple[str, str]]:
+        """
+        List the loaded NLU sentences, without Rasa entity syntax, in the order of the NLU files.
+        The annotated entities of each sentence are kept to score the predicted entities.
+
+        :return: List of intent and text pairs.
+        """
+        sentences = []
+        self._gold_entities = {}
         for intent, examples in self._data.items():
-            progress = index / len(self._data) * 100
-            index += 1
-            logging.info(f" - ({progress:<5.1f}%) analyzing NLU intent: {intent}")
-            for text in examples:
-                text = self.remove_entities_from_text(text)
-                nlu_requested = self.request_nlu(text)
-                predicted_intent = self.select_intent(nlu_requested)
-                item = {
-                    "intent": intent,
-                    "text": text,
-                    "confidence": predicted_intent.get("confidence"),
-                    "predicted_intent": predicted_intent.get("name"),
-                    "intent_ranking": nlu_requested.get("intent_ranking", [])[:4]
-                }
-                item["understood"] = predicted_intent.get("nlu_fallback", False) or intent != predicted_intent["name"]
-                data.append(item)
+            for example in examples:
+                text, entities = utils.parse_entity_annotations(example)
+                sentences.append((intent, text))
+                if entities:
+                    self._gold_entities.setdefault((intent, text), entities)
+        return sentences
+
+    def _order_data(
+        self,
+        data: Iterable[type_aliases.nlu_payload],
+        sentences: List[Tuple[str, str]]
+    ) -> List[type_aliases.nlu_payload]:
+        """
+        Order processed sentences in the order of the NLU files. Processed sentences that aren't
+        in the NLU files are discarded.
+
+        :param data: Processed sentences.
+        :param sentences: List of intent and text pairs in the order of the NLU files.
+        :return: Ordered processed sentences.
+        """
+        stored = self._group_sentences(data)
+        return [stored[sentence].popleft() for sentence in sentences if stored.get(sentence)]
+
+    def _merge_predictions(self) -> List[NluRecord]:
+        """
+        Merge the partial predictions files of a sharded run and save them to the predictions file.
+
+        :return: Processed NLU sentences data.
+        """
+        logging.info(f"Merging {len(self.nlu_predictions_files)} NLU predictions file(s).")
+        items = []
+        fingerprints = set()
+        for filename in self.nlu_predictions_files:
+            header, data = NluPredictions.read(filename)
+            fingerprints.add(header.get("fingerprint"))
+            items.extend(data)
+            logging.info(f" - {filename}: {len(data)} sentence(s).")
+        if len(fingerprints) > 1:
+            logging.warning("The predictions files were generated by different models.")
+        self.fingerprint = sorted(fingerprints, key=str)[0] if fingerprints else None
+        sentences = self._list_sentences()
+        data = self._order_data(items, sentences)
+        if len(data) < len(sentences):
+            logging.warning(f"{len(sentences) - len(data)} sentence(s) weren't found in the predictions files.")
+        predictions = NluPredictions(self.nlu_predictions_path, self.fingerprint)
+        predictions.open()
+        for item in data:
+            predictions.write(item)
+        predictions.close()
+        return self._sort_data(data)
+
+    def _sort_data(self, data: List[type_aliases.nlu_payload]) -> List[NluRecord]:
+        """
+        Convert the processed sentences to compact records, ordered by confidence.
+
+        :param data: Processed sentences, in the order of the NLU files.
+        :return: Processed NLU sentences data, as compact records.
+        """
         logging.info("Ordering phrases.")
-        data = sorted(data, key=lambda item: item["confidence"], reverse=True)
+        data = sorted(map(NluRecord.from_item, data), key=operator.attrgetter("confidence"), reverse=True)
         logging.info(f"Total of {len(data)} extracted sentences.")
         self._data = data
         return data
 
-    def _load_problem_sentences(self) -> List[type_aliases.nlu_payload]:
+    def _reuse_previous_run(self) -> bool:
+        """
+        Reuse the predictions of the previous run when neither the model, identified by its
+        fingerprint, nor the NLU data changed since then, skipping the NLU requests.
+
+        :return: True if the predictions of the previous run were reused.
+        """
+        overview_path = f"{self.results_path}/overview.json"
+        if self._no_nlu_cache or not self.fingerprint or not os.path.isfile(overview_path):
+            return False
+        previous = JsonController.load_json_file(overview_path, error_flag=False)
+        if (previous.get("nlu_model") or {}).get("fingerprint") != self.fingerprint or \
+                previous.get("nlu_data_hash") != self.nlu_data_hash or previous.get("nlu_partial"):
+            return False
+        predictions = NluPredictions(self.nlu_predictions_path, self.fingerprint)
+        sentences = self._list_sentences()
+        if self.nlu_streaming:
+            aggregator = NluAggregator()
+            for _, item in self._expected_items(predictions.stream_positions(), sentences):
+                aggregator.add(NluRecord.from_item(item))
+            if aggregator.total < len(sentences):
+                return False
+            self.aggregator = aggregator
+            self._data = aggregator.sentences
+        else:
+            data = self._order_data(predictions.stream(), sentences)
+            if len(data) < len(sentences):
+                return False
+            self._sort_data(data)
+        self.reused = True
+        logging.info(
+            "The model and the NLU data didn't change since the previous run. "
+            f"The predictions of {self.nlu_predictions_path} file are reused."
+        )
+        return True
+
+    @staticmethod
+    def _expected_items(
+        items: Iterable[Tuple[int, type_aliases.nlu_payload]],
+        sentences: List[Tuple[str, str]]
+    ) -> Iterator[Tuple[int, type_aliases.nlu_payload]]:
+        """
+        Filter the processed sentences that are in the NLU files, without loading them all in memory.
+
+        :param items: Position and processed sentence, from the predictions file.
+        :param sentences: List of intent and text pairs of the NLU files.
+        :return: Position and processed sentence of the ones found in the NLU files.
+        """
+        expected = Counter(sentences)
+        for position, item in items:
+            key = (item["intent"], item["text"])
+            if expected[key] > 0:
+                expected[key] -= 1
+                yield position, item
+
+    def _generate_data(self) -> List[NluRecord]:
+        """
+        Load and process the NLU sentences data.
+
+        The pending sentences are requested by a pool of *nlu_concurrency* workers and streamed to
+        the predictions file as they arrive, each distinct normalized text being requested once. The
+        requests stop when *nlu_time_budget* runs out, when the *nlu_fail_threshold* score can't be
+        reached anymore or when all Rasa API endpoints were ejected, leaving the NLU data partial.
+        In streaming mode, once the requests finish, the processed sentences are aggregated from the
+        predictions file instead of being kept in memory.
+
+        :return: Processed NLU sentences data, as compact records.
+        """
+        logging.info("Formatting extracted data.")
+        if self.backend.batch_size:
+            logging.info(f"Requesting NLU sentences in batches of {self.backend.batch_size}.")
+        if getattr(self.backend, "concurrency", None):
+            logging.info(f"Requesting NLU sentences with adaptive concurrency of up to {self.nlu_concurrency} workers.")
+        elif self.nlu_concurrency > 1:
+            logging.info(f"Requesting NLU sentences with {self.nlu_concurrency} concurrent workers.")
+        if self.baseline:
+            logging.info(f"Requesting NLU sentences to the baseline Rasa API {self.baseline_url} too.")
+            if self.resume or self.nlu_incremental:
+                logging.warning("All sentences are requested to compare the models. Previous predictions are ignored.")
+            self.baseline_aggregator = NluAggregator()
+            self._baseline_changes = []
+            self.baseline_missing = 0
+        predictions = NluPredictions(self.nlu_predictions_path, self.fingerprint)
+        sentences = self._list_sentences()
+        weights = self._problem_weights(sentences)
+        pending, problem_rate = self._prepare_pending(predictions, sentences, weights)
+        self._stop_reason = None
+        self.failed_sentences = 0
+        self._partial = None
+        self._deadline = time.monotonic() + self.nlu_time_budget if self.nlu_time_budget else None
+        self._check_fail_threshold(problem_rate)
+        texts = {}
+        for _, text in pending:
+            texts.setdefault(NluCache.normalize(text), text)
+        occurrences = Counter(NluCache.normalize(text) for _, text in pending)
+        self.deduplicated = len(pending) - len(texts)
+        if self.deduplicated:
+            logging.info(
+                f"{len(texts)} distinct of {len(pending)} sentence(s) will be requested. "
+                f"{self.deduplicated} request(s) saved by deduplication."
+            )
+        positions = {intent: position for position, intent in enumerate(self._data, 1)}
+        last_intent = None
+        try:
+            with ThreadPoolExecutor(max_workers=self.nlu_concurrency) as executor, \
+                    ThreadPoolExecutor(max_workers=self.nlu_concurrency) as baseline_executor:
+                payloads = zip(
+                    texts,
+                    self._request_texts(executor, list(texts.values())),
+                    self._request_baseline_texts(baseline_executor, list(texts.values()))
+                )
+                predicted = {}
+                for intent, text in pending:
+                    if intent != last_intent:
+                        last_intent = intent
+                        progress = positions[intent] / len(self._data) * 100
+                        logging.info(f" - ({progress:<5.1f}%) analyzing NLU intent: {intent}")
+                    key = NluCache.normalize(text)
+                    while key not in predicted:
+                        done_key, nlu_requested, baseline_requested = next(payloads)
+                        predicted[done_key] = (nlu_requested, baseline_requested)
+                    occurrences[key] -= 1
+                    nlu_requested, baseline_requested = copy.deepcopy(predicted[key]) if occurrences[key] \
+                        else predicted.pop(key)
+                    if nlu_requested is None:
+                        continue
+                    if not self._is_valid_payload(nlu_requested):
+                        self.failed_sentences += 1
+                        logging.warning(f"{self.backend.name} couldn't parse the sentence: {text}")
+                        continue
+                    item = self._build_item(intent, text, nlu_requested)
+                    problem_rate += weights[intent] * item["understood"]
+                    predictions.write(item)
+                    if baseline_requested is not None:
+                        self._compare_baseline_payload(item, baseline_requested)
+                    self._check_fail_threshold(problem_rate)
+        finally:
+            predictions.close()
+        self._log_performance()
+        if self.nlu_streaming:
+            return self._aggregate_data(predictions, sentences)
+        return self._collect_data(predictions, sentences)
+
+    def _log_performance(self) -> None:
+        """
+        Log the adaptive concurrency summary and the latency and throughput of the NLU requests.
+        """
+        if getattr(self.backend, "concurrency", None):
+            logging.info(self.backend.concurrency.summary())
+        performance = self.performance
+        if performance:
+            logging.info(
+                f"{self.backend.name} latency: p50 of {performance['p50']:.3f}s, p99 of {performance['p99']:.3f}s "
+                f"and throughput of {performance['throughput']:.1f} request(s) per second."
+            )
+
+    def _collect_data(self, predictions: NluPredictions, sentences: List[Tuple[str, str]]) -> List[NluRecord]:
+        """
+        Load the processed sentences from the predictions file, in the order of the NLU files, and
+        save them for incremental mode unless the NLU data is partial.
+
+        :param predictions: Predictions file.
+        :param sentences: List of intent and text pairs in the order of the NLU files.
+        :return: Processed NLU sentences data, as compact records.
+        """
+        data = self._order_data(predictions.load(), sentences)
+        if not self._is_partial(len(data), len(sentences)):
+            intents_data = {}
+            for item in data:
+                intents_data.setdefault(item["intent"], []).append(item)
+            self._save_incremental_data(intents_data)
+        return self._sort_data(data)
+
+    def _prepare_pending(
+        self,
+        predictions: NluPredictions,
+        sentences: List[Tuple[str, str]],
+        weights: Dict[str, float]
+    ) -> Tuple[List[Tuple[str, str]], float]:
+        """
+        Open the predictions file and find the sentences that still need to be requested. Sentences
+        already in the predictions file (with --resume) aren't requested again, and the ones of
+        unchanged intents (in incremental mode) are copied to it. Both are ignored with a baseline.
+
+        :param predictions: Predictions file.
+        :param sentences: List of intent and text pairs in the order of the NLU files.
+        :param weights: Score lost by a problem sentence of each intent, see _problem_weights.
+        :return: Pending sentences and score lost by the problem sentences already predicted.
+        """
+        stored = {} if self.baseline else self._load_incremental_data()
+        resumed = {}
+        if predictions.open(resume=self.resume and not self.baseline):
+            resumed = self._group_outcomes(predictions.stream_positions())
+        pending = []
+        reused = []
+        problem_rate = 0
+        for intent, text in sentences:
+            if resumed.get((intent, text)):
+                problem_rate += weights[intent] * resumed[(intent, text)].popleft()[1]
+            elif stored.get((intent, text)):
+                position, understood = stored[(intent, text)].popleft()
+                problem_rate += weights[intent] * understood
+                reused.append(position)
+            else:
+                pending.append((intent, text))
+        if reused:
+            for item in NluPredictions(self.nlu_incremental_path, self.fingerprint).read_positions(reused):
+                predictions.write(item)
+        return pending, problem_rate
+
+    def _is_partial(self, analyzed: int, total: int) -> bool:
+        """
+        Check if the NLU processing was stopped before analyzing all sentences.
+
+        :param analyzed: Number of analyzed sentences.
+        :param total: Total number of sentences.
+        :return: True if the NLU data is partial.
+        """
+        if self._stop_reason != "fail_threshold" and analyzed >= total:
+            return False
+        reason = self._stop_reason or ("failed_requests" if self.failed_sentences else None)
+        self._partial = {"reason": reason, "analyzed": analyzed, "total": total, "failed": self.failed_sentences}
+        logging.warning(
+            f"Partial NLU analysis: {analyzed} of {total} sentence(s) were analyzed. "
+            f"{self.failed_sentences} request(s) failed."
+        )
+        return True
+
+    def _aggregate_data(
+        self,
+        predictions: NluPredictions,
+        sentences: List[Tuple[str, str]]
+    ) -> List[NluRecord]:
+        """
+        Aggregate the processed sentences while they're read from the predictions file, keeping in
+        memory only the problem sentences and the sentences with the highest and lowest confidences.
+        The predictions file keeps the detail of all sentences. For incremental mode, only the
+        position of each sentence in the predictions file is kept, and the sentences are read again
+        from it, one intent at a time, while the incremental data is saved.
+
+        :param predictions: Predictions file.
+        :param sentences: List of intent and text pairs in the order of the NLU files.
+        :return: Sentences with the highest and the lowest confidences.
+        """
+        self.aggregator = NluAggregator()
+        positions = {}
+        for position, item in self._expected_items(predictions.stream_positions(), sentences):
+            self.aggregator.add(NluRecord.from_item(item))
+            if self.nlu_incremental:
+                positions.setdefault(item["intent"], []).append(position)
+        if not self._is_partial(self.aggregator.total, len(sentences)):
+            self._save_incremental_data({
+                intent: predictions.read_positions(intent_positions) for intent, intent_positions in positions.items()
+            })
+        logging.info(
+            f"Total of {self.aggregator.total} extracted sentences. Only the {len(self.aggregator.sentences)} "
+            f"sentence(s) with the highest and lowest confidences are kept in memory."
+        )
+        self._data = self.aggregator.sentences
+        return self._data
+
+    def _request_texts(self, executor: ThreadPoolExecutor, texts: List[str]) -> Iterator[type_aliases.nlu_payload]:
+        """
+        Request the NLU payloads of the sentences with the executor workers. When the backend
+        parses sentences in batches, they are sent in chunks of its batch size. Once the NLU
+        processing is stopped, the remaining sentences aren't requested and their payload is None.
+
+        :param executor: Executor of the requests.
+        :param texts: Sentences.
+        :return: NLU payloads, in the same order of the sentences.
+        """
+        batch_size = self.backend.batch_size or 1
+        batches = [texts[index:index + batch_size] for index in range(0, len(texts), batch_size)]
+        return itertools.chain.from_iterable(executor.map(self._request_batch, batches))
+
+    def _request_batch(self, texts: List[str]) -> List[Optional[type_aliases.nlu_payload]]:
+        """
+        Request the NLU payloads of a chunk of sentences, unless the NLU processing was stopped. The
+        NLU processing is stopped when the NLU backend can't parse sentences anymore.
+
+        :param texts: Sentences.
+        :return: NLU payloads, or None for every sentence if the NLU processing was stopped.
+        """
+        if self._is_stopped():
+            return [None] * len(texts)
+        try:
+            if self.backend.batch_size:
+                return self.request_nlu_batch(texts)
+            return [self.request_nlu(text) for text in texts]
+        except NluBackendUnavailableError as error:
+            if self._stop_reason is None:
+                self._stop_reason = "endpoints_ejected"
+                logging.error(f"{error} The remaining sentences will not be requested.")
+            return [None] * len(texts)
+
+    def _request_baseline_texts(
+        self,
+        executor: ThreadPoolExecutor,
+        texts: List[str]
+    ) -> Iterator[Optional[type_aliases.nlu_payload]]:
+        """
+        Request the NLU payloads of the sentences to the baseline Rasa API, at the same time as
+        they're requested to the NLU backend.
+
+        :param executor: Executor of the baseline requests.
+        :param texts: Sentences.
+        :return: NLU payloads, or None for every sentence if there is no baseline.
+        """
+        if not self.baseline:
+            return itertools.repeat(None)
+        return executor.map(lambda text: None if self._is_stopped() else self._request_baseline(text), texts)
+
+    def _request_baseline(self, text: str) -> type_aliases.nlu_payload:
+        """
+        Request the NLU payload of a sentence to the baseline Rasa API.
+
+        :param text: Sentence.
+        :return: NLU payload or an empty dict if the baseline Rasa API couldn't parse it.
+        """
+        try:
+            return self.baseline.parse(text)
+        except NluBackendUnavailableError as error:
+            logging.warning(f"Baseline {error}")
+            return {}
+
+    def _compare_baseline_payload(self, item: type_aliases.nlu_payload, payload: type_aliases.nlu_payload) -> None:
+        """
+        Compare a processed sentence with the prediction of the baseline Rasa API. Sentences the
+        baseline Rasa API couldn't parse aren't compared and are counted as missing.
+
+        :param item: Processed sentence predicted by the NLU backend.
+        :param payload: NLU payload returned from the baseline Rasa API.
+        """
+        if self._is_valid_payload(payload):
+            self._compare_baseline(item, self._build_item(item["intent"], item["text"], payload))
+        else:
+            self.baseline_missing += 1
+            logging.warning(f"Baseline Rasa API couldn't parse the sentence: {item['text']}")
+
+    def _compare_baseline(self, item: type_aliases.nlu_payload, baseline_item: type_aliases.nlu_payload) -> None:
+        """
+        Count a sentence predicted by the baseline model and keep it when its prediction changed.
+
+        :param item: Processed sentence predicted by the NLU backend.
+        :param baseline_item: Processed sentence predicted by the baseline Rasa API.
+        """
+        self.baseline_aggregator.add(NluRecord.from_item(baseline_item))
+        if item["predicted_intent"] != baseline_item["predicted_intent"] or \
+                item["understood"] != baseline_item["understood"]:
+            self._baseline_changes.append({
+                "intent": item["intent"],
+                "text": item["text"],
+                "baseline_predicted_intent": baseline_item["predicted_intent"],
+                "baseline_confidence": baseline_item["confidence"],
+                "baseline_understood": baseline_item["understood"],
+                "predicted_intent": item["predicted_intent"],
+                "confidence": item["confidence"],
+                "understood": item["understood"]
+            })
+
+    def _is_stopped(self) -> bool:
+        """
+        If the NLU processing was stopped, because the time budget ran out or the minimum score
+        can't be reached anymore.
+
+        :return: True if no more sentences should be requested.
+        """
+        if self._stop_reason is None and self._deadline is not None and time.monotonic() >= self._deadline:
+            self._stop_reason = "time_budget"
+            logging.warning(
+                f"NLU time budget of {self.nlu_time_budget}s ran out. The remaining sentences will not be requested."
+            )
+        return self._stop_reason is not None
+
+    def _problem_weights(self, sentences: List[Tuple[str, str]]) -> Dict[str, float]:
+        """
+        Calculate how much a problem sentence of each intent lowers the NLU score. As in _estimate_score,
+        the intents of a sample are weighted by their number of examples.
+
+        :param sentences: List of intent and text pairs of the analyzed sentences.
+        :return: Score lost by a problem sentence of each intent.
+        """
+        sizes = Counter(intent for intent, _ in sentences)
+        populations = {
+            intent: max(self._population.get(intent, size), size) if self.is_sampled() else size
+            for intent, size in sizes.items()
+        }
+        total = sum(populations.values())
+        return {intent: populations[intent] / total / size for intent, size in sizes.items()}
+
+    def _check_fail_threshold(self, problem_rate: float) -> None:
+        """
+        Stop the NLU processing when the minimum score can't be reached anymore, even if all the
+        remaining sentences are understood.
+
+        :param problem_rate: Score lost by the problem sentences found so far, see _problem_weights.
+        """
+        if self.nlu_fail_threshold is None or self._stop_reason is not None:
+            return None
+        best_score = 1 - problem_rate
+        if best_score < self.nlu_fail_threshold and not math.isclose(best_score, self.nlu_fail_threshold):
+            self._stop_reason = "fail_threshold"
+            logging.error(
+                f"NLU score can't reach the minimum of {self.nlu_fail_threshold}: the best possible score is "
+                f"{best_score:.3f}. The remaining sentences will not be requested."
+            )
+
+    @staticmethod
+    def _group_sentences(
+        data: List[type_aliases.nlu_payload]
+    ) -> Dict[Tuple[str, str], deque]:
+        """
+        Group processed sentences by their intent and text.
+
+        :param data: Processed sentences.
+        :return: Queue of processed sentences for each intent and text.
+        """
+        groups = {}
+        for item in data:
+            groups.setdefault((item["intent"], item["text"]), deque()).append(item)
+        return groups
+
+    @staticmethod
+    def _group_outcomes(
+        items: Iterable[Tuple[int, type_aliases.nlu_payload]]
+    ) -> Dict[Tuple[str, str], deque]:
+        """
+        Group the outcome of processed sentences by their intent and text, keeping only their
+        position in the file they're read from, so they can be read again with read_positions.
+
+        :param items: Position and processed sentence.
+        :return: Queue of positions and "understood" flags for each intent and text.
+        """
+        groups = {}
+        for position, item in items:
+            groups.setdefault((item["intent"], item["text"]), deque()).append((position, item["understood"]))
+        return groups
+
+    @staticmethod
+    def _hash_examples(examples: Union[List[str], Dict[str, List[str]]]) -> str:
+        """
+        Hash the examples block of an intent, or the examples of all intents.
+
+        :param examples: Intent examples, or examples by intent.
+        :return: Content hash.
+        """
+        return hashlib.sha1(json.dumps(examples, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+    def _load_incremental_data(self) -> Dict[Tuple[str, str], deque]:
+        """
+        Find the processed sentences of the intents that didn't change since the previous run,
+        streaming the incremental file instead of loading it.
+
+        Nothing is reused when the incremental mode is disabled or the model fingerprint changed.
+
+        :return: Positions in the incremental file and outcomes of the sentences, see _group_outcomes.
+        """
+        if not self.nlu_incremental:
+            return {}
+        if not self.fingerprint:
+            logging.warning("Could not get the model fingerprint from Rasa API. All intents will be requested.")
+            return {}
+        incremental = NluPredictions(self.nlu_incremental_path, self.fingerprint)
+        header = incremental.read_header()
+        if header.get("fingerprint") != self.fingerprint:
+            logging.info("Model fingerprint changed since the previous run. All intents will be requested.")
+            return {}
+        hashes = header.get("intents", {})
+        unchanged = {
+            intent for intent, examples in self._data.items() if hashes.get(intent) == self._hash_examples(examples)
+        }
+        logging.info(f"{len(unchanged)} of {len(self._data)} intent(s) didn't change since the previous run.")
+        return self._group_outcomes(
+            (position, item) for position, item in incremental.stream_positions() if item["intent"] in unchanged
+        )
+
+    def _save_incremental_data(self, intents_data: Dict[str, Iterable[type_aliases.nlu_payload]]) -> None:
+        """
+        Save the processed data and the examples hash of each intent, to be reused by the next run.
+
+        The file has the same JSONL format of the predictions file, with the examples hashes in its
+        header, and is written one sentence at a time, so the processed data of each intent can be
+        streamed from the predictions file.
+
+        :param intents_data: Processed sentences data of each intent.
+        """
+        if not self.nlu_incremental or not self.fingerprint:
+            return None
+        try:
+            file = open(self.nlu_incremental_path, "w", encoding="utf-8")
+            hashes = {intent: self._hash_examples(examples) for intent, examples in self._data.items()}
+            file.write(json.dumps({"fingerprint": self.fingerprint, "intents": hashes}, ensure_ascii=False) + "\n")
+            for intent in self._data:
+                for item in intents_data.get(intent, []):
+                    file.write(json.dumps(item, ensure_ascii=False) + "\n")
+            file.close()
+            logging.info(f"{self.nlu_incremental_path} file successfully saved.")
+        except FileNotFoundError as error:
+            logging.error(f"Could not save the file: {self.nlu_incremental_path}. Error: {error}.")
+
+    @staticmethod
+    def _is_valid_payload(payload: Optional[type_aliases.nlu_payload]) -> bool:
+        """
+        Check if an NLU payload has a predicted intent. A failed request returns an empty payload.
+
+        :param payload: NLU payload returned from the NLU backend.
+        :return: True if the payload can be processed.
+        """
+        intent = payload.get("intent") if isinstance(payload, dict) else None
+        if not isinstance(intent, dict) or not intent.get("name"):
+            return False
+        if intent["name"] == "nlu_fallback":
+            ranking = payload.get("intent_ranking") or []
+            return len(ranking) > 1 and isinstance(ranking[1], dict) and bool(ranking[1].get("name"))
+        return True
+
+    def _build_item(
+        self,
+        intent: str,
+        text: str,
+        nlu_requested: type_aliases.nlu_payload
+    ) -> type_aliases.nlu_payload:
+        """
+        Build the processed data item of a sentence from its NLU payload.
+
+        :param intent: Expected intent.
+        :param text: Sentence without Rasa entity syntax.
+        :param nlu_requested: NLU payload returned from Rasa API.
+        :return: Processed sentence data.
+        """
+        predicted_intent = self.select_intent(nlu_requested)
+        item = {
+            "intent": intent,
+            "text": text,
+            "confidence": predicted_intent.get("confidence"),
+            "predicted_intent": predicted_intent.get("name"),
+            "intent_ranking": nlu_requested.get("intent_ranking", [])[:4]
+        }
+        item["understood"] = predicted_intent.get("nlu_fallback", False) or intent != predicted_intent["name"]
+        entity_scores = self._score_entities(self._gold_entities.get((intent, text), []), nlu_requested)
+        if entity_scores:
+            item["entity_scores"] = entity_scores
+        return item
+
+    @staticmethod
+    def _score_entities(
+        entities: List[type_aliases.entity],
+        nlu_requested: type_aliases.nlu_payload
+    ) -> Dict[str, List[int]]:
+        """
+        Compare the annotated entities of a sentence with the entities of its NLU payload. An entity
+        is correct when its name, offsets, role and group are the same as the annotated ones.
+
+        :param entities: Annotated entities of the sentence.
+        :param nlu_requested: NLU payload returned from Rasa API.
+        :return: Number of true positives, false positives and false negatives by entity.
+        """
+        def key(entity: type_aliases.entity) -> tuple:
+            return entity.get("entity"), entity.get("start"), entity.get("end"), entity.get("role"), entity.get("group")
+
+        expected = {key(entity) for entity in entities}
+        predicted = {key(entity) for entity in nlu_requested.get("entities") or []}
+        scores = {}
+        for index, keys in enumerate((expected & predicted, predicted - expected, expected - predicted)):
+            for entity_key in keys:
+                scores.setdefault(entity_key[0], [0, 0, 0])[index] += 1
+        return scores
+
+    def _load_problem_sentences(self) -> List[NluRecord]:
         """
         Load problem sentences list.
 
         :return: Problem sentences list.
         """
+        if self.aggregator:
+            self._problem_sentences = self.aggregator.problem_sentences
+            return self._problem_sentences
         self._problem_sentences = [
             sentence for sentence in self._data if sentence.get("understood", False)
         ]
         return self._problem_sentences
 
     @property
-    def data(self) -> List[type_aliases.nlu_payload]:
+    def data(self) -> List[NluRecord]:
         """
         Return a copy of the generated data.
 
@@ -153,7 +944,7 @@ class NluController(Controller):
         return self._data.copy()
 
     @property
-    def problem_sentences(self) -> List[type_aliases.nlu_payload]:
+    def problem_sentences(self) -> List[NluRecord]:
         """
         Return a copy of the generated problem sentences.
 
@@ -170,35 +961,209 @@ class NluController(Controller):
         """
         return self._overall_score
 
+    @property
+    def total_sentences(self) -> int:
+        """
+        Return the number of analyzed sentences, including those not kept in memory in streaming mode.
+
+        :return: Number of analyzed sentences.
+        """
+        return self.aggregator.total if self.aggregator else len(self._data)
+
+    @property
+    def entity_scores(self) -> List[Dict[str, Union[str, float, int]]]:
+        """
+        Return the scores of the entities predicted in the NLU sentences.
+
+        :return: Precision, recall, F1 score and number of annotated examples of each entity.
+        """
+        return list(self._entity_scores.values())
+
+    @property
+    def baseline_score(self) -> Optional[float]:
+        """
+        Return the NLU score of the model of the baseline Rasa API.
+
+        :return: Baseline NLU score or None if the models weren't compared.
+        """
+        return self._baseline_score
+
+    @property
+    def baseline_changes(self) -> List[Dict[str, Any]]:
+        """
+        Return the sentences whose predicted intent or understood flag changed between the
+        baseline model and the current model.
+
+        :return: Copy of the changed sentences list.
+        """
+        return self._baseline_changes.copy()
+
+    @property
+    def partial(self) -> Optional[Dict[str, Union[str, int]]]:
+        """
+        Return why the NLU processing was stopped before analyzing all sentences.
+
+        :return: Stop reason ("time_budget" or "fail_threshold") and the number of analyzed and
+            total sentences, or None if all sentences were analyzed.
+        """
+        return self._partial
+
+    @property
+    def confidence_interval(self) -> Optional[Tuple[float, float]]:
+        """
+        Return the confidence interval of the estimated overall score, when sampling is enabled.
+
+        :return: Lower and upper bounds of the confidence interval.
+        """
+        return self._confidence_interval
+
+    @property
+    def performance(self) -> Optional[Dict[str, Union[int, float, list]]]:
+        """
+        Return the latency summary of the requests sent to the NLU backend.
+
+        :return: Latency summary, with the number of requests saved by deduplication, or None if
+            no request was sent.
+        """
+        if not self.backend.latency.requests:
+            return None
+        return dict(self.backend.latency.summary(), saved_requests=self.deduplicated)
+
     def _calculate_overall_score(self) -> Optional[float]:
         """
         Calculate the overall score value.
 
+        When only a sample of the sentences is analyzed, the score is the stratified estimate,
+        weighting each intent by its number of examples, and its confidence interval is calculated.
+
         :return: Overall score value.
         """
-        total_sentences = len(self._data)
-        if not total_sentences:
-            return None
-        total_problem_sentences = len(self._problem_sentences)
-        self._overall_score = 1 - total_problem_sentences / total_sentences
+        if self.aggregator:
+            intents = self.aggregator.intents
+        else:
+            intents = {}
+            for item in self._data:
+                stats = intents.setdefault(item["intent"], {"total": 0, "problems": 0})
+                stats["total"] += 1
+                stats["problems"] += int(item["understood"])
+        self._overall_score, self._confidence_interval = self._estimate_score(intents)
+        if self._confidence_interval:
+            logging.info(
+                f"Estimated NLU score: {self._overall_score:.3f} (95% confidence interval: "
+                f"{self._confidence_interval[0]:.3f} - {self._confidence_interval[1]:.3f})."
+            )
+        if self.baseline_aggregator:
+            self._baseline_score = self._estimate_score(self.baseline_aggregator.intents)[0]
         return self._overall_score
 
+    def _calculate_entity_scores(self) -> List[Dict[str, Union[str, float, int]]]:
+        """
+        Calculate the precision, recall and F1 score of each entity annotated in the NLU sentences
+        or predicted by the model.
+
+        :return: Entity scores, sorted by entity name.
+        """
+        if self.aggregator:
+            totals = self.aggregator.entity_scores
+        else:
+            totals = {}
+            for item in self._data:
+                for entity, scores in (item.get("entity_scores") or {}).items():
+                    entity_totals = totals.setdefault(entity, [0, 0, 0])
+                    for index, score in enumerate(scores):
+                        entity_totals[index] += score
+        self._entity_scores = {}
+        for entity, (true_positives, false_positives, false_negatives) in sorted(totals.items()):
+            precision = true_positives / (true_positives + false_positives) if true_positives else 0
+            recall = true_positives / (true_positives + false_negatives) if true_positives else 0
+            self._entity_scores[entity] = {
+                "name": entity,
+                "precision": precision,
+                "recall": recall,
+                "f1-score": 2 * precision * recall / (precision + recall) if true_positives else 0,
+                "support": true_positives + false_negatives
+            }
+        return self.entity_scores
+
+    def _estimate_score(
+        self,
+        intents: Dict[str, Dict[str, int]]
+    ) -> Tuple[Optional[float], Optional[Tuple[float, float]]]:
+        """
+        Estimate the NLU score from the number of analyzed and problem sentences of each intent.
+
+        :param intents: Number of analyzed ("total") and problem ("problems") sentences by intent.
+        :return: Score and its confidence interval, which is None when all sentences are analyzed.
+        """
+        total_sentences = sum(stats["total"] for stats in intents.values())
+        if not total_sentences:
+            return None, None
+        if not self.is_sampled():
+            total_problem_sentences = sum(stats["problems"] for stats in intents.values())
+            return 1 - total_problem_sentences / total_sentences, None
+        # Agresti-Coull interval of each intent, so it keeps its width when all or none of the sentences of an
+        # intent are understood.
+        z_squared = constants.NLU_CONFIDENCE_Z ** 2
+        population = sum(self._population.get(intent, stats["total"]) for intent, stats in intents.items())
+        problem_rate = 0
+        adjusted_problem_rate = 0
+        variance = 0
+        for intent, stats in intents.items():
+            size = stats["total"]
+            intent_population = max(self._population.get(intent, size), size)
+            weight = intent_population / population
+            finite_population_correction = 1 - size / intent_population
+            adjusted_rate = (stats["problems"] + z_squared / 2) / (size + z_squared)
+            problem_rate += weight * stats["problems"] / size
+            adjusted_problem_rate += weight * adjusted_rate
+            variance += (
+                weight ** 2 * finite_population_correction * adjusted_rate * (1 - adjusted_rate) / (size + z_squared)
+            )
+        score = 1 - problem_rate
+        margin = constants.NLU_CONFIDENCE_Z * math.sqrt(variance)
+        lower = max(0, min(score, 1 - adjusted_problem_rate - margin))
+        upper = min(1, max(score, 1 - adjusted_problem_rate + margin))
+        return score, (lower, upper)
+
     def request_nlu(self, text: str) -> type_aliases.nlu_payload:
         """
-        Function that requests the NLU payload to the Rasa API.
+        Function that requests the NLU payload to the NLU backend.
+
+        If the NLU cache is enabled, it's consulted before requesting the backend.
 
         :param text: Sentence.
         :return: NLU payload.
         """
-        response = utils.request(
-            method="POST",
-            url=f"{self.url}/model/parse",
-            json={"text": text}
-        )
-        if response and response.status_code == 200:
-            data = response.json()
-            return data
-        return {}
+        if self.cache is not None:
+            cached = self.cache.get(text)
+            if cached is not None:
+                return cached
+        data = self.backend.parse(text)
+        if self.cache is not None and self._is_valid_payload(data):
+            self.cache.set(text, data)
+        return data
+
+    def request_nlu_batch(self, texts: List[str]) -> List[type_aliases.nlu_payload]:
+        """
+        Function that requests the NLU payloads of several sentences to the NLU backend at once.
+
+        If the NLU cache is enabled, the cached sentences aren't requested. The sentences the backend
+        couldn't parse get an empty payload, so they're counted as failed.
+
+        :param texts: Sentences.
+        :return: NLU payloads, in the same order of the sentences.
+        """
+        payloads = [self.cache.get(text) if self.cache is not None else None for text in texts]
+        pending = [text for text, payload in zip(texts, payloads) if payload is None]
+        if not pending:
+            return payloads
+        results = [result if result is not None else {} for result in self.backend.parse_batch(pending)]
+        if self.cache is not None:
+            for text, result in zip(pending, results):
+                if self._is_valid_payload(result):
+                    self.cache.set(text, result)
+        results = iter(results)
+        return [payload if payload is not None else next(results) for payload in payloads]
 
     @staticmethod
     def _extract_sentences(text: str) -> List[str]:
@@ -218,15 +1183,7 @@ class NluController(Controller):
         :param text: Text with Rasa entity syntax.
         :return: Text without Rasa entity syntax.
         """
-        letter = "[A-Za-z0-9áàâãéèêíïóôõöúçñÁÀÂÃÉÈÍÏÓÔÕÖÚÇÑ_\\-'\"\\s]"
-        regex = f"(\\[{letter}+\\](\\({letter}+\\)|{{\"entity\":{letter}+,(\\s+)?\"value\":{letter}+}}))"
-        matched = re.findall(regex, text)
-        if matched:
-            for match in matched:
-                word = re.findall(f"\\[{letter}+\\]", match[0])[0]
-                word = word.replace("[", "").replace("]", "")
-                text = text.replace(match[0], word)
-        return text
+        return utils.parse_entity_annotations(text)[0]
 
     @staticmethod
     def select_intent(payload: type_aliases.nlu_payload) -> Dict[str, type_aliases.nlu_payload]:
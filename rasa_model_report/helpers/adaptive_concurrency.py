@@ -0,0 +1,141 @@
+import logging
+import math
+import threading
+from collections import deque
+
+from rasa_model_report.helpers import constants
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD controller of the number of in-flight requests to the Rasa API.
+
+    The limit grows by one request after each round of successful requests while the p95 latency
+    stays under the target, and it's cut by half on errors or latency spikes.
+    """
+    def __init__(
+        self,
+        max_limit: int,
+        latency_target: float = constants.NLU_LATENCY_TARGET,
+        min_limit: int = 1,
+        window_size: int = constants.NLU_LATENCY_WINDOW
+    ) -> None:
+        """
+        __init__ method.
+
+        :param max_limit: Maximum number of in-flight requests.
+        :param latency_target: Target of p95 latency in seconds.
+        :param min_limit: Minimum number of in-flight requests.
+        :param window_size: Number of latest latencies used to calculate the p95 latency.
+        """
+        self.max_limit: int = max(min_limit, max_limit)
+        self.min_limit: int = min_limit
+        self.latency_target: float = latency_target
+        self.limit: int = min_limit
+        self.peak_limit: int = min_limit
+        self.in_flight: int = 0
+        self.requests: int = 0
+        self.errors: int = 0
+        self.retries: int = 0
+        self._latencies: deque = deque(maxlen=window_size)
+        self._round: int = 0
+        self._since_decrease: int = self.max_limit
+        self._condition: threading.Condition = threading.Condition()
+
+    @staticmethod
+    def percentile(values: list, percent: float) -> float:
+        """
+        Calculate a percentile by the nearest-rank method.
+
+        :param values: Values.
+        :param percent: Percentile, between 0 and 100.
+        :return: Percentile value.
+        """
+        if not values:
+            return 0
+        ordered = sorted(values)
+        index = max(0, math.ceil(percent / 100 * len(ordered)) - 1)
+        return ordered[min(index, len(ordered) - 1)]
+
+    def acquire(self) -> None:
+        """
+        Wait until a new request can be sent without exceeding the limit.
+        """
+        with self._condition:
+            while self.in_flight >= self.limit:
+                self._condition.wait()
+            self.in_flight += 1
+
+    def cancel(self) -> None:
+        """
+        Give back an acquired request that wasn't sent.
+        """
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def release(self, latency: float, error: bool = False, retries: int = 0) -> None:
+        """
+        Register a finished request and adjust the limit.
+
+        :param latency: Request latency in seconds.
+        :param error: If the request failed.
+        :param retries: Number of retries made by the request.
+        """
+        with self._condition:
+            self.in_flight -= 1
+            self.requests += 1
+            self.retries += retries
+            self._round += 1
+            self._since_decrease += 1
+            if error:
+                self.errors += 1
+                self._decrease("request error")
+            else:
+                self._latencies.append(latency)
+                if self._round >= self.limit:
+                    p95 = self.percentile(list(self._latencies), 95)
+                    if p95 > self.latency_target:
+                        self._decrease(f"p95 latency of {p95:.3f}s")
+                    else:
+                        self._increase()
+            self._condition.notify_all()
+
+    def _increase(self) -> None:
+        """
+        Increase the limit by one request.
+        """
+        self._round = 0
+        if self.limit < self.max_limit:
+            self.limit += 1
+            self.peak_limit = max(self.peak_limit, self.limit)
+            logging.info(f"Adaptive concurrency: increased to {self.limit} in-flight request(s).")
+
+    def _decrease(self, reason: str) -> None:
+        """
+        Cut the limit by half. The limit is cut at most once by round, to not collapse on a burst of errors.
+
+        :param reason: Reason of the decrease.
+        """
+        if self._since_decrease < self.limit:
+            return None
+        self._round = 0
+        self._since_decrease = 0
+        self._latencies.clear()
+        new_limit = max(self.min_limit, self.limit // 2)
+        if new_limit != self.limit:
+            self.limit = new_limit
+            logging.warning(
+                f"Adaptive concurrency: decreased to {self.limit} in-flight request(s) because of {reason}."
+            )
+
+    def summary(self) -> str:
+        """
+        Summary of the controller statistics.
+
+        :return: Summary text.
+        """
+        return (
+            f"Adaptive concurrency: final level of {self.limit} and peak of {self.peak_limit} in-flight request(s), "
+            f"{self.requests} request(s), {self.errors} error(s) and {self.retries} retry(ies)."
+        )
@@ -1,11 +1,42 @@
+CLEAR_CACHE = False
 DISABLE_NLU = False
 SCORE_PRECISION = 2
 NO_IMAGES = False
+JOBS = 1
+NO_NLU_CACHE = False
+NLU_BATCH_SIZE = 32
+NLU_CACHE_SIZE = 50000
+NLU_CHECKPOINT_INTERVAL = 100
+NLU_CONCURRENCY = 1
+NLU_CONFIDENCE_Z = 1.96
+NLU_ADAPTIVE = False
+NLU_INCREMENTAL = False
+NLU_LATENCY_TARGET = 1.0
+NLU_LATENCY_WINDOW = 100
+NLU_LATENCY_BUCKET_GROWTH = 1.05
+NLU_SAMPLE_RATE = 1.0
+NLU_SAMPLE_SEED = 42
+NLU_POOL_SIZE = 10
+NLU_SLOWEST_SENTENCES = 10
+NLU_STREAMING = False
+NLU_STREAMING_SENTENCES = 50
 OUTPUT_PATH = "./"
 PROJECT_NAME = "My project"
 PROJECT_VERSION = None
 RASA_API_URL = "http://localhost:5005"
+RASA_API_TIMEOUT = 30
+RASA_API_RETRIES = 2
+RASA_API_BACKOFF_FACTOR = 3
+RASA_API_ADAPTIVE_BACKOFF_FACTOR = 0.2
+RASA_API_RETRY_STATUSES = (502, 503, 504)
 RASA_PATH = "./"
 RASA_VERSION = None
+RESUME = False
 EXCLUDE = []
+LOAD_TEST_DURATION = 60
+LOAD_TEST_ERROR_RATE = 0.01
+LOAD_TEST_MAX_IN_FLIGHT = 100
+LOAD_TEST_WINDOW = 5
 VERSION = "1.5.0"
+YAML_CACHE_HASH = False
+YAML_CACHE_SIZE = 64
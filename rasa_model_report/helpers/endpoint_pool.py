@@ -0,0 +1,75 @@
+import logging
+import threading
+from typing import Dict
+from typing import List
+from typing import Optional
+
+
+class EndpointPool:
+    """
+    Pool of Rasa API endpoints that balances the requests by least outstanding requests.
+    """
+    def __init__(self, urls: List[str]) -> None:
+        """
+        __init__ method.
+
+        :param urls: Rasa API URLs.
+        """
+        self.urls: List[str] = list(dict.fromkeys(urls))
+        self._healthy: List[str] = list(self.urls)
+        self._outstanding: Dict[str, int] = {url: 0 for url in self.urls}
+        self._served: Dict[str, int] = {url: 0 for url in self.urls}
+        self._lock: threading.Lock = threading.Lock()
+
+    @property
+    def healthy(self) -> List[str]:
+        """
+        Get the healthy endpoints.
+
+        :return: Copy of healthy endpoints list.
+        """
+        return self._healthy.copy()
+
+    @property
+    def served(self) -> Dict[str, int]:
+        """
+        Get the number of requests served by each endpoint.
+
+        :return: Copy of served requests by endpoint.
+        """
+        return self._served.copy()
+
+    def acquire(self) -> Optional[str]:
+        """
+        Select the healthy endpoint with fewer outstanding requests. Ties are broken by the
+        number of requests already served.
+
+        :return: Endpoint URL or None if there is no healthy endpoint.
+        """
+        with self._lock:
+            if not self._healthy:
+                return None
+            url = min(self._healthy, key=lambda item: (self._outstanding[item], self._served[item]))
+            self._outstanding[url] += 1
+            self._served[url] += 1
+            return url
+
+    def release(self, url: str) -> None:
+        """
+        Release an endpoint acquired before.
+
+        :param url: Endpoint URL.
+        """
+        with self._lock:
+            self._outstanding[url] -= 1
+
+    def eject(self, url: str) -> None:
+        """
+        Remove an unhealthy endpoint from the pool.
+
+        :param url: Endpoint URL.
+        """
+        with self._lock:
+            if url in self._healthy:
+                self._healthy.remove(url)
+                logging.warning(f"Rasa API {url} is unhealthy and was removed from the pool.")
@@ -0,0 +1,129 @@
+import heapq
+import math
+import threading
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Union
+
+from rasa_model_report.helpers import constants
+
+
+class LatencyHistogram:
+    """
+    Histogram of the Rasa API request latencies.
+
+    Latencies are counted in logarithmic buckets, so the memory doesn't grow with the number of
+    requests and the percentiles have a relative error lower than the bucket growth. The slowest
+    sentences are kept in a bounded heap.
+    """
+    MIN_LATENCY = 1e-6
+
+    def __init__(
+        self,
+        slowest_size: int = constants.NLU_SLOWEST_SENTENCES,
+        growth: float = constants.NLU_LATENCY_BUCKET_GROWTH
+    ) -> None:
+        """
+        __init__ method.
+
+        :param slowest_size: Number of slowest sentences kept.
+        :param growth: Ratio between the upper bounds of two consecutive buckets.
+        """
+        self.slowest_size: int = slowest_size
+        self.growth: float = growth
+        self.requests: int = 0
+        self.errors: int = 0
+        self.max: float = 0
+        self._buckets: Dict[int, int] = {}
+        self._slowest: list = []
+        self._first_start: Optional[float] = None
+        self._last_end: Optional[float] = None
+        self._lock: threading.Lock = threading.Lock()
+
+    def _bucket(self, latency: float) -> int:
+        """
+        Get the bucket of a latency.
+
+        :param latency: Latency in seconds.
+        :return: Bucket index.
+        """
+        return max(0, math.ceil(math.log(max(latency, self.MIN_LATENCY) / self.MIN_LATENCY, self.growth)))
+
+    def record(self, start: float, end: float, text: str, error: bool = False) -> None:
+        """
+        Record a finished request.
+
+        :param start: Request start time, from time.perf_counter.
+        :param end: Request end time, from time.perf_counter.
+        :param text: Requested sentence.
+        :param error: If the request failed.
+        """
+        latency = end - start
+        with self._lock:
+            self.requests += 1
+            self.errors += int(error)
+            self.max = max(self.max, latency)
+            bucket = self._bucket(latency)
+            self._buckets[bucket] = self._buckets.get(bucket, 0) + 1
+            self._first_start = start if self._first_start is None else min(self._first_start, start)
+            self._last_end = end if self._last_end is None else max(self._last_end, end)
+            if len(self._slowest) < self.slowest_size:
+                heapq.heappush(self._slowest, (latency, text))
+            elif self._slowest and latency > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, (latency, text))
+
+    def percentile(self, percent: float) -> float:
+        """
+        Calculate a latency percentile by the nearest-rank method.
+
+        :param percent: Percentile, between 0 and 100.
+        :return: Upper bound of the percentile bucket, limited by the maximum latency.
+        """
+        if not self.requests:
+            return 0
+        rank = max(1, math.ceil(percent / 100 * self.requests))
+        count = 0
+        for bucket in sorted(self._buckets):
+            count += self._buckets[bucket]
+            if count >= rank:
+                return min(self.MIN_LATENCY * self.growth ** bucket, self.max)
+        return self.max
+
+    @property
+    def throughput(self) -> float:
+        """
+        Requests per second, from the start of the first request to the end of the last one.
+
+        :return: Throughput.
+        """
+        if not self.requests or self._last_end <= self._first_start:
+            return 0
+        return self.requests / (self._last_end - self._first_start)
+
+    @property
+    def slowest(self) -> List[Dict[str, Union[str, float]]]:
+        """
+        Get the slowest sentences.
+
+        :return: Slowest sentences and their latencies, from the slowest.
+        """
+        return [{"text": text, "latency": latency} for latency, text in sorted(self._slowest, reverse=True)]
+
+    def summary(self) -> Dict[str, Union[int, float, list]]:
+        """
+        Summary of the latencies.
+
+        :return: Number of requests and errors, latency percentiles and maximum in seconds,
+            throughput in requests per second and slowest sentences.
+        """
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "max": self.max,
+            "throughput": self.throughput,
+            "slowest": self.slowest
+        }
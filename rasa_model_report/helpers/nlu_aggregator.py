@@ -0,0 +1,87 @@
+import heapq
+import itertools
+from typing import Dict
+from typing import List
+
+from rasa_model_report.helpers import constants
+from rasa_model_report.helpers import type_aliases
+
+
+class NluAggregator:
+    """
+    Streaming aggregation of the processed NLU sentences.
+
+    Each sentence updates the counters of its intent as it's added, and only the problem sentences
+    and the sentences with the highest and the lowest confidences are kept, in bounded heaps.
+    """
+    def __init__(self, top_size: int = constants.NLU_STREAMING_SENTENCES) -> None:
+        """
+        __init__ method.
+
+        :param top_size: Number of sentences kept with the highest and with the lowest confidences.
+        """
+        self.top_size: int = top_size
+        self.total: int = 0
+        self.problems: int = 0
+        self.intents: Dict[str, Dict[str, int]] = {}
+        self.entity_scores: Dict[str, List[int]] = {}
+        self._problem_sentences: List[type_aliases.nlu_payload] = []
+        self._highest: list = []
+        self._lowest: list = []
+        self._counter: itertools.count = itertools.count()
+
+    def add(self, item: type_aliases.nlu_payload) -> None:
+        """
+        Add a processed sentence.
+
+        :param item: Processed sentence.
+        """
+        self.total += 1
+        stats = self.intents.setdefault(item["intent"], {"total": 0, "problems": 0})
+        stats["total"] += 1
+        for entity, scores in (item.get("entity_scores") or {}).items():
+            totals = self.entity_scores.setdefault(entity, [0, 0, 0])
+            for index, score in enumerate(scores):
+                totals[index] += score
+        if item["understood"]:
+            self.problems += 1
+            stats["problems"] += 1
+            self._problem_sentences.append(item)
+        confidence = item["confidence"] or 0
+        order = next(self._counter)
+        if len(self._highest) < self.top_size:
+            heapq.heappush(self._highest, (confidence, -order, item))
+            heapq.heappush(self._lowest, (-confidence, order, item))
+        else:
+            heapq.heappushpop(self._highest, (confidence, -order, item))
+            heapq.heappushpop(self._lowest, (-confidence, order, item))
+
+    @staticmethod
+    def _sort(items: List[type_aliases.nlu_payload]) -> List[type_aliases.nlu_payload]:
+        """
+        Sort sentences by confidence, from the highest to the lowest.
+
+        :param items: Processed sentences.
+        :return: Sorted sentences.
+        """
+        return sorted(items, key=lambda item: item["confidence"] or 0, reverse=True)
+
+    @property
+    def sentences(self) -> List[type_aliases.nlu_payload]:
+        """
+        Get the sentences with the highest and the lowest confidences.
+
+        :return: Sentences sorted by confidence, without repetitions.
+        """
+        items = {-order: item for _, order, item in self._highest}
+        items.update({order: item for _, order, item in self._lowest})
+        return self._sort([items[order] for order in sorted(items)])
+
+    @property
+    def problem_sentences(self) -> List[type_aliases.nlu_payload]:
+        """
+        Get the problem sentences.
+
+        :return: Problem sentences sorted by confidence.
+        """
+        return self._sort(self._problem_sentences)
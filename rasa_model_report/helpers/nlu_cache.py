@@ -0,0 +1,121 @@
+import copy
+import hashlib
+import json
+import logging
+import os.path
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from rasa_model_report.helpers import constants
+from rasa_model_report.helpers import type_aliases
+
+
+class NluCache:
+    """
+    Persistent LRU cache of the NLU payloads returned by the Rasa API.
+
+    Each entry is keyed by the model fingerprint and the normalized sentence, so a new model
+    never reuses the predictions of the previous one.
+    """
+    def __init__(self, filename: str, fingerprint: str, max_size: int = constants.NLU_CACHE_SIZE) -> None:
+        """
+        __init__ method.
+
+        :param filename: Cache file path.
+        :param fingerprint: Fingerprint of the model loaded in the Rasa API.
+        :param max_size: Maximum number of entries. The least recently used entries are evicted first.
+        """
+        self.filename: str = filename
+        self.fingerprint: str = fingerprint
+        self.max_size: int = max_size
+        self.hits: int = 0
+        self.misses: int = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        """
+        Load the cache entries from the cache file.
+        """
+        if os.path.isfile(self.filename):
+            try:
+                file = open(self.filename, encoding="utf-8")
+                self._entries = OrderedDict(json.load(file).get("entries", {}))
+                file.close()
+                logging.info(f"{self.filename} file loaded successfully.")
+            except (ValueError, AttributeError) as error:
+                logging.warning(f"{self.filename} file is invalid and will be ignored. Error: {error}")
+                self._entries = OrderedDict()
+
+    def save(self) -> None:
+        """
+        Save the cache entries to the cache file.
+        """
+        with self._lock:
+            try:
+                file = open(self.filename, "w", encoding="utf-8")
+                json.dump({"entries": self._entries}, file)
+                file.close()
+                logging.info(f"{self.filename} file successfully saved.")
+            except FileNotFoundError as error:
+                logging.error(f"Could not save the file: {self.filename}. Error: {error}.")
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """
+        Normalize the sentence used in the cache key.
+
+        :param text: Sentence.
+        :return: Sentence without repeated or surrounding whitespaces.
+        """
+        return " ".join(text.split())
+
+    def key(self, text: str) -> str:
+        """
+        Build the cache key of a sentence.
+
+        :param text: Sentence.
+        :return: Cache key.
+        """
+        return hashlib.sha1(f"{self.fingerprint}\n{self.normalize(text)}".encode("utf-8")).hexdigest()
+
+    def get(self, text: str) -> Optional[type_aliases.nlu_payload]:
+        """
+        Get the cached NLU payload of a sentence.
+
+        :param text: Sentence.
+        :return: Copy of the cached NLU payload or None if the sentence isn't cached.
+        """
+        key = self.key(text)
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(payload)
+
+    def set(self, text: str, payload: type_aliases.nlu_payload) -> None:
+        """
+        Cache the NLU payload of a sentence.
+
+        :param text: Sentence.
+        :param payload: NLU payload returned from Rasa API.
+        """
+        key = self.key(text)
+        with self._lock:
+            self._entries[key] = copy.deepcopy(payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        """
+        Number of cached entries.
+
+        :return: Number of cached entries.
+        """
+        return len(self._entries)
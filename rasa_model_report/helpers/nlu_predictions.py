@@ -0,0 +1,230 @@
+import json
+import logging
+import os.path
+from typing import IO
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from rasa_model_report.helpers import constants
+from rasa_model_report.helpers import type_aliases
+
+
+class NluPredictions:
+    """
+    JSONL file where the processed NLU sentences are streamed as soon as they are predicted.
+
+    The first line is a header with the model fingerprint, and each following line is a processed sentence.
+    """
+    def __init__(
+        self,
+        filename: str,
+        fingerprint: Optional[str],
+        checkpoint_interval: int = constants.NLU_CHECKPOINT_INTERVAL
+    ) -> None:
+        """
+        __init__ method.
+
+        :param filename: Predictions file path.
+        :param fingerprint: Fingerprint of the model loaded in the Rasa API.
+        :param checkpoint_interval: Number of sentences written between two checkpoints.
+        """
+        self.filename: str = filename
+        self.fingerprint: Optional[str] = fingerprint
+        self.checkpoint_interval: int = checkpoint_interval
+        self._file: Optional[IO] = None
+        self._pending: int = 0
+        self._unsaved: Optional[List[type_aliases.nlu_payload]] = None
+
+    @staticmethod
+    def _iterate(filename: str) -> Iterator[Tuple[int, int, dict]]:
+        """
+        Iterate over the lines of a predictions file, reading one line at a time.
+
+        A truncated last line, left by an interrupted run, is ignored.
+
+        :param filename: Predictions file path.
+        :return: Line index, byte offset and data of each valid line.
+        """
+        if not os.path.isfile(filename):
+            return None
+        with open(filename, "rb") as file:
+            offset = 0
+            for index, line in enumerate(file):
+                try:
+                    yield index, offset, json.loads(line)
+                except ValueError:
+                    logging.warning(f"Ignoring invalid line {index + 1} of {filename} file.")
+                offset += len(line)
+
+    @staticmethod
+    def read(filename: str) -> Tuple[dict, List[type_aliases.nlu_payload]]:
+        """
+        Read a predictions file.
+
+        A truncated last line, left by an interrupted run, is ignored.
+
+        :param filename: Predictions file path.
+        :return: File header and processed sentences.
+        """
+        header = {}
+        items = []
+        for index, _, data in NluPredictions._iterate(filename):
+            if index == 0:
+                header = data
+            else:
+                items.append(data)
+        return header, items
+
+    def read_header(self) -> dict:
+        """
+        Read the header of the predictions file, without reading the processed sentences.
+
+        :return: File header, empty if the file or its header is missing.
+        """
+        index, _, header = next(self._iterate(self.filename), (None, None, {}))
+        return header if index == 0 else {}
+
+    def load(self) -> List[type_aliases.nlu_payload]:
+        """
+        Load the processed sentences predicted by the same model.
+
+        :return: Processed sentences or an empty list if the file belongs to another model.
+        """
+        if self._unsaved is not None:
+            return list(self._unsaved)
+        header, items = self.read(self.filename)
+        if header.get("fingerprint") != self.fingerprint:
+            return []
+        return items
+
+    def stream(self) -> Iterator[type_aliases.nlu_payload]:
+        """
+        Iterate over the processed sentences predicted by the same model, without loading the
+        whole file in memory.
+
+        :return: Processed sentences, nothing if the file belongs to another model.
+        """
+        for _, item in self.stream_positions():
+            yield item
+
+    def stream_positions(self) -> Iterator[Tuple[int, type_aliases.nlu_payload]]:
+        """
+        Iterate over the processed sentences predicted by the same model, with the position of each
+        one, so they can be read again with read_positions without keeping them in memory.
+
+        :return: Position and processed sentence, nothing if the file belongs to another model.
+        """
+        if self._unsaved is not None:
+            yield from enumerate(list(self._unsaved))
+            return None
+        for index, offset, data in self._iterate(self.filename):
+            if index > 0:
+                yield offset, data
+            elif data.get("fingerprint") != self.fingerprint:
+                return None
+
+    def read_positions(self, positions: List[int]) -> Iterator[type_aliases.nlu_payload]:
+        """
+        Read the processed sentences at the positions returned by stream_positions, one at a time.
+
+        :param positions: Positions of the processed sentences.
+        :return: Processed sentences, in the order of the positions.
+        """
+        if self._unsaved is not None:
+            for position in positions:
+                yield self._unsaved[position]
+            return None
+        with open(self.filename, "rb") as file:
+            for position in positions:
+                file.seek(position)
+                yield json.loads(file.readline())
+
+    def _truncate_torn_line(self) -> Optional[int]:
+        """
+        Prepare the predictions file to be appended to, truncating the line left incomplete by an
+        interrupted run. The valid lines are never rewritten, so they can't be lost.
+
+        :return: Number of valid sentences, or None if the file belongs to another model.
+        """
+        lines = self._iterate(self.filename)
+        header = next(lines, None)
+        if header is None or header[0] != 0 or header[2].get("fingerprint") != self.fingerprint:
+            return None
+        count = 0
+        last_offset = header[1]
+        for _, offset, _ in lines:
+            count += 1
+            last_offset = offset
+        with open(self.filename, "r+b") as file:
+            file.seek(last_offset)
+            last_line = file.readline()
+            file.truncate(last_offset + len(last_line))
+            if not last_line.endswith(b"\n"):
+                file.write(b"\n")
+        return count
+
+    def open(self, resume: bool = False) -> int:
+        """
+        Open the predictions file to write new sentences. When resuming, the new sentences are
+        appended to the file, after dropping a line truncated by an interrupted run. If the file
+        can't be created, the sentences are kept in memory.
+
+        :param resume: If True, keeps the sentences already predicted by the same model.
+        :return: Number of sentences already predicted, that can be read with stream_positions.
+        """
+        resumed = None
+        if resume and not self.fingerprint:
+            logging.warning("Could not get the model fingerprint from Rasa API. Predictions will not be resumed.")
+        self._pending = 0
+        self._unsaved = None
+        try:
+            if resume and self.fingerprint:
+                resumed = self._truncate_torn_line()
+            if resumed is None:
+                self._file = open(self.filename, "w", encoding="utf-8")
+                self._file.write(json.dumps({"fingerprint": self.fingerprint}) + "\n")
+            else:
+                self._file = open(self.filename, "a", encoding="utf-8")
+        except FileNotFoundError as error:
+            logging.error(f"Could not save the file: {self.filename}. Error: {error}.")
+            self._file = None
+            self._unsaved = []
+        if resumed:
+            logging.info(f"Resuming {resumed} sentence(s) from {self.filename} file.")
+        elif resume:
+            logging.info(f"There are no predictions to resume in {self.filename} file.")
+        return resumed or 0
+
+    def write(self, item: type_aliases.nlu_payload) -> None:
+        """
+        Write a processed sentence. A checkpoint is made every *checkpoint_interval* sentences.
+
+        :param item: Processed sentence.
+        """
+        if self._unsaved is not None:
+            self._unsaved.append(item)
+            return None
+        self._file.write(json.dumps(item, ensure_ascii=False) + "\n")
+        self._pending += 1
+        if self._pending >= self.checkpoint_interval:
+            self.checkpoint()
+
+    def checkpoint(self) -> None:
+        """
+        Flush the written sentences to the disk.
+        """
+        if self._file and not self._file.closed:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._pending = 0
+
+    def close(self) -> None:
+        """
+        Make a last checkpoint and close the predictions file.
+        """
+        if self._file and not self._file.closed:
+            self.checkpoint()
+            self._file.close()
+            logging.info(f"{self.filename} file successfully saved.")
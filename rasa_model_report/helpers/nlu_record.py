@@ -0,0 +1,206 @@
+import threading
+from array import array
+from operator import attrgetter
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+
+from rasa_model_report.helpers import type_aliases
+
+
+class NluRecord:
+    """
+    Compact record of a processed NLU sentence.
+
+    Intent names are stored as integer codes of a shared table and the intent ranking as fixed-width
+    arrays, instead of a dict with nested ranking dicts for each sentence. The record can still be
+    read as the processed sentence dict, by key.
+    """
+    __slots__ = (
+        "_intent", "text", "confidence", "_predicted_intent", "_ranking_intents", "_ranking_confidences", "understood",
+        "entity_scores"
+    )
+    KEYS = ("intent", "text", "confidence", "predicted_intent", "intent_ranking", "understood")
+    OPTIONAL_KEYS = ("entity_scores",)
+    _GETTERS: Dict[str, Callable[["NluRecord"], Any]] = {key: attrgetter(key) for key in KEYS + OPTIONAL_KEYS}
+    _names: List[Optional[str]] = []
+    _codes: Dict[Optional[str], int] = {}
+    _lock: threading.Lock = threading.Lock()
+
+    def __init__(
+        self,
+        intent: str,
+        text: str,
+        confidence: Optional[float],
+        predicted_intent: Optional[str],
+        intent_ranking: List[type_aliases.intent],
+        understood: bool,
+        entity_scores: Optional[Dict[str, List[int]]] = None
+    ) -> None:
+        """
+        __init__ method.
+
+        :param intent: Expected intent.
+        :param text: Sentence without Rasa entity syntax.
+        :param confidence: Confidence of the predicted intent.
+        :param predicted_intent: Predicted intent.
+        :param intent_ranking: Ranking of the predicted intents.
+        :param understood: If the sentence is a problem sentence (the name is kept from the sentence dict).
+        :param entity_scores: True positives, false positives and false negatives of each annotated or
+            predicted entity.
+        """
+        self._intent: int = self.encode(intent)
+        self.text: str = text
+        self.confidence: Optional[float] = confidence
+        self._predicted_intent: int = self.encode(predicted_intent)
+        self._ranking_intents: array = array("i", [self.encode(item.get("name")) for item in intent_ranking])
+        self._ranking_confidences: array = array("d", [item.get("confidence") or 0 for item in intent_ranking])
+        self.understood: bool = bool(understood)
+        self.entity_scores: Optional[Dict[str, List[int]]] = entity_scores or None
+
+    @classmethod
+    def from_item(cls, item: type_aliases.nlu_payload) -> "NluRecord":
+        """
+        Build a record from a processed sentence dict.
+
+        :param item: Processed sentence.
+        :return: Record.
+        """
+        return cls(
+            item["intent"],
+            item["text"],
+            item.get("confidence"),
+            item.get("predicted_intent"),
+            item.get("intent_ranking") or [],
+            item.get("understood", False),
+            item.get("entity_scores")
+        )
+
+    @classmethod
+    def encode(cls, name: Optional[str]) -> int:
+        """
+        Get the integer code of an intent name, adding it to the shared table if it's new.
+
+        :param name: Intent name.
+        :return: Intent code.
+        """
+        code = cls._codes.get(name)
+        if code is None:
+            with cls._lock:
+                code = cls._codes.setdefault(name, len(cls._names))
+                if code == len(cls._names):
+                    cls._names.append(name)
+        return code
+
+    @classmethod
+    def decode(cls, code: int) -> Optional[str]:
+        """
+        Get the intent name of an integer code.
+
+        :param code: Intent code.
+        :return: Intent name.
+        """
+        return cls._names[code]
+
+    @property
+    def intent(self) -> str:
+        """
+        Get the expected intent.
+
+        :return: Intent name.
+        """
+        return self.decode(self._intent)
+
+    @property
+    def predicted_intent(self) -> Optional[str]:
+        """
+        Get the predicted intent.
+
+        :return: Intent name.
+        """
+        return self.decode(self._predicted_intent)
+
+    @property
+    def intent_ranking(self) -> List[type_aliases.intent]:
+        """
+        Get the ranking of the predicted intents.
+
+        :return: List of intent names and confidences.
+        """
+        return [
+            {"name": self.decode(code), "confidence": confidence}
+            for code, confidence in zip(self._ranking_intents, self._ranking_confidences)
+        ]
+
+    def keys(self) -> tuple:
+        """
+        Get the keys of the processed sentence dict. Optional keys are only included when set.
+
+        :return: Keys.
+        """
+        return self.KEYS + tuple(key for key in self.OPTIONAL_KEYS if getattr(self, key) is not None)
+
+    def __getitem__(self, key: str) -> Any:
+        """
+        Read a field by the key of the processed sentence dict.
+
+        :param key: Field key.
+        :return: Field value.
+        """
+        getter = self._GETTERS.get(key)
+        if getter is None:
+            raise KeyError(key)
+        return getter(self)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Read a field by the key of the processed sentence dict, with a default value.
+
+        :param key: Field key.
+        :param default: Value returned if the key doesn't exist.
+        :return: Field value.
+        """
+        getter = self._GETTERS.get(key)
+        return default if getter is None else getter(self)
+
+    def __iter__(self) -> Iterator[str]:
+        """
+        Iterate over the keys of the processed sentence dict.
+
+        :return: Keys iterator.
+        """
+        return iter(self.keys())
+
+    def to_item(self) -> type_aliases.nlu_payload:
+        """
+        Convert the record to a processed sentence dict.
+
+        :return: Processed sentence.
+        """
+        return {key: self[key] for key in self.keys()}
+
+    def __eq__(self, other: Any) -> bool:
+        """
+        Compare the record with another record or a processed sentence dict.
+
+        :param other: Record or processed sentence.
+        :return: True if both have the same fields.
+        """
+        if isinstance(other, NluRecord):
+            return self.to_item() == other.to_item()
+        if isinstance(other, dict):
+            return self.to_item() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        """
+        Representation of the record.
+
+        :return: Representation text.
+        """
+        return f"NluRecord({self.to_item()!r})"
@@ -0,0 +1,210 @@
+import glob
+import logging
+import multiprocessing
+import os.path
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+
+from rasa_model_report.helpers import constants
+from rasa_model_report.helpers import utils
+from rasa_model_report.helpers.yaml_cache import YamlCache
+from rasa_model_report.helpers.yaml_reader import YamlReader
+
+
+class ProjectIndex:
+    """
+    Index of the YAML files of a Rasa project.
+
+    The project files are listed once and each file is parsed at most once, the first time one of
+    the views needs it. The views keep the file order of the globs previously used by each controller.
+    Only the keys used by the views are read from the files, see YamlReader.
+    """
+    DOMAIN_ELEMENTS = ("intents", "entities", "responses", "actions")
+    KEYS = {
+        "nlu": "intents",
+        "stories": "all",
+        "rules": "all",
+        **{element: "names" for element in DOMAIN_ELEMENTS}
+    }
+
+    def __init__(self, rasa_path: str, cache: Optional[YamlCache] = None, jobs: int = constants.JOBS) -> None:
+        """
+        __init__ method.
+
+        :param rasa_path: Rasa project path.
+        :param cache: Persistent cache of the parsed files. If not informed, all files are parsed.
+        :param jobs: Number of processes that parse the files. With more than one, all files of the
+            project are parsed in a process pool the first time a view is used.
+        """
+        self.rasa_path: str = utils.remove_duplicate_slashs(rasa_path)
+        self.nlu_path: str = utils.remove_duplicate_slashs(f"{self.rasa_path}/data")
+        self._files: Optional[Dict[str, List[str]]] = None
+        self._data: Dict[str, Any] = {}
+        self.cache: Optional[YamlCache] = cache
+        self.reader: YamlReader = YamlReader(self.KEYS)
+        self.jobs: int = max(1, jobs or constants.JOBS)
+        self._parallel_parsed: bool = False
+
+    @staticmethod
+    def _glob(patterns: List[str], recursive: bool = False) -> List[str]:
+        """
+        List the files that match the patterns, without repetitions.
+
+        :param patterns: Glob patterns.
+        :param recursive: If True, "**" matches any number of directories.
+        :return: Filenames in the order of the patterns.
+        """
+        files = []
+        for pattern in patterns:
+            files.extend(glob.glob(pattern, recursive=recursive))
+        return list(dict.fromkeys(files))
+
+    @property
+    def files(self) -> Dict[str, List[str]]:
+        """
+        Get the YAML files of each view, listing the project only on the first call.
+
+        :return: Filenames of the NLU, domain and training data views.
+        """
+        if self._files is None:
+            nlu_files = self._glob([f"{self.nlu_path}/**/*.yml", f"{self.nlu_path}/*.yml"])
+            self._files = {
+                "nlu": nlu_files,
+                "domain": list(dict.fromkeys(nlu_files + glob.glob(f"{self.rasa_path}/*.yml"))),
+                "data": self._glob([f"{self.nlu_path}/**/*yml"], recursive=True)
+            }
+        return self._files
+
+    def load(self, filename: str) -> Any:
+        """
+        Load the keys used by the views of a YAML file, parsing it only once.
+
+        :param filename: YAML filename.
+        :return: File data.
+        """
+        key = os.path.normpath(filename)
+        if key not in self._data:
+            if self.cache is not None:
+                self._data[key] = self.cache.load(filename, self.reader.read)
+            else:
+                self._data[key] = self.reader.read(filename)
+        return self._data[key]
+
+    def save_cache(self) -> None:
+        """
+        Save the persistent cache of the parsed files, if there is one.
+        """
+        if self.cache is not None:
+            logging.info(f"YAML cache: {self.cache.hits} hit(s) and {self.cache.misses} miss(es).")
+            self.cache.save()
+
+    def _parse_in_parallel(self) -> None:
+        """
+        Parse the files of all views in a process pool, once. The files are parsed in the same order
+        as the views list them, so the results don't depend on the number of processes. The processes
+        are spawned instead of forked, since the report also runs threads.
+        """
+        if self.jobs < 2 or self._parallel_parsed:
+            return None
+        self._parallel_parsed = True
+        pending = []
+        for filename in dict.fromkeys(filename for files in self.files.values() for filename in files):
+            key = os.path.normpath(filename)
+            if key in self._data:
+                continue
+            if self.cache is not None:
+                found, data = self.cache.get(filename)
+                if found:
+                    self._data[key] = data
+                    continue
+            pending.append(filename)
+        if len(pending) < 2:
+            return None
+        jobs = min(self.jobs, len(pending))
+        logging.info(f"Parsing {len(pending)} YAML file(s) with {jobs} processes.")
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context("spawn")) as executor:
+            for filename, data in zip(pending, executor.map(self.reader.read, pending)):
+                self._data[os.path.normpath(filename)] = data
+                if self.cache is not None:
+                    self.cache.set(filename, data)
+
+    def _iterate(self, view: str) -> List[tuple]:
+        """
+        Get the data of the files of a view. Empty files and files that aren't a mapping are ignored.
+
+        :param view: View name: "nlu", "domain" or "data".
+        :return: Filename and data of each file.
+        """
+        self._parse_in_parallel()
+        items = []
+        for filename in self.files[view]:
+            data = self.load(filename)
+            if isinstance(data, dict):
+                items.append((filename, data))
+        return items
+
+    @property
+    def parsed_files(self) -> int:
+        """
+        Get the number of files already parsed.
+
+        :return: Number of files.
+        """
+        return len(self._data)
+
+    @property
+    def nlu_examples(self) -> Dict[str, Dict[str, str]]:
+        """
+        Get the examples of each intent, by NLU file.
+
+        :return: Dictionary of filenames and intent examples, as written in the files.
+        """
+        nlu = {}
+        for filename, data in self._iterate("nlu"):
+            examples = {item["intent"]: item["examples"] for item in data.get("nlu") or [] if item.get("intent")}
+            if examples:
+                nlu[filename] = examples
+        return nlu
+
+    @property
+    def domain_elements(self) -> Dict[str, List[str]]:
+        """
+        Get the names of the domain elements.
+
+        :return: Dictionary of the intents, entities, responses and actions names.
+        """
+        elements = {element: [] for element in self.DOMAIN_ELEMENTS}
+        for _, data in self._iterate("domain"):
+            for element in self.DOMAIN_ELEMENTS:
+                for item in data.get(element) or []:
+                    elements[element].append(item if isinstance(item, str) else list(item.keys())[0])
+        return elements
+
+    @property
+    def stories(self) -> List[Dict[str, Any]]:
+        """
+        Get the stories of the training data.
+
+        :return: Stories.
+        """
+        return [story for _, data in self._iterate("data") for story in data.get("stories") or []]
+
+    @property
+    def rules(self) -> List[Dict[str, Any]]:
+        """
+        Get the rules of the training data.
+
+        :return: Rules.
+        """
+        return [rule for _, data in self._iterate("data") for rule in data.get("rules") or []]
+
+    def count_stories_and_rules(self) -> Dict[str, int]:
+        """
+        Count the number of stories and rules.
+
+        :return: Dictionary with the number of stories and rules.
+        """
+        return {"rules": len(self.rules), "stories": len(self.stories)}
@@ -1,19 +1,31 @@
 import datetime
-import glob
+import json
 import logging
 import os
 import re
-from typing import Dict
 from typing import List
 from typing import Optional
+from typing import Tuple
 from typing import Union
 
 import requests.exceptions
 from requests.adapters import HTTPAdapter
 from requests.adapters import Retry
-from yaml import safe_load
+from yaml import load
+from yaml import SafeLoader
 
 from rasa_model_report.helpers import constants
+from rasa_model_report.helpers import type_aliases
+
+try:
+    from yaml import CSafeLoader as YAML_LOADER
+except ImportError:
+    YAML_LOADER = SafeLoader
+
+ENTITY_ANNOTATION_REGEX = re.compile(
+    r"\[(?P<text>[^\[\]\n]+)\]"
+    r"(?:\((?P<entity>[^()\n]+)\)|(?P<json>\{[^{}\n]*\})|(?P<json_list>\[\s*\{[^\[\]\n]*\}\s*\]))"
+)
 
 
 def format_date() -> str:
@@ -103,21 +115,62 @@ def get_project_name(path: Optional[str] = None) -> str:
     return os.path.basename(directory_path)
 
 
-def request(url: str, method: str = "GET", json: dict = {}) -> Optional[requests.Response]:
+def create_session(
+    pool_size: int = constants.NLU_POOL_SIZE,
+    retries: int = constants.RASA_API_RETRIES,
+    backoff_factor: float = constants.RASA_API_BACKOFF_FACTOR
+) -> requests.Session:
+    """
+    Create a HTTP session that keeps its connections alive to be reused between requests.
+
+    Connection errors, timeouts and the responses with a status of RASA_API_RETRY_STATUSES are
+    retried, including POST requests, since parsing a sentence doesn't change the Rasa API state.
+    The last response is returned when its retries are exhausted.
+
+    :param pool_size: Maximum number of connections kept in the pool by host.
+    :param retries: Number of retries of each request.
+    :param backoff_factor: Backoff factor between retries.
+    :return: Session object.
+    """
+    session = requests.Session()
+    session.headers.update({"Connection": "keep-alive"})
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=constants.RASA_API_RETRY_STATUSES,
+            allowed_methods=Retry.DEFAULT_ALLOWED_METHODS | {"POST"},
+            raise_on_status=False
+        )
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def request(
+    url: str,
+    method: str = "GET",
+    json: dict = {},
+    session: Optional[requests.Session] = None,
+    timeout: Optional[float] = constants.RASA_API_TIMEOUT
+) -> Optional[requests.Response]:
     """
     Function that makes requests.
 
     :param url: URL.
     :param method: Request method (default: "GET").
     :param json: JSON body request (default: {}).
+    :param session: Session used to make the request. If not informed, a new session is created.
+    :param timeout: Timeout in seconds of the request. If None, waits forever.
     :return: Response object.
     """
     response = None
     try:
-        session = requests.Session()
-        retries = Retry(total=2, backoff_factor=3)
-        session.mount("http://", HTTPAdapter(max_retries=retries))
-        response = session.request(method=method, url=url, json=json)
+        session = session or create_session()
+        response = session.request(method=method, url=url, json=json, timeout=timeout)
     except (
         requests.exceptions.ConnectionError,
         requests.exceptions.Timeout,
@@ -128,6 +181,21 @@ def request(url: str, method: str = "GET", json: dict = {}) -> Optional[requests
         return response
 
 
+def count_retries(response: Optional[requests.Response], max_retries: int = 0) -> int:
+    """
+    Count the number of retries made until the response was received. A request that raised an
+    error has no response, and it only raises once all its retries were made.
+
+    :param response: Response object, or None if the request raised an error.
+    :param max_retries: Number of retries of each request, counted when the request raised an error.
+    :return: Number of retries.
+    """
+    if response is None:
+        return max_retries
+    retries = getattr(getattr(response, "raw", None), "retries", None)
+    return len(getattr(retries, "history", None) or [])
+
+
 def load_yaml_file(filename: str, error_flag: bool = True) -> Union[dict, list]:
     """
     Load data from YAML file.
@@ -138,7 +206,7 @@ def load_yaml_file(filename: str, error_flag: bool = True) -> Union[dict, list]:
     """
     if os.path.isfile(filename):
         file = open(filename, encoding="utf-8")
-        data = safe_load(file)
+        data = load(file, Loader=YAML_LOADER)
         file.close()
         logging.info(f"{filename} file loaded successfully.")
         return data
@@ -200,22 +268,59 @@ def remove_duplicate_slashs(text: str) -> str:
     return re.sub(r"\/+", "/", text)
 
 
-def count_stories_and_rules(rasa_path: str) -> Dict[str, int]:
+def parse_shard(shard: str) -> Tuple[int, int]:
+    """
+    Parse a shard string in the format i/N, where i is the shard index (from 1 to N) and N is the number of shards.
+
+    :param shard: Shard string.
+    :return: Shard index and number of shards.
+    """
+    match = re.fullmatch(r"\s*(\d+)\s*/\s*(\d+)\s*", shard or "")
+    if not match:
+        raise ValueError(f"Invalid shard '{shard}'. Use the format i/N, for example: 1/4.")
+    index, total = int(match.group(1)), int(match.group(2))
+    if not 1 <= index <= total:
+        raise ValueError(f"Invalid shard '{shard}'. The shard index must be between 1 and {total}.")
+    return index, total
+
+
+def parse_entity_annotations(text: str) -> Tuple[str, List[type_aliases.entity]]:
     """
-    Count the number of stories and rules.
+    Parse the Rasa entity annotations of an example in one pass. The annotations can be in the
+    [text](entity), [text](entity:value), [text]{"entity": ...} or [text][{"entity": ...}, ...]
+    formats, where the JSON formats accept the role and group keys.
 
-    :param rasa_path: Rasa project path.
-    :return: Dictionary with the number of stories and rules.
+    :param text: Text with Rasa entity syntax.
+    :return: Text without Rasa entity syntax and its annotated entities, with start and end offsets.
     """
-    data = {
-        "rules": 0,
-        "stories": 0
-    }
-    files = glob.glob(f"{rasa_path}/data/**/*yml", recursive=True)
-    for file in files:
-        file_data = load_yaml_file(file)
-        data.update({
-            "rules": data["rules"] + len(file_data.get("rules", [])),
-            "stories": data["stories"] + len(file_data.get("stories", []))
-        })
-    return data
+    chunks = []
+    entities = []
+    length = 0
+    position = 0
+    for match in ENTITY_ANNOTATION_REGEX.finditer(text):
+        if match.group("entity"):
+            entity, _, value = match.group("entity").partition(":")
+            annotations = [{"entity": entity.strip(), "value": value.strip()}]
+        else:
+            try:
+                annotations = json.loads(match.group("json") or match.group("json_list"))
+            except ValueError:
+                continue
+            annotations = annotations if isinstance(annotations, list) else [annotations]
+            if not all(isinstance(item, dict) and item.get("entity") for item in annotations):
+                continue
+        chunks.append(text[position:match.start()])
+        length += match.start() - position
+        word = match.group("text")
+        for annotation in annotations:
+            entity = {"entity": annotation["entity"], "start": length, "end": length + len(word)}
+            entity["value"] = annotation.get("value") or word
+            entity.update({key: annotation[key] for key in ("role", "group") if annotation.get(key)})
+            entities.append(entity)
+        chunks.append(word)
+        length += len(word)
+        position = match.end()
+    if not chunks:
+        return text, entities
+    chunks.append(text[position:])
+    return "".join(chunks), entities
@@ -0,0 +1,189 @@
+import hashlib
+import logging
+import marshal
+import os.path
+import threading
+from collections import OrderedDict
+from typing import Any
+from typing import Callable
+from typing import Optional
+from typing import Tuple
+
+from rasa_model_report.helpers import constants
+
+
+class YamlCache:
+    """
+    Persistent LRU cache of the parsed YAML files.
+
+    Each entry is keyed by the absolute file path and validated by the file size and modification time or,
+    when *verify_hash* is set, by the hash of the file content. The parsed data is stored in the marshal
+    binary format, which is compact and fast to load and doesn't run code when loaded, unlike pickle.
+    FORMAT is increased whenever the shape of the cached data changes, so older cache files are ignored.
+    """
+    FORMAT = 2
+
+    def __init__(
+        self,
+        filename: str,
+        max_bytes: int = constants.YAML_CACHE_SIZE * 1024 * 1024,
+        verify_hash: bool = constants.YAML_CACHE_HASH
+    ) -> None:
+        """
+        __init__ method.
+
+        :param filename: Cache file path.
+        :param max_bytes: Maximum size of the parsed data. The least recently used entries are evicted first.
+        :param verify_hash: If True, the entries are validated by the hash of the file content instead of
+            the file size and modification time, so they survive a new checkout of the same files.
+        """
+        self.filename: str = filename
+        self.max_bytes: int = max_bytes
+        self.verify_hash: bool = verify_hash
+        self.hits: int = 0
+        self.misses: int = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._changed: bool = False
+        self._lock: threading.Lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        """
+        Load the cache entries from the cache file. Files written by another marshal version or format are ignored.
+        """
+        if os.path.isfile(self.filename):
+            try:
+                with open(self.filename, "rb") as file:
+                    data = marshal.load(file)
+                if data.get("version") == marshal.version and data.get("format") == self.FORMAT:
+                    self._entries = OrderedDict(data["entries"])
+                    logging.info(f"{self.filename} file loaded successfully.")
+            except (ValueError, EOFError, TypeError, AttributeError, KeyError) as error:
+                logging.warning(f"{self.filename} file is invalid and will be ignored. Error: {error}")
+                self._entries = OrderedDict()
+
+    def clear(self) -> None:
+        """
+        Remove all cache entries and the cache file.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._changed = False
+            if os.path.isfile(self.filename):
+                os.remove(self.filename)
+                logging.info(f"{self.filename} file removed.")
+
+    @staticmethod
+    def _hash(filename: str) -> str:
+        """
+        Calculate the hash of a file content.
+
+        :param filename: File path.
+        :return: Hash of the file content.
+        """
+        with open(filename, "rb") as file:
+            return hashlib.sha1(file.read()).hexdigest()
+
+    def _stat(self, filename: str) -> Optional[list]:
+        """
+        Get the validation info of a file.
+
+        :param filename: File path.
+        :return: File size, modification time and content hash (only with *verify_hash*), or None if the file
+            doesn't exist.
+        """
+        try:
+            stat = os.stat(filename)
+        except OSError:
+            return None
+        return [stat.st_size, stat.st_mtime_ns, self._hash(filename) if self.verify_hash else None]
+
+    def get(self, filename: str) -> Tuple[bool, Any]:
+        """
+        Get the cached data of a file.
+
+        :param filename: YAML filename.
+        :return: If the file is cached and unchanged, and a copy of its parsed data.
+        """
+        info = self._stat(filename)
+        with self._lock:
+            entry = self._entries.get(os.path.abspath(filename))
+            if info and entry and (entry[2] == info[2] if self.verify_hash else entry[:2] == info[:2]):
+                self._entries.move_to_end(os.path.abspath(filename))
+                self.hits += 1
+                return True, marshal.loads(entry[3])
+            self.misses += 1
+        return False, None
+
+    def set(self, filename: str, data: Any) -> None:
+        """
+        Cache the parsed data of a file.
+
+        :param filename: YAML filename.
+        :param data: Parsed data.
+        """
+        info = self._stat(filename)
+        if info is None:
+            return None
+        try:
+            blob = marshal.dumps(data)
+        except ValueError:
+            logging.info(f"{filename} file has values that can't be cached and will be parsed in every run.")
+            return None
+        with self._lock:
+            self._entries[os.path.abspath(filename)] = info + [blob]
+            self._entries.move_to_end(os.path.abspath(filename))
+            self._changed = True
+
+    def load(self, filename: str, loader: Callable[[str], Any]) -> Any:
+        """
+        Get the parsed data of a file, parsing it with the loader if the file isn't cached or changed.
+
+        :param filename: YAML filename.
+        :param loader: Function that parses the file.
+        :return: Parsed data.
+        """
+        found, data = self.get(filename)
+        if not found:
+            data = loader(filename)
+            self.set(filename, data)
+        return data
+
+    @property
+    def size(self) -> int:
+        """
+        Size of the parsed data of all entries.
+
+        :return: Size in bytes.
+        """
+        return sum(len(entry[3]) for entry in self._entries.values())
+
+    def save(self) -> None:
+        """
+        Save the cache entries to the cache file, if they changed, evicting the least recently used entries
+        above the maximum size.
+        """
+        with self._lock:
+            size = self.size
+            while self._entries and size > self.max_bytes:
+                _, entry = self._entries.popitem(last=False)
+                size -= len(entry[3])
+                self._changed = True
+            if not self._changed:
+                return None
+            try:
+                with open(self.filename, "wb") as file:
+                    data = {"version": marshal.version, "format": self.FORMAT, "entries": dict(self._entries)}
+                    marshal.dump(data, file)
+                self._changed = False
+                logging.info(f"{self.filename} file successfully saved.")
+            except FileNotFoundError as error:
+                logging.error(f"Could not save the file: {self.filename}. Error: {error}.")
+
+    def __len__(self) -> int:
+        """
+        Number of cached entries.
+
+        :return: Number of cached entries.
+        """
+        return len(self._entries)
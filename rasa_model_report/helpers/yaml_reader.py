@@ -0,0 +1,272 @@
+import logging
+import os.path
+from typing import Any
+from typing import Dict
+from typing import Optional
+
+from yaml import AliasEvent
+from yaml import CollectionEndEvent
+from yaml import CollectionStartEvent
+from yaml import MappingEndEvent
+from yaml import MappingStartEvent
+from yaml import ScalarEvent
+from yaml import ScalarNode
+from yaml import SequenceEndEvent
+from yaml import SequenceStartEvent
+from yaml import StreamEndEvent
+from yaml.composer import ComposerError
+
+from rasa_model_report.helpers import utils
+
+
+class YamlReader:
+    """
+    Selective YAML reader, that builds only the values of the requested top-level keys.
+
+    The file is read at the event level, with the same loader used by utils.load_yaml_file. Values of
+    other keys are skipped without building any object, except the anchored values, which can be
+    referenced by the requested keys. Each requested key has a selection mode:
+
+    - "all": the whole value is built.
+    - "names": only the names of a sequence of names or of a mapping are built, e.g. the intents
+      and responses of the domain. Nested mappings are kept as ``{name: None}``.
+    - "intents": only the items of the ``nlu`` sequence that aren't lookup tables, synonyms or
+      regexes are built.
+    """
+    SKIPPED_NLU_KEYS = ("lookup", "synonym", "regex")
+    MERGE_TAG = "tag:yaml.org,2002:merge"
+
+    def __init__(self, keys: Dict[str, str]) -> None:
+        """
+        __init__ method.
+
+        :param keys: Selection mode of each requested top-level key.
+        """
+        self.keys: Dict[str, str] = keys
+
+    def read(self, filename: str, error_flag: bool = True) -> Optional[dict]:
+        """
+        Read the requested keys of a YAML file.
+
+        :param filename: YAML filename.
+        :param error_flag: If True, an exception will be raised when the file isn't found (default: True).
+        :return: Dictionary of the requested keys found in the file, or None if the file is empty or
+            isn't a mapping.
+        """
+        if not os.path.isfile(filename):
+            return utils.load_yaml_file(filename, error_flag)
+        with open(filename, encoding="utf-8") as file:
+            loader = utils.YAML_LOADER(file)
+            try:
+                data = self._read_document(loader)
+            finally:
+                loader.dispose()
+        logging.info(f"{filename} file loaded successfully.")
+        return data
+
+    def _read_document(self, loader: Any) -> Optional[dict]:
+        """
+        Read the requested keys of the single document of the file. As with the safe loader, a file
+        with more than one document raises a ComposerError.
+
+        :param loader: YAML loader.
+        :return: Dictionary of the requested keys.
+        """
+        loader.get_event()
+        if loader.check_event(StreamEndEvent):
+            return None
+        document = loader.get_event()
+        data = {} if loader.check_event(MappingStartEvent) else None
+        anchors = {}
+        if data is None:
+            self._skip(loader, anchors)
+        else:
+            self._read_mapping(loader, anchors, data)
+        loader.get_event()
+        if not loader.check_event(StreamEndEvent):
+            event = loader.get_event()
+            raise ComposerError(
+                "expected a single document in the stream", document.start_mark,
+                "but found another document", event.start_mark
+            )
+        return data
+
+    def _read_mapping(self, loader: Any, anchors: Dict[str, Any], data: dict) -> None:
+        """
+        Read the requested keys of the root mapping, up to its end.
+
+        :param loader: YAML loader.
+        :param anchors: Values of the anchors already read.
+        :param data: Dictionary that receives the requested keys.
+        """
+        loader.get_event()
+        while not loader.check_event(MappingEndEvent):
+            if self._is_merge_key(loader):
+                self._skip(loader, anchors)
+                key = None
+            else:
+                key = self._build(loader, anchors)
+            mode = self.keys.get(key) if isinstance(key, str) else None
+            if mode is None:
+                self._skip(loader, anchors)
+            elif mode == "names":
+                data[key] = self._build_names(loader, anchors)
+            elif mode == "intents":
+                data[key] = self._build_intents(loader, anchors)
+            else:
+                data[key] = self._build(loader, anchors)
+        loader.get_event()
+
+    def _skip(self, loader: Any, anchors: Dict[str, Any]) -> None:
+        """
+        Skip the next value without building it. Only the anchored values found in it are built, since
+        they can be referenced by the requested keys.
+
+        :param loader: YAML loader.
+        :param anchors: Values of the anchors already read.
+        """
+        depth = 0
+        while True:
+            event = loader.peek_event()
+            if getattr(event, "anchor", None) and not isinstance(event, AliasEvent):
+                self._build(loader, anchors)
+            else:
+                loader.get_event()
+                if isinstance(event, CollectionStartEvent):
+                    depth += 1
+                elif isinstance(event, CollectionEndEvent):
+                    depth -= 1
+            if depth == 0:
+                return None
+
+    @staticmethod
+    def _is_merge_key(loader: Any) -> bool:
+        """
+        Check if the next event is the merge key ``<<``.
+
+        :param loader: YAML loader.
+        :return: True if it's the merge key.
+        """
+        event = loader.peek_event()
+        return (
+            isinstance(event, ScalarEvent) and
+            event.tag in (None, "!") and
+            loader.resolve(ScalarNode, event.value, event.implicit) == YamlReader.MERGE_TAG
+        )
+
+    def _build(self, loader: Any, anchors: Dict[str, Any]) -> Any:
+        """
+        Build the next value, resolving and constructing the scalars as the safe loader does.
+
+        :param loader: YAML loader.
+        :param anchors: Values of the anchors already read.
+        :return: Value.
+        """
+        event = loader.get_event()
+        if isinstance(event, AliasEvent):
+            return anchors.get(event.anchor)
+        if isinstance(event, ScalarEvent):
+            tag = event.tag
+            if tag in (None, "!"):
+                tag = loader.resolve(ScalarNode, event.value, event.implicit)
+            node = ScalarNode(tag, event.value, event.start_mark, event.end_mark, event.style)
+            constructor = loader.yaml_constructors.get(tag, loader.yaml_constructors[None])
+            value = constructor(loader, node)
+        elif isinstance(event, SequenceStartEvent):
+            value = []
+            if event.anchor:
+                anchors[event.anchor] = value
+            while not loader.check_event(SequenceEndEvent):
+                value.append(self._build(loader, anchors))
+            loader.get_event()
+        else:
+            value = {}
+            if event.anchor:
+                anchors[event.anchor] = value
+            self._build_mapping(loader, anchors, value)
+        if event.anchor:
+            anchors[event.anchor] = value
+        return value
+
+    def _build_mapping(self, loader: Any, anchors: Dict[str, Any], value: dict, skipped_keys: tuple = ()) -> bool:
+        """
+        Build the pairs of a mapping, up to its end. Once one of the skipped keys is found, the mapping is
+        discarded and its remaining pairs are skipped without being built.
+
+        :param loader: YAML loader.
+        :param anchors: Values of the anchors already read.
+        :param value: Dictionary that receives the pairs.
+        :param skipped_keys: Keys that discard the mapping.
+        :return: True if the mapping was discarded.
+        """
+        skipped = False
+        while not loader.check_event(MappingEndEvent):
+            if skipped:
+                self._skip(loader, anchors)
+                self._skip(loader, anchors)
+            elif self._is_merge_key(loader):
+                loader.get_event()
+                merged = self._build(loader, anchors)
+                for item in merged if isinstance(merged, list) else [merged]:
+                    for key, item_value in (item or {}).items():
+                        value.setdefault(key, item_value)
+            else:
+                key = self._build(loader, anchors)
+                if key in skipped_keys:
+                    skipped = True
+                    self._skip(loader, anchors)
+                else:
+                    value[key] = self._build(loader, anchors)
+        loader.get_event()
+        return skipped
+
+    def _build_names(self, loader: Any, anchors: Dict[str, Any]) -> Any:
+        """
+        Build only the names of a sequence or a mapping.
+
+        :param loader: YAML loader.
+        :param anchors: Values of the anchors already read.
+        :return: List of names, or dictionary of names with None values.
+        """
+        if loader.check_event(MappingStartEvent):
+            loader.get_event()
+            names = {}
+            while not loader.check_event(MappingEndEvent):
+                names[self._build(loader, anchors)] = None
+                self._skip(loader, anchors)
+            loader.get_event()
+            return names
+        if not loader.check_event(SequenceStartEvent):
+            return self._build(loader, anchors)
+        loader.get_event()
+        names = []
+        while not loader.check_event(SequenceEndEvent):
+            if loader.check_event(MappingStartEvent):
+                names.append(self._build_names(loader, anchors))
+            else:
+                names.append(self._build(loader, anchors))
+        loader.get_event()
+        return names
+
+    def _build_intents(self, loader: Any, anchors: Dict[str, Any]) -> Any:
+        """
+        Build the items of the ``nlu`` sequence, skipping lookup tables, synonyms and regexes.
+
+        :param loader: YAML loader.
+        :param anchors: Values of the anchors already read.
+        :return: List of intent items.
+        """
+        if not loader.check_event(SequenceStartEvent):
+            return self._build(loader, anchors)
+        loader.get_event()
+        items = []
+        while not loader.check_event(SequenceEndEvent):
+            if not loader.check_event(MappingStartEvent):
+                self._skip(loader, anchors)
+                continue
+            loader.get_event()
+            item = {}
+            if not self._build_mapping(loader, anchors, item, self.SKIPPED_NLU_KEYS):
+                items.append(item)
+        loader.get_event()
+        return items
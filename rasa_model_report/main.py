@@ -2,18 +2,44 @@ import logging
 
 import click
 
+from rasa_model_report.controllers.load_test_controller import LoadTestController
 from rasa_model_report.controllers.model_report import ModelReport
 from rasa_model_report.helpers import constants
+from rasa_model_report.helpers import utils
 
 logging.basicConfig(format="%(asctime)s [%(levelname)s] %(message)s", level=logging.INFO)
 
 
-@click.command()
+def validate_shard(ctx: click.Context, param: click.Parameter, value: str):
+    """
+    Validate the --shard parameter.
+
+    :param ctx: Click context.
+    :param param: Click parameter.
+    :param value: Shard string in the format i/N.
+    :return: Shard index and number of shards.
+    """
+    if value is None:
+        return None
+    try:
+        return utils.parse_shard(value)
+    except ValueError as error:
+        raise click.BadParameter(str(error))
+
+
+@click.group(invoke_without_command=True)
 @click.option(
     "--actions-path",
     required=False,
     help="Actions path. (default: actions/ inside Rasa project path)"
 )
+@click.option(
+    "--clear-cache",
+    is_flag=True,
+    required=False,
+    default=constants.CLEAR_CACHE,
+    help="Remove the cache of parsed YAML files before the run. All project files will be parsed again."
+)
 @click.option(
     "--disable-nlu",
     is_flag=True,
@@ -30,6 +56,15 @@ logging.basicConfig(format="%(asctime)s [%(levelname)s] %(message)s", level=logg
     help="List of utter and actions that will be exclude in the E2E test coverage. Use commas to separate items. "
     "Example: utter_greet,utter_goodbye,action_listen"
 )
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    required=False,
+    default=constants.JOBS,
+    help="Number of processes that parse the YAML files of the Rasa project. "
+    f"(default: {constants.JOBS})"
+)
 @click.help_option(
     "--help",
     "-h",
@@ -41,6 +76,114 @@ logging.basicConfig(format="%(asctime)s [%(levelname)s] %(message)s", level=logg
     required=False,
     help="Model download link. It's only displayed in the report to model download."
 )
+@click.option(
+    "--nlu-adaptive",
+    is_flag=True,
+    required=False,
+    default=constants.NLU_ADAPTIVE,
+    help="Adapt the number of NLU sentences requested at the same time to the Rasa API latency and errors, "
+    "up to --nlu-concurrency."
+)
+@click.option(
+    "--nlu-batch-size",
+    type=click.IntRange(min=1),
+    required=False,
+    default=constants.NLU_BATCH_SIZE,
+    help="Number of NLU sentences sent in each request to --nlu-batch-url. "
+    f"(default: {constants.NLU_BATCH_SIZE})"
+)
+@click.option(
+    "--nlu-batch-url",
+    type=str,
+    required=False,
+    help="URL of an endpoint that parses a list of sentences in a single request. It receives "
+    "{\"texts\": [...]} and returns the list of parse results. If not informed, each sentence is "
+    "requested to the Rasa API /model/parse endpoint."
+)
+@click.option(
+    "--nlu-cache-size",
+    type=click.IntRange(min=1),
+    required=False,
+    default=constants.NLU_CACHE_SIZE,
+    help="Maximum number of NLU predictions kept in the cache. The least recently used are discarded first. "
+    f"(default: {constants.NLU_CACHE_SIZE})"
+)
+@click.option(
+    "--nlu-concurrency",
+    type=click.IntRange(min=1),
+    required=False,
+    default=constants.NLU_CONCURRENCY,
+    help="Number of NLU sentences requested to the Rasa API at the same time. "
+    f"(default: {constants.NLU_CONCURRENCY})"
+)
+@click.option(
+    "--nlu-fail-threshold",
+    type=click.FloatRange(min=0, max=1),
+    required=False,
+    help="Minimum NLU score, between 0 and 1. The NLU processing stops as soon as this score can't be "
+    "reached anymore and the command exits with an error."
+)
+@click.option(
+    "--nlu-incremental",
+    is_flag=True,
+    required=False,
+    default=constants.NLU_INCREMENTAL,
+    help="Only request the NLU sentences of intents whose examples changed since the previous run. "
+    "If the model changed, all intents are requested."
+)
+@click.option(
+    "--nlu-latency-target",
+    type=click.FloatRange(min=0, min_open=True),
+    required=False,
+    default=constants.NLU_LATENCY_TARGET,
+    help="Target of p95 latency in seconds of the Rasa API requests, used by --nlu-adaptive. "
+    f"(default: {constants.NLU_LATENCY_TARGET})"
+)
+@click.option(
+    "--nlu-max-per-intent",
+    type=click.IntRange(min=1),
+    required=False,
+    help="Maximum number of NLU sentences analyzed by intent. The sentences are drawn by a stratified sample "
+    "and the NLU score is estimated with a confidence interval."
+)
+@click.option(
+    "--nlu-model",
+    type=click.Path(exists=True),
+    required=False,
+    help="Rasa model archive, or directory of model archives where the latest is used, loaded in-process "
+    "to predict the NLU sentences without Rasa API. Requires Rasa installed in the same environment."
+)
+@click.option(
+    "--nlu-pool-size",
+    type=click.IntRange(min=1),
+    required=False,
+    help="Number of HTTP connections kept alive to the Rasa API. "
+    f"(default: the greater of {constants.NLU_POOL_SIZE} and --nlu-concurrency)"
+)
+@click.option(
+    "--nlu-sample-rate",
+    type=click.FloatRange(min=0, max=1, min_open=True),
+    required=False,
+    default=constants.NLU_SAMPLE_RATE,
+    help="Rate of the NLU sentences of each intent that are analyzed. The sentences are drawn by a stratified "
+    f"sample and the NLU score is estimated with a confidence interval. (default: {constants.NLU_SAMPLE_RATE})"
+)
+@click.option(
+    "--nlu-streaming",
+    is_flag=True,
+    required=False,
+    default=constants.NLU_STREAMING,
+    help="Aggregate the NLU sentences from the predictions file, keeping in memory only the problem sentences and "
+    f"the {constants.NLU_STREAMING_SENTENCES} sentences with the highest and the lowest confidences. "
+    "Recommended for projects with many example phrases."
+)
+@click.option(
+    "--nlu-time-budget",
+    type=click.FloatRange(min=0, min_open=True),
+    required=False,
+    help="Maximum time in seconds to request the NLU sentences. The sentences not requested in time are "
+    "left out and the NLU section is marked as partial."
+)
 @click.option(
     "--no-images",
     is_flag=True,
@@ -48,6 +191,13 @@ logging.basicConfig(format="%(asctime)s [%(levelname)s] %(message)s", level=logg
     default=constants.NO_IMAGES,
     help="Generate model report without images."
 )
+@click.option(
+    "--no-nlu-cache",
+    is_flag=True,
+    required=False,
+    default=constants.NO_NLU_CACHE,
+    help="Disable the NLU predictions cache. All sentences will be requested to the Rasa API."
+)
 @click.option(
     "--output-path",
     type=str,
@@ -89,8 +239,32 @@ logging.basicConfig(format="%(asctime)s [%(levelname)s] %(message)s", level=logg
     "--rasa-api",
     type=str,
     required=False,
-    default=constants.RASA_API_URL,
-    help=f"Rasa API URL. Is needed to create NLU section of report. (default: {constants.RASA_API_URL})"
+    multiple=True,
+    default=[constants.RASA_API_URL],
+    help="Rasa API URL. Is needed to create NLU section of report. Inform several URLs, separated by commas, "
+    "to spread the NLU requests across Rasa API replicas. "
+    f"(default: {constants.RASA_API_URL})"
+)
+@click.option(
+    "--rasa-api-baseline",
+    type=str,
+    required=False,
+    help="Rasa API URL of a baseline model, e.g. the model in production. Each NLU sentence is also requested "
+    "to it and the report compares the NLU scores and lists the sentences whose prediction changed."
+)
+@click.option(
+    "--rasa-api-retries",
+    type=click.IntRange(min=0),
+    required=False,
+    default=constants.RASA_API_RETRIES,
+    help=f"Number of retries of a failed Rasa API request. (default: {constants.RASA_API_RETRIES})"
+)
+@click.option(
+    "--rasa-api-timeout",
+    type=click.FloatRange(min=0, min_open=True),
+    required=False,
+    default=constants.RASA_API_TIMEOUT,
+    help=f"Timeout in seconds of each Rasa API request. (default: {constants.RASA_API_TIMEOUT})"
 )
 @click.option(
     "--rasa-version",
@@ -99,6 +273,38 @@ logging.basicConfig(format="%(asctime)s [%(levelname)s] %(message)s", level=logg
     default=constants.RASA_VERSION,
     help="Rasa version. It's only displayed in the report for project documentation."
 )
+@click.option(
+    "--resume",
+    is_flag=True,
+    required=False,
+    default=constants.RESUME,
+    help="Resume an interrupted NLU processing. Sentences already saved in results/nlu_predictions.jsonl "
+    "by the same model will not be requested again."
+)
+@click.option(
+    "--shard",
+    type=str,
+    required=False,
+    callback=validate_shard,
+    help="Analyze only a share of the NLU intents, in the format i/N (e.g. 1/4). "
+    "The predictions are saved to a partial file that can be combined with the merge command."
+)
+@click.option(
+    "--yaml-cache-hash",
+    is_flag=True,
+    required=False,
+    default=constants.YAML_CACHE_HASH,
+    help="Validate the cache of parsed YAML files by the hash of the file contents instead of their size and "
+    "modification time. Useful when the project is checked out again between runs."
+)
+@click.option(
+    "--yaml-cache-size",
+    type=click.IntRange(min=1),
+    required=False,
+    default=constants.YAML_CACHE_SIZE,
+    help="Maximum size in megabytes of the cache of parsed YAML files. The least recently used files are "
+    f"discarded first. (default: {constants.YAML_CACHE_SIZE})"
+)
 @click.version_option(
     None,
     "--version",
@@ -106,34 +312,179 @@ logging.basicConfig(format="%(asctime)s [%(levelname)s] %(message)s", level=logg
     message="v%(version)s",
     help="Show installed rasa-model-report version.",
 )
+@click.pass_context
 def main(
+    ctx,
     actions_path,
+    clear_cache,
     disable_nlu,
     exclude,
+    jobs,
     model_link,
+    nlu_adaptive,
+    nlu_batch_size,
+    nlu_batch_url,
+    nlu_cache_size,
+    nlu_concurrency,
+    nlu_fail_threshold,
+    nlu_incremental,
+    nlu_latency_target,
+    nlu_max_per_intent,
+    nlu_model,
+    nlu_pool_size,
+    nlu_sample_rate,
+    nlu_streaming,
+    nlu_time_budget,
     no_images,
+    no_nlu_cache,
     output_path, path,
     precision,
     project_name,
     project_version,
     rasa_api,
-    rasa_version
+    rasa_api_baseline,
+    rasa_api_retries,
+    rasa_api_timeout,
+    rasa_version,
+    resume,
+    shard,
+    yaml_cache_hash,
+    yaml_cache_size
 ):
     """
     Simple add-on that generates training model health reports for your Rasa projects. 📈🔍🧾🤖🧠
     """
-    report = ModelReport(
+    args = (path, output_path, project_name, rasa_version, project_version)
+    kwargs = {
+        "clear_cache": clear_cache,
+        "disable_nlu": disable_nlu,
+        "jobs": jobs,
+        "rasa_api_url": [url for row in rasa_api for url in row.split(",")],
+        "rasa_api_baseline": rasa_api_baseline,
+        "rasa_api_retries": rasa_api_retries,
+        "rasa_api_timeout": rasa_api_timeout,
+        "model_link": model_link,
+        "nlu_adaptive": nlu_adaptive,
+        "nlu_batch_size": nlu_batch_size,
+        "nlu_batch_url": nlu_batch_url,
+        "nlu_cache_size": nlu_cache_size,
+        "nlu_concurrency": nlu_concurrency,
+        "nlu_fail_threshold": nlu_fail_threshold,
+        "nlu_incremental": nlu_incremental,
+        "nlu_latency_target": nlu_latency_target,
+        "nlu_max_per_intent": nlu_max_per_intent,
+        "nlu_model": nlu_model,
+        "nlu_pool_size": nlu_pool_size,
+        "nlu_sample_rate": nlu_sample_rate,
+        "nlu_streaming": nlu_streaming,
+        "nlu_time_budget": nlu_time_budget,
+        "actions_path": actions_path,
+        "no_images": no_images,
+        "no_nlu_cache": no_nlu_cache,
+        "precision": precision,
+        "exclude": [item for row in exclude for item in row.split(",")],
+        "resume": resume,
+        "shard": shard,
+        "yaml_cache_hash": yaml_cache_hash,
+        "yaml_cache_size": yaml_cache_size
+    }
+    if ctx.invoked_subcommand:
+        ctx.obj = {"args": args, "kwargs": kwargs}
+        return None
+    report = ModelReport(*args, **kwargs)
+    if (report.markdown.nlu.partial or {}).get("reason") == "fail_threshold":
+        ctx.exit(1)
+    return report
+
+
+@main.command()
+@click.argument(
+    "predictions",
+    nargs=-1,
+    required=True,
+    type=click.Path(exists=True, dir_okay=False)
+)
+@click.help_option(
+    "--help",
+    "-h",
+    help="Show this help message."
+)
+@click.pass_context
+def merge(ctx, predictions):
+    """
+    Merge the partial NLU predictions files generated with --shard and create the report.
+
+    The report parameters must be informed before the command.
+
+    \b
+    Example:
+    rasa-model-report --path path/to/rasa/project merge results/nlu_predictions.shard-*.jsonl
+    """
+    kwargs = dict(ctx.obj["kwargs"], nlu_predictions=list(predictions), shard=None)
+    report = ModelReport(*ctx.obj["args"], **kwargs)
+    return report
+
+
+@main.command()
+@click.option(
+    "--duration",
+    type=click.FloatRange(min=0, min_open=True),
+    required=False,
+    default=constants.LOAD_TEST_DURATION,
+    help=f"Load test duration in seconds. (default: {constants.LOAD_TEST_DURATION})"
+)
+@click.help_option(
+    "--help",
+    "-h",
+    help="Show this help message."
+)
+@click.option(
+    "--max-in-flight",
+    type=click.IntRange(min=1),
+    required=False,
+    default=constants.LOAD_TEST_MAX_IN_FLIGHT,
+    help="Maximum number of requests waiting for the Rasa API. The requests scheduled above it are dropped and "
+    f"counted as errors. (default: {constants.LOAD_TEST_MAX_IN_FLIGHT})"
+)
+@click.option(
+    "--qps",
+    type=click.FloatRange(min=0, min_open=True),
+    required=True,
+    help="Requests per second sent to the Rasa API."
+)
+@click.option(
+    "--ramp-to",
+    type=click.FloatRange(min=0, min_open=True),
+    required=False,
+    help="Requests per second at the end of the load test. The rate grows linearly from --qps."
+)
+@click.pass_context
+def loadtest(ctx, duration, max_in_flight, qps, ramp_to):
+    """
+    Replay the NLU sentences against the Rasa API at a fixed or ramping rate.
+
+    The latency percentiles, error rates and saturation point are saved to load_test_report.md
+    and results/load_test.json. The report parameters must be informed before the command.
+
+    \b
+    Example:
+    rasa-model-report --rasa-api http://localhost:5005 loadtest --qps 10 --ramp-to 50 --duration 120
+    """
+    path, output_path, project_name, _, project_version = ctx.obj["args"]
+    kwargs = ctx.obj["kwargs"]
+    controller = LoadTestController(
         path,
         output_path,
         project_name,
-        rasa_version,
         project_version,
-        disable_nlu=disable_nlu,
-        rasa_api_url=rasa_api,
-        model_link=model_link,
-        actions_path=actions_path,
-        no_images=no_images,
-        precision=precision,
-        exclude=[item for row in exclude for item in row.split(",")]
+        qps=qps,
+        duration=duration,
+        ramp_to=ramp_to,
+        url=kwargs["rasa_api_url"],
+        max_in_flight=max_in_flight,
+        nlu_latency_target=kwargs["nlu_latency_target"],
+        rasa_api_timeout=kwargs["rasa_api_timeout"]
     )
-    return report
+    controller.run()
+    controller.save()
+    return controller
@@ -22,6 +22,7 @@ setup(
     url="https://github.com/brunohjs/rasa-model-report",
     packages=[
         "rasa_model_report",
+        "rasa_model_report.backends",
         "rasa_model_report.controllers",
         "rasa_model_report.helpers"
     ],
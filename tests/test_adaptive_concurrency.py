@@ -0,0 +1,64 @@
+from rasa_model_report.helpers.adaptive_concurrency import AdaptiveConcurrency
+
+
+def test_adaptive_concurrency_increases_under_latency_target():
+    concurrency = AdaptiveConcurrency(4, latency_target=1)
+    assert concurrency.limit == 1
+    for _ in range(10):
+        concurrency.acquire()
+        concurrency.release(0.1)
+    assert concurrency.limit == 4
+    assert concurrency.peak_limit == 4
+    assert concurrency.in_flight == 0
+    assert concurrency.requests == 10
+
+
+def test_adaptive_concurrency_decreases_on_error():
+    concurrency = AdaptiveConcurrency(8, latency_target=1)
+    concurrency.limit = 8
+    concurrency.acquire()
+    concurrency.release(0.1, error=True, retries=2)
+    assert concurrency.limit == 4
+    assert concurrency.errors == 1
+    assert concurrency.retries == 2
+    # A burst of errors in the same round cuts the limit only once.
+    concurrency.acquire()
+    concurrency.release(0.1, error=True)
+    assert concurrency.limit == 4
+
+
+def test_adaptive_concurrency_decreases_on_latency_spike():
+    concurrency = AdaptiveConcurrency(8, latency_target=1)
+    concurrency.limit = 2
+    for _ in range(2):
+        concurrency.acquire()
+    concurrency.release(0.1)
+    concurrency.release(5)
+    assert concurrency.limit == 1
+    concurrency.acquire()
+    concurrency.release(5, error=True)
+    assert concurrency.limit == 1
+
+
+def test_adaptive_concurrency_cancel():
+    concurrency = AdaptiveConcurrency(2)
+    concurrency.acquire()
+    concurrency.cancel()
+    assert concurrency.in_flight == 0
+    assert concurrency.requests == 0
+
+
+def test_adaptive_concurrency_percentile():
+    assert AdaptiveConcurrency.percentile([], 95) == 0
+    assert AdaptiveConcurrency.percentile([3, 1, 2], 50) == 2
+    assert AdaptiveConcurrency.percentile(list(range(1, 101)), 95) == 95
+    assert AdaptiveConcurrency.percentile([1, 2], 100) == 2
+
+
+def test_adaptive_concurrency_summary():
+    concurrency = AdaptiveConcurrency(2)
+    concurrency.acquire()
+    concurrency.release(0.1, retries=1)
+    summary = concurrency.summary()
+    assert "peak of 2" in summary
+    assert "1 retry(ies)" in summary
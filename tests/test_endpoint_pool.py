@@ -0,0 +1,27 @@
+from rasa_model_report.helpers.endpoint_pool import EndpointPool
+
+
+def test_endpoint_pool_least_outstanding_requests():
+    pool = EndpointPool(["http://rasa-1:5005", "http://rasa-2:5005", "http://rasa-1:5005"])
+    assert pool.urls == ["http://rasa-1:5005", "http://rasa-2:5005"]
+    first = pool.acquire()
+    second = pool.acquire()
+    assert {first, second} == {"http://rasa-1:5005", "http://rasa-2:5005"}
+    pool.release(second)
+    assert pool.acquire() == second
+
+
+def test_endpoint_pool_spreads_sequential_requests():
+    pool = EndpointPool(["http://rasa-1:5005", "http://rasa-2:5005"])
+    for _ in range(4):
+        pool.release(pool.acquire())
+    assert pool.served == {"http://rasa-1:5005": 2, "http://rasa-2:5005": 2}
+
+
+def test_endpoint_pool_eject():
+    pool = EndpointPool(["http://rasa-1:5005", "http://rasa-2:5005"])
+    pool.eject("http://rasa-1:5005")
+    assert pool.healthy == ["http://rasa-2:5005"]
+    assert pool.acquire() == "http://rasa-2:5005"
+    pool.eject("http://rasa-2:5005")
+    assert pool.acquire() is None
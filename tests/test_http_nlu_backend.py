@@ -0,0 +1,81 @@
+import pytest
+import requests
+import responses
+
+from rasa_model_report.backends.http_nlu_backend import HttpNluBackend
+from rasa_model_report.backends.nlu_backend import NluBackend
+from rasa_model_report.backends.nlu_backend import NluBackendUnavailableError
+from rasa_model_report.helpers.adaptive_concurrency import AdaptiveConcurrency
+from tests import utils
+
+
+@responses.activate
+def test_http_nlu_backend_parse():
+    utils.load_mock_payloads()
+    backend = HttpNluBackend(["http://localhost:5005"])
+    assert backend.batch_size is None
+    assert backend.is_available() is True
+    assert backend.parse("oi")["intent"]["name"] == "greet"
+    assert [payload["intent"]["name"] for payload in backend.parse_batch(["oi", "tudo bem"])] == ["greet", "greet"]
+    assert backend.latency.requests == 3
+
+
+@responses.activate
+@responses.activate
+def test_http_nlu_backend_model_status():
+    utils.load_mock_payloads()
+    backend = HttpNluBackend(["http://localhost:5005"])
+    assert backend.get_model_file() == "models/20230101-000000-test-model.tar.gz"
+    assert len(backend.get_model_fingerprint()) == 40
+    assert len([call for call in responses.calls if call.request.url.endswith("/status")]) == 1
+
+
+@responses.activate
+def test_http_nlu_backend_without_status():
+    backend = HttpNluBackend(["http://localhost:5009"])
+    assert backend.get_status() == {}
+    assert backend.get_model_file() is None
+    assert backend.get_model_fingerprint() is None
+    assert backend.get_model_file() is None
+
+
+@responses.activate
+def test_http_nlu_backend_retries_unavailable_responses():
+    responses.add(responses.POST, "http://localhost:5005/model/parse", status=503)
+    utils.load_mock_payloads()
+    backend = HttpNluBackend(["http://localhost:5005"])
+    assert backend.parse("oi")["intent"]["name"] == "greet"
+    assert len([call for call in responses.calls if call.request.url.endswith("/model/parse")]) == 2
+
+
+@responses.activate
+def test_http_nlu_backend_counts_retries_of_failed_requests():
+    responses.add(responses.POST, "http://localhost:5005/model/parse", body=requests.exceptions.ConnectionError())
+    utils.load_mock_payloads()
+    concurrency = AdaptiveConcurrency(max_limit=1)
+    backend = HttpNluBackend(["http://localhost:5005"], retries=3, concurrency=concurrency)
+    assert backend.parse("oi") == {}
+    assert concurrency.errors == 1
+    assert concurrency.retries == 3
+
+
+@responses.activate
+def test_http_nlu_backend_unavailable():
+    backend = HttpNluBackend(["http://localhost:5009"])
+    assert backend.is_available() is False
+    with pytest.raises(NluBackendUnavailableError):
+        backend.parse("oi")
+
+
+def test_http_nlu_backend_batch_size():
+    backend = HttpNluBackend(["http://localhost:5005"], batch_url="http://localhost:5005/batch", batch_size=8)
+    assert backend.batch_size == 8
+
+
+def test_nlu_backend_interface():
+    backend = NluBackend()
+    assert backend.get_model_fingerprint() is None
+    with pytest.raises(NotImplementedError):
+        backend.is_available()
+    with pytest.raises(NotImplementedError):
+        backend.parse_batch(["oi"])
@@ -0,0 +1,38 @@
+import pytest
+
+from rasa_model_report.helpers.latency_histogram import LatencyHistogram
+
+
+def test_latency_histogram_percentiles():
+    histogram = LatencyHistogram()
+    for index in range(1, 101):
+        histogram.record(0, index / 100, f"sentence {index}")
+    assert histogram.requests == 100
+    assert histogram.percentile(50) == pytest.approx(0.5, rel=0.05)
+    assert histogram.percentile(90) == pytest.approx(0.9, rel=0.05)
+    assert histogram.percentile(99) == pytest.approx(0.99, rel=0.05)
+    assert histogram.percentile(100) == 1
+    assert histogram.max == 1
+
+
+def test_latency_histogram_empty():
+    histogram = LatencyHistogram()
+    assert histogram.percentile(50) == 0
+    assert histogram.throughput == 0
+    assert histogram.summary()["slowest"] == []
+
+
+def test_latency_histogram_throughput_and_errors():
+    histogram = LatencyHistogram()
+    histogram.record(10, 10.5, "first")
+    histogram.record(10.5, 12, "second", error=True)
+    assert histogram.errors == 1
+    assert histogram.throughput == 1
+
+
+def test_latency_histogram_slowest():
+    histogram = LatencyHistogram(slowest_size=2)
+    for latency, text in [(0.1, "fast"), (0.5, "slow"), (0.3, "medium"), (0.9, "slowest")]:
+        histogram.record(0, latency, text)
+    assert [item["text"] for item in histogram.slowest] == ["slowest", "slow"]
+    assert histogram.summary()["slowest"][0] == {"text": "slowest", "latency": 0.9}
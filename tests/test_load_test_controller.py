@@ -0,0 +1,91 @@
+import json
+import os.path
+import time
+
+import pytest
+import responses
+
+from rasa_model_report.controllers.load_test_controller import LoadTestController
+from tests import utils
+
+
+def test_load_test_schedule(rasa_path):
+    controller = LoadTestController(rasa_path, "./tests", "test-project", "0.0.0", qps=10, duration=1)
+    assert controller.schedule() == pytest.approx([index / 10 for index in range(10)])
+
+
+def test_load_test_schedule_with_ramp(rasa_path):
+    controller = LoadTestController(rasa_path, "./tests", "test-project", "0.0.0", qps=10, duration=2, ramp_to=30)
+    schedule = controller.schedule()
+    assert len(schedule) == 40
+    assert schedule == sorted(schedule)
+    # The interval between requests shrinks as the rate grows.
+    assert schedule[1] - schedule[0] > schedule[-1] - schedule[-2]
+    assert schedule[-1] < 2
+
+
+@responses.activate
+def test_load_test_run(rasa_path):
+    utils.load_mock_payloads()
+    controller = LoadTestController(
+        rasa_path, "./tests", "test-project", "0.0.0", qps=20, duration=0.5, window=0.25, nlu_latency_target=5
+    )
+    result = controller.run()
+    assert result["scheduled"] == 10
+    assert result["requests"] == 10
+    assert result["errors"] == 0
+    assert result["dropped"] == 0
+    assert result["saturation_qps"] is None
+    assert [window["requests"] for window in result["windows"]] == [5, 5]
+    assert result["windows"][0]["offered_qps"] == 20
+    assert result["throughput"] == pytest.approx(controller.backend.latency.throughput)
+    controller.save()
+    assert json.load(open(controller.result_path, encoding="utf-8"))["requests"] == 10
+    assert utils.check_model_report_text(controller.output_report_path, ["# Load test report", "wasn't saturated"])
+
+
+@responses.activate
+def test_load_test_with_errors(rasa_path):
+    utils.load_mock_payloads()
+    controller = LoadTestController(
+        rasa_path, "./tests", "test-project", "0.0.0", url="http://localhost:5008", qps=20, duration=0.25
+    )
+    result = controller.run()
+    assert result["errors"] == result["requests"] == 5
+    assert result["error_rate"] == 1
+    assert result["throughput"] == 0
+    assert result["saturation_qps"] == 20
+    assert "was saturated at **20.0 request(s) per second**" in controller.build_report()
+
+
+@responses.activate
+def test_load_test_drops_requests_above_max_in_flight(rasa_path):
+    payload = utils.MOCK_PAYLOADS["default"][2]["json"]
+    responses.add(responses.GET, "http://localhost:5005", json={})
+    responses.add_callback(
+        responses.POST,
+        "http://localhost:5005/model/parse",
+        callback=lambda request: time.sleep(0.2) or (200, {}, json.dumps(payload))
+    )
+    controller = LoadTestController(
+        rasa_path, "./tests", "test-project", "0.0.0", qps=20, duration=0.5, max_in_flight=1
+    )
+    result = controller.run()
+    assert result["scheduled"] == 10
+    assert 0 < result["requests"] < 10
+    assert result["dropped"] == 10 - result["requests"]
+    assert result["errors"] == 0
+    assert result["error_rate"] == pytest.approx(result["dropped"] / 10)
+    assert sum(window["dropped"] for window in result["windows"]) == result["dropped"]
+    assert result["saturation_qps"] == 20
+
+
+@responses.activate
+def test_load_test_without_rasa_api(rasa_path):
+    controller = LoadTestController(
+        rasa_path, "./tests", "test-project", "0.0.0", url="http://localhost:5009", qps=10, duration=1
+    )
+    assert controller.is_connected() is False
+    assert controller.run() == {}
+    controller.save()
+    assert not os.path.isfile(controller.output_report_path)
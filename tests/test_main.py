@@ -66,9 +66,135 @@ def test_main_with_no_images(rasa_path):
     assert result.output == ""
 
 
+@responses.activate
+def test_main_with_nlu_concurrency(rasa_path):
+    utils.load_mock_payloads()
+    runner = CliRunner()
+    result = runner.invoke(main, ["--path", rasa_path, "--nlu-concurrency", "4"])
+    assert os.path.isfile("model_report.md") is True
+    assert utils.check_model_report_sections("model_report.md") is True
+    assert result.exit_code == 0
+    assert result.output == ""
+
+
+@responses.activate
+def test_main_with_nlu_adaptive(rasa_path):
+    utils.load_mock_payloads()
+    runner = CliRunner()
+    result = runner.invoke(main, [
+        "--path", rasa_path, "--nlu-adaptive", "--nlu-concurrency", "4", "--nlu-latency-target", "0.5",
+        "--rasa-api-retries", "0"
+    ])
+    assert os.path.isfile("model_report.md") is True
+    assert utils.check_model_report_sections("model_report.md") is True
+    assert result.exit_code == 0
+    assert result.output == ""
+
+
+@responses.activate
+def test_main_with_nlu_time_budget(rasa_path):
+    utils.load_mock_payloads()
+    runner = CliRunner()
+    result = runner.invoke(main, ["--path", rasa_path, "--nlu-time-budget", "60", "--nlu-fail-threshold", "0"])
+    assert utils.check_model_report_sections("model_report.md") is True
+    assert "Partial results" not in open("model_report.md", encoding="utf-8").read()
+    assert result.exit_code == 0
+
+
+@responses.activate
+def test_main_with_nlu_fail_threshold(rasa_path):
+    utils.load_mock_payloads()
+    runner = CliRunner()
+    result = runner.invoke(main, ["--path", rasa_path, "--nlu-fail-threshold", "0.99"])
+    assert utils.check_model_report_text("model_report.md", "**Partial results**") is True
+    assert result.exit_code == 1
+
+
+@responses.activate
+def test_main_with_rasa_api_baseline(rasa_path):
+    utils.load_mock_payloads()
+    runner = CliRunner()
+    result = runner.invoke(main, ["--path", rasa_path, "--rasa-api-baseline", "http://localhost:5006"])
+    assert utils.check_model_report_text("model_report.md", "### Comparison with the baseline model") is True
+    assert result.exit_code == 0
+
+
+@responses.activate
+def test_main_with_several_rasa_api(rasa_path):
+    utils.load_mock_payloads()
+    runner = CliRunner()
+    result = runner.invoke(main, ["--path", rasa_path, "--rasa-api", "http://localhost:5005,http://localhost:5006"])
+    assert os.path.isfile("model_report.md") is True
+    assert utils.check_model_report_text("model_report.md", "## NLU") is True
+    assert result.exit_code == 0
+    assert result.output == ""
+
+
+@responses.activate
+def test_main_with_shard_and_merge(rasa_path):
+    utils.load_mock_payloads()
+    runner = CliRunner()
+    for shard in ["1/2", "2/2"]:
+        result = runner.invoke(main, ["--path", rasa_path, "--shard", shard])
+        assert result.exit_code == 0
+    result = runner.invoke(
+        main,
+        [
+            "--path",
+            rasa_path,
+            "merge",
+            f"{rasa_path}/results/nlu_predictions.shard-1-of-2.jsonl",
+            f"{rasa_path}/results/nlu_predictions.shard-2-of-2.jsonl"
+        ]
+    )
+    assert result.exit_code == 0
+    assert result.output == ""
+    assert utils.check_model_report_text("model_report.md", "## NLU") is True
+    assert os.path.isfile(f"{rasa_path}/results/nlu_report.csv") is True
+
+
+@responses.activate
+def test_main_with_loadtest(rasa_path):
+    utils.load_mock_payloads()
+    runner = CliRunner()
+    result = runner.invoke(main, ["--path", rasa_path, "loadtest", "--qps", "20", "--duration", "0.25"])
+    assert result.exit_code == 0
+    assert result.output == ""
+    assert os.path.isfile(f"{rasa_path}/results/load_test.json") is True
+    assert utils.check_model_report_text("load_test_report.md", "# Load test report") is True
+    assert os.path.isfile("model_report.md") is False
+
+
+def test_main_with_invalid_shard(rasa_path):
+    runner = CliRunner()
+    result = runner.invoke(main, ["--path", rasa_path, "--shard", "3/2"])
+    assert result.exit_code == 2
+    assert os.path.isfile("model_report.md") is False
+
+
 def test_main_help():
     runner = CliRunner()
     result = runner.invoke(main, ["--help"])
     assert os.path.isfile("model_report.md") is False
     assert result.exit_code == 0
     assert result.output
+
+
+@responses.activate
+def test_main_with_clear_cache(rasa_path):
+    runner = CliRunner()
+    result = runner.invoke(main, ["--path", rasa_path, "--disable-nlu"])
+    assert os.path.isfile(f"{rasa_path}/results/yaml_cache.bin") is True
+    result = runner.invoke(
+        main, ["--path", rasa_path, "--disable-nlu", "--clear-cache", "--yaml-cache-hash", "--yaml-cache-size", "1"]
+    )
+    assert os.path.isfile(f"{rasa_path}/results/yaml_cache.bin") is True
+    assert result.exit_code == 0
+
+
+@responses.activate
+def test_main_with_jobs(rasa_path):
+    runner = CliRunner()
+    result = runner.invoke(main, ["--path", rasa_path, "--disable-nlu", "--jobs", "2"])
+    assert utils.check_model_report_sections("model_report.md") is True
+    assert result.exit_code == 0
@@ -4,6 +4,9 @@ import pytest
 import responses
 
 from rasa_model_report.controllers.json_controller import JsonController
+from rasa_model_report.controllers.markdown_controller import MarkdownController
+from rasa_model_report.helpers.latency_histogram import LatencyHistogram
+from tests import utils
 
 
 def test_init_markdown_controller(rasa_path):
@@ -82,6 +85,7 @@ def test_build_summary():
     assert isinstance(text, str)
     assert markdown_controller.nlu.is_connected() is True
     assert "#nlu" in text
+    assert "#performance" in text
 
 
 def test_build_summary_without_nlu_section():
@@ -91,6 +95,7 @@ def test_build_summary_without_nlu_section():
     assert isinstance(text, str)
     assert markdown_controller.nlu.is_connected() is False
     assert "#nlu" not in text
+    assert "#performance" not in text
 
 
 def test_build_summary_without_config_section():
@@ -265,6 +270,70 @@ def test_build_nlu_title():
     text = markdown_controller.build_nlu_title()
     assert isinstance(text, str)
     assert "## NLU <a name='nlu'></a>" in text
+    assert "confidence interval" not in text
+
+
+def test_build_nlu_title_with_sampling():
+    markdown_controller = pytest.markdown_controller
+    markdown_controller.nlu = pytest.nlu_controller
+    markdown_controller.nlu._overall_score = 0.8
+    markdown_controller.nlu._confidence_interval = (0.7, 0.9)
+    text = markdown_controller.build_nlu_title()
+    assert "**8** (95% confidence interval: 7 - 9)" in text
+
+
+@responses.activate
+def test_build_nlu_table_streaming(rasa_path):
+    utils.load_mock_payloads()
+    markdown_controller = MarkdownController(
+        rasa_path, "./tests", "test-project", "3.0.0", "0.0.0", nlu_streaming=True
+    )
+    text = markdown_controller.build_nlu_table()
+    assert "Only the sentences with the highest and the lowest confidences" in text
+    assert "nlu_predictions.jsonl" in text
+
+
+@responses.activate
+def test_build_nlu_baseline_table(rasa_path):
+    utils.load_mock_payloads()
+    markdown_controller = MarkdownController(
+        rasa_path, "./tests", "test-project", "3.0.0", "0.0.0", rasa_api_baseline="http://localhost:5006"
+    )
+    text = markdown_controller.build_nlu_baseline_table()
+    assert "### Comparison with the baseline model" in text
+    assert "|greet|affirm|greet|60.0%|77.5%|❌ → ✅|" in text
+    assert os.path.isfile(f"{markdown_controller.results_path}/nlu_baseline_report.csv")
+    markdown_controller.nlu._baseline_changes = []
+    assert "No sentence changed its prediction" in markdown_controller.build_nlu_baseline_table()
+    markdown_controller.nlu.baseline_missing = 2
+    assert "2 sentence(s) couldn't be predicted by the baseline model" in \
+        markdown_controller.build_nlu_baseline_table()
+    assert pytest.markdown_controller.build_nlu_baseline_table() is None
+
+
+def test_build_nlu_entity_table():
+    markdown_controller = pytest.markdown_controller
+    markdown_controller.nlu = pytest.nlu_controller
+    markdown_controller.nlu._entity_scores = {
+        "day": {"name": "day", "precision": 0.5, "recall": 1, "f1-score": 2 / 3, "support": 3}
+    }
+    text = markdown_controller.build_nlu_entity_table()
+    assert "### Entities" in text
+    assert "|day|50.0%|100.0%|66.7%|3|" in text
+    markdown_controller.nlu._entity_scores = {}
+    assert "No entities were annotated" in markdown_controller.build_nlu_entity_table()
+
+
+def test_build_nlu_title_with_partial_data():
+    markdown_controller = pytest.markdown_controller
+    markdown_controller.nlu = pytest.nlu_controller
+    markdown_controller.nlu._partial = {"reason": "time_budget", "analyzed": 3, "total": 10}
+    text = markdown_controller.build_nlu_title()
+    assert "**Partial results**: only 3 of 10 example phrases were analyzed" in text
+    assert "the time budget ran out" in text
+    markdown_controller.nlu._partial = {"reason": "failed_requests", "analyzed": 9, "total": 10, "failed": 1}
+    assert "the requests of 1 of them failed" in markdown_controller.build_nlu_title()
+    markdown_controller.nlu._partial = None
 
 
 @responses.activate
@@ -306,6 +375,39 @@ def test_build_nlu_errors_table_if_len_less_than_2():
     assert "There are no sentences that were not understood in this model" in text
 
 
+def test_build_performance_title():
+    markdown_controller = pytest.markdown_controller
+    text = markdown_controller.build_performance_title()
+    assert isinstance(text, str)
+    assert "## Inference performance <a name='performance'></a>" in text
+
+
+def test_build_performance_overview_and_table():
+    markdown_controller = pytest.markdown_controller
+    markdown_controller.nlu.backend.latency = LatencyHistogram()
+    markdown_controller.nlu.deduplicated = 0
+    markdown_controller.nlu.backend.latency.record(0, 0.25, "slow sentence")
+    markdown_controller.nlu.backend.latency.record(0.25, 0.3, "fast sentence")
+    text = markdown_controller.build_performance_overview()
+    assert "|Requests|Errors|p50|p90|p99|Max|Throughput|" in text
+    assert "250.0 ms" in text
+    assert "6.7 req/s" in text
+    assert "saved by requesting duplicated sentences" not in text
+    markdown_controller.nlu.deduplicated = 4
+    text = markdown_controller.build_performance_overview()
+    assert "4 request(s) were saved by requesting duplicated sentences once" in text
+    text = markdown_controller.build_performance_table()
+    assert "|1|slow sentence|250.0 ms|" in text
+    assert "|2|fast sentence|50.0 ms|" in text
+
+
+def test_build_performance_without_requests():
+    markdown_controller = pytest.markdown_controller
+    markdown_controller.nlu.backend.latency = LatencyHistogram()
+    assert "No requests were sent to the Rasa API" in markdown_controller.build_performance_overview()
+    assert "No requests were sent to the Rasa API" in markdown_controller.build_performance_table()
+
+
 def test_build_config_report():
     markdown_controller = pytest.markdown_controller
     text = markdown_controller.build_config_report()
@@ -335,6 +437,17 @@ def test_save_overview():
     assert os.path.isfile(markdown_controller.json.overview_report_path)
 
 
+@responses.activate
+def test_save_overview_with_nlu_model(rasa_path):
+    utils.load_mock_payloads()
+    markdown_controller = MarkdownController(rasa_path, "./tests", "test-project", "3.0.0", "0.0.0")
+    markdown_controller.save_overview()
+    overview = JsonController.load_json_file(markdown_controller.json.overview_report_path)
+    assert overview["nlu_model"]["model_file"] == "models/20230101-000000-test-model.tar.gz"
+    assert overview["nlu_model"]["fingerprint"] == markdown_controller.nlu.fingerprint
+    assert overview["nlu_data_hash"] == markdown_controller.nlu.nlu_data_hash
+
+
 def test_build_line_entity_when_there_is_no_entities():
     markdown_controller = pytest.markdown_controller
     text = markdown_controller.build_line_entity([])
@@ -376,3 +489,9 @@ def test_build_e2e_coverage_list_when_havent_elements():
     assert "### Not covered elements" in text
     assert "Total number of elements:" not in text
     assert "There are no end-to-end tests coverage." in text
+
+
+def test_markdown_controller_shares_project_index():
+    markdown_controller = pytest.markdown_controller
+    assert markdown_controller.nlu.project_index is markdown_controller.project_index
+    assert markdown_controller.e2e_coverage.project_index is markdown_controller.project_index
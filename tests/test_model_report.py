@@ -1,3 +1,4 @@
+import json
 import os.path
 
 import pytest
@@ -50,6 +51,19 @@ def test_model_report_with_nlu():
     model_report.generate_report()
     assert os.path.isfile(model_report.markdown.output_report_path)
     assert os.path.isfile(model_report.markdown.json.overview_report_path)
+    assert utils.check_model_report_text(model_report.markdown.output_report_path, "## Inference performance")
+
+
+@responses.activate
+def test_model_report_saves_nlu_performance(rasa_path):
+    utils.remove_generated_files(rasa_path)
+    utils.load_mock_payloads()
+    model_report = ModelReport(rasa_path, "./tests", "test-project", "0.0.0", "0.0.0", no_nlu_cache=True)
+    overview = json.load(open(model_report.markdown.json.overview_report_path, encoding="utf-8"))
+    assert overview["nlu_performance"]["requests"] > 0
+    assert set(overview["nlu_performance"]) == {
+        "requests", "errors", "p50", "p90", "p99", "max", "throughput", "slowest", "saved_requests"
+    }
 
 
 def test_model_report_with_invalid_path(rasa_path):
@@ -0,0 +1,32 @@
+from rasa_model_report.helpers.nlu_aggregator import NluAggregator
+
+
+def build_item(index, intent="greet", understood=False):
+    return {"intent": intent, "text": f"sentence {index}", "confidence": index / 100, "understood": understood}
+
+
+def test_nlu_aggregator_counters():
+    aggregator = NluAggregator()
+    aggregator.add(build_item(1))
+    aggregator.add(build_item(2, understood=True))
+    aggregator.add(build_item(3, intent="goodbye", understood=True))
+    assert aggregator.total == 3
+    assert aggregator.problems == 2
+    assert aggregator.intents == {"greet": {"total": 2, "problems": 1}, "goodbye": {"total": 1, "problems": 1}}
+    assert [item["text"] for item in aggregator.problem_sentences] == ["sentence 3", "sentence 2"]
+
+
+def test_nlu_aggregator_keeps_highest_and_lowest_confidences():
+    aggregator = NluAggregator(top_size=2)
+    for index in [50, 10, 90, 30, 70, 20, 80]:
+        aggregator.add(build_item(index))
+    assert aggregator.total == 7
+    assert [item["confidence"] for item in aggregator.sentences] == [0.9, 0.8, 0.2, 0.1]
+
+
+def test_nlu_aggregator_with_few_sentences():
+    aggregator = NluAggregator(top_size=5)
+    for index in [50, 10, 90]:
+        aggregator.add(build_item(index))
+    assert [item["confidence"] for item in aggregator.sentences] == [0.9, 0.5, 0.1]
+    assert NluAggregator().sentences == []
@@ -0,0 +1,60 @@
+import os.path
+
+import pytest
+
+from rasa_model_report.helpers.nlu_cache import NluCache
+
+
+@pytest.fixture
+def cache_path(rasa_path):
+    filename = f"{rasa_path}/results/nlu_cache.json"
+    yield filename
+    if os.path.isfile(filename):
+        os.remove(filename)
+
+
+def test_nlu_cache_get_and_set(cache_path):
+    cache = NluCache(cache_path, "fingerprint")
+    assert cache.get("hello") is None
+    cache.set("hello", {"intent": {"name": "greet"}})
+    assert cache.get("  hello ") == {"intent": {"name": "greet"}}
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_nlu_cache_returns_copies(cache_path):
+    cache = NluCache(cache_path, "fingerprint")
+    payload = {"intent": {"name": "greet"}}
+    cache.set("hello", payload)
+    payload["intent"]["name"] = "changed"
+    cached = cache.get("hello")
+    cached["intent"]["name"] = "changed"
+    assert cache.get("hello") == {"intent": {"name": "greet"}}
+
+
+def test_nlu_cache_lru_eviction(cache_path):
+    cache = NluCache(cache_path, "fingerprint", max_size=2)
+    cache.set("first", {"id": 1})
+    cache.set("second", {"id": 2})
+    cache.get("first")
+    cache.set("third", {"id": 3})
+    assert len(cache) == 2
+    assert cache.get("second") is None
+    assert cache.get("first") == {"id": 1}
+    assert cache.get("third") == {"id": 3}
+
+
+def test_nlu_cache_persistence_by_fingerprint(cache_path):
+    cache = NluCache(cache_path, "fingerprint")
+    cache.set("hello", {"id": 1})
+    cache.save()
+    assert os.path.isfile(cache_path)
+    assert NluCache(cache_path, "fingerprint").get("hello") == {"id": 1}
+    assert NluCache(cache_path, "another fingerprint").get("hello") is None
+
+
+def test_nlu_cache_invalid_file(cache_path):
+    file = open(cache_path, "w", encoding="utf-8")
+    file.write("invalid json")
+    file.close()
+    assert len(NluCache(cache_path, "fingerprint")) == 0
@@ -1,7 +1,19 @@
+import json
+import os.path
+from unittest import mock
+
 import pytest
+import requests
 import responses
 
+from rasa_model_report.backends.nlu_backend import NluBackendUnavailableError
+from rasa_model_report.backends.rasa_nlu_backend import RasaNluBackend
 from rasa_model_report.controllers.nlu_controller import NluController
+from rasa_model_report.helpers import constants
+from rasa_model_report.helpers.latency_histogram import LatencyHistogram
+from rasa_model_report.helpers.nlu_cache import NluCache
+from rasa_model_report.helpers.nlu_predictions import NluPredictions
+from rasa_model_report.helpers.nlu_record import NluRecord
 from tests import utils
 
 
@@ -35,6 +47,633 @@ def test_init_nlu_controller(rasa_path):
     assert nlu_controller.is_connected() is True
 
 
+@responses.activate
+def test_generate_data_with_concurrency(rasa_path):
+    utils.load_mock_payloads()
+    nlu_controller = NluController(rasa_path, "./tests", "test-project", "0.0.0", nlu_concurrency=4)
+    assert nlu_controller.nlu_concurrency == 4
+    assert nlu_controller.data == pytest.nlu_controller.data
+    assert nlu_controller.overall_score == pytest.nlu_controller.overall_score
+
+
+@responses.activate
+def test_generate_data_records_latency(rasa_path):
+    utils.load_mock_payloads()
+    nlu_controller = NluController(rasa_path, "./tests", "test-project", "0.0.0", no_nlu_cache=True)
+    performance = nlu_controller.performance
+    assert performance["requests"] == count_parse_requests()
+    assert performance["errors"] == 0
+    assert 0 <= performance["p50"] <= performance["p90"] <= performance["p99"] <= performance["max"]
+    assert performance["throughput"] > 0
+    assert 0 < len(performance["slowest"]) <= 10
+    assert performance["slowest"][0]["latency"] == performance["max"]
+
+
+@responses.activate
+def test_generate_data_deduplicates_sentences(rasa_path):
+    utils.load_mock_payloads()
+    nlu_controller = NluController(rasa_path, "./tests", "test-project", "0.0.0", no_nlu_cache=True)
+    nlu_controller._data = {
+        "greet": ["oi", "[oi](greeting)", "  oi"],
+        "mood_great": ["oi", "tudo bem"]
+    }
+    parse_requests = count_parse_requests()
+    data = nlu_controller._generate_data()
+    assert count_parse_requests() - parse_requests == 2
+    assert nlu_controller.deduplicated == 3
+    assert nlu_controller.performance["saved_requests"] == 3
+    assert len(data) == 5
+    assert sorted(item["intent"] for item in data) == ["greet", "greet", "greet", "mood_great", "mood_great"]
+    assert len({id(item) for item in data}) == 5
+    assert all(isinstance(item, NluRecord) for item in data)
+
+
+def add_batch_endpoint(wrap_results=False):
+    payload = utils.MOCK_PAYLOADS["default"][2]["json"]
+
+    def callback(request):
+        results = [payload] * len(json.loads(request.body)["texts"])
+        return 200, {}, json.dumps({"results": results} if wrap_results else results)
+
+    responses.add_callback(responses.POST, "http://localhost:5005/model/parse_batch", callback=callback)
+
+
+def count_batch_requests():
+    return len([call for call in responses.calls if call.request.url.endswith("/model/parse_batch")])
+
+
+@responses.activate
+def test_generate_data_with_batch_endpoint(rasa_path):
+    utils.load_mock_payloads()
+    add_batch_endpoint()
+    nlu_controller = NluController(
+        rasa_path, "./tests", "test-project", "0.0.0",
+        nlu_batch_url="http://localhost:5005/model/parse_batch", nlu_batch_size=4, no_nlu_cache=True
+    )
+    assert count_parse_requests() == 0
+    assert count_batch_requests() == -(-count_distinct_texts(nlu_controller.data) // 4)
+    assert nlu_controller.data == pytest.nlu_controller.data
+
+
+@responses.activate
+def test_request_nlu_batch_with_results_key(rasa_path):
+    utils.load_mock_payloads()
+    add_batch_endpoint(wrap_results=True)
+    nlu_controller = NluController(rasa_path, "./tests", "test-project", "0.0.0")
+    nlu_controller.backend.batch_url = "http://localhost:5005/model/parse_batch"
+    nlu_controller.cache.set("cached sentence", {"intent": {"name": "cached"}})
+    payloads = nlu_controller.request_nlu_batch(["oi", "cached sentence", "tudo bem"])
+    assert [payload["intent"]["name"] for payload in payloads] == ["greet", "cached", "greet"]
+    assert json.loads(responses.calls[-1].request.body) == {"texts": ["oi", "tudo bem"]}
+
+
+@responses.activate
+def test_request_nlu_batch_fallback(rasa_path):
+    utils.load_mock_payloads()
+    nlu_controller = NluController(
+        rasa_path, "./tests", "test-project", "0.0.0",
+        nlu_batch_url="http://localhost:5005/model/parse_batch", no_nlu_cache=True
+    )
+    assert count_parse_requests() == count_distinct_texts(nlu_controller.data)
+    assert nlu_controller.data == pytest.nlu_controller.data
+
+
+def test_init_nlu_controller_with_fake_backend(rasa_path):
+    backend = utils.FakeNluBackend()
+    nlu_controller = NluController(rasa_path, "./tests", "test-project", "0.0.0", nlu_backend=backend)
+    assert nlu_controller.backend is backend
+    assert nlu_controller.is_connected() is True
+    assert nlu_controller.fingerprint == "fake-model"
+    assert len(backend.parsed) == count_distinct_texts(nlu_controller.data)
+    assert {item["predicted_intent"] for item in nlu_controller.data} == {"greet"}
+    assert nlu_controller.performance["requests"] == len(backend.parsed)
+
+
+def test_init_nlu_controller_with_fake_batch_backend(rasa_path):
+    backend = utils.FakeNluBackend(batch_size=3)
+    nlu_controller = NluController(
+        rasa_path, "./tests", "test-project", "0.0.0", nlu_backend=backend, no_nlu_cache=True
+    )
+    assert backend.batches
+    assert max(len(batch) for batch in backend.batches) == 3
+    assert sum(len(batch) for batch in backend.batches) == count_distinct_texts(nlu_controller.data)
+
+
+def test_init_nlu_controller_with_unavailable_backend(rasa_path):
+    backend = utils.FakeNluBackend(available=False)
+    nlu_controller = NluController(rasa_path, "./tests", "test-project", "0.0.0", nlu_backend=backend)
+    assert nlu_controller.is_connected() is False
+    assert backend.parsed == []
+
+
+def test_generate_data_with_time_budget(rasa_path):
+    backend = utils.FakeNluBackend(delay=0.05)
+    nlu_controller = NluController(
+        rasa_path, "./tests", "test-project", "0.0.0", nlu_backend=backend, no_nlu_cache=True,
+        nlu_incremental=True, nlu_time_budget=0.1
+    )
+    assert nlu_controller.partial["reason"] == "time_budget"
+    assert 0 < nlu_controller.partial["analyzed"] < nlu_controller.partial["total"]
+    assert len(nlu_controller.data) == nlu_controller.partial["analyzed"]
+    assert not os.path.isfile(nlu_controller.nlu_incremental_path)
+
+
+def test_generate_data_with_fail_threshold(rasa_path):
+    backend = utils.FakeNluBackend()
+    nlu_controller = NluController(
+        rasa_path, "./tests", "test-project", "0.0.0", nlu_backend=backend, no_nlu_cache=True,
+        nlu_fail_threshold=0.99
+    )
+    assert nlu_controller.partial["reason"] == "fail_threshold"
+    assert nlu_controller.partial["analyzed"] < nlu_controller.partial["total"]
+    assert len(backend.parsed) < nlu_controller.partial["total"]
+
+
+def test_generate_data_within_limits(rasa_path):
+    backend = utils.FakeNluBackend()
+    nlu_controller = NluController(
+        rasa_path, "./tests", "test-project", "0.0.0", nlu_backend=backend, no_nlu_cache=True,
+        nlu_time_budget=60, nlu_fail_threshold=0
+    )
+    assert nlu_controller.partial is None
+    assert nlu_controller.data == pytest.nlu_controller.data
+
+
+@responses.activate
+def test_generate_data_with_failed_request(rasa_path):
+    responses.add(responses.POST, "http://localhost:5005/model/parse", body=requests.exceptions.ReadTimeout())
+    responses.add(responses.POST, "http://localhost:5005/model/parse", body="Internal error", status=200)
+    utils.load_mock_payloads()
+    nlu_controller = NluController(
+        rasa_path, "./tests", "test-project", "0.0.0", no_nlu_cache=True, nlu_incremental=True
+    )
+    assert nlu_controller.failed_sentences == 2
+    assert nlu_controller.partial["reason"] == "failed_requests"
+    assert nlu_controller.partial["analyzed"] == nlu_controller.partial["total"] - 2
+    assert len(nlu_controller.data) == nlu_controller.partial["analyzed"]
+    assert not os.path.isfile(nlu_controller.nlu_incremental_path)
+
+
+def test_generate_data_with_failed_batch_items(rasa_path):
+    backend = utils.FakeNluBackend(batch_size=3)
+    parse_batch = backend.parse_batch
+    backend.parse_batch = lambda texts: [None] + parse_batch(texts)[1:]
+    nlu_controller = NluController(
+        rasa_path, "./tests", "test-project", "0.0.0", nlu_backend=backend, no_nlu_cache=True
+    )
+    assert nlu_controller.failed_sentences >= len(backend.batches)
+    assert nlu_controller.partial["reason"] == "failed_requests"
+    assert 0 < len(nlu_controller.data) == nlu_controller.partial["analyzed"]
+
+
+def test_generate_data_with_all_endpoints_ejected(rasa_path):
+    backend = utils.FakeNluBackend()
+    parse = backend.parse
+
+    def parse_until_ejected(text):
+        if len(backend.parsed) >= 3:
+            raise NluBackendUnavailableError("All Rasa API endpoints were ejected from the pool as unhealthy.")
+        return parse(text)
+
+    backend.parse = parse_until_ejected
+    nlu_controller = NluController(
+        rasa_path, "./tests", "test-project", "0.0.0", nlu_backend=backend, no_nlu_cache=True,
+        nlu_incremental=True
+    )
+    assert nlu_controller.partial["reason"] == "endpoints_ejected"
+    assert 0 < nlu_controller.partial["analyzed"] < nlu_controller.partial["total"]
+    assert len(nlu_controller.data) == nlu_controller.partial["analyzed"]
+    assert not os.path.isfile(nlu_controller.nlu_incremental_path)
+
+
+@responses.activate
+def test_generate_data_streaming(rasa_path):
+    utils.load_mock_payloads()
+    nlu_controller = NluController(rasa_path, "./tests", "test-project", "0.0.0", nlu_streaming=True)
+    assert nlu_controller.aggregator.total == nlu_controller.total_sentences == len(pytest.nlu_controller.data)
+    assert nlu_controller.overall_score == pytest.nlu_controller.overall_score
+    assert nlu_controller.problem_sentences == pytest.nlu_controller.problem_sentences
+    assert len(nlu_controller.data) <= min(2 * constants.NLU_STREAMING_SENTENCES, nlu_controller.total_sentences)
+    assert nlu_controller.data[0]["confidence"] == pytest.nlu_controller.data[0]["confidence"]
+
+
+@responses.activate
+def test_generate_data_streaming_with_sampling(rasa_path):
+    utils.load_mock_payloads()
+    kwargs = {"nlu_sample_rate": 0.5, "no_nlu_cache": True}
+    nlu_controller = NluController(rasa_path, "./tests", "test-project", "0.0.0", **kwargs)
+    streaming_controller = NluController(rasa_path, "./tests", "test-project", "0.0.0", nlu_streaming=True, **kwargs)
+    assert streaming_controller.overall_score == nlu_controller.overall_score
+    assert streaming_controller.confidence_interval == nlu_controller.confidence_interval
+
+
+def save_previous_overview(nlu_controller, **kwargs):
+    overview = {
+        "nlu_model": {"fingerprint": nlu_controller.fingerprint, "model_file": nlu_controller.model_file},
+        "nlu_data_hash": nlu_controller.nlu_data_hash
+    }
+    overview.update(kwargs)
+    json.dump(overview, open(f"{nlu_controller.results_path}/overview.json", "w", encoding="utf-8"))
+
+
+@pytest.mark.parametrize("nlu_streaming", [False, True])
+def test_reuse_previous_run(rasa_path, nlu_streaming):
+    kwargs = {"no_nlu_cache": False, "nlu_streaming": nlu_streaming}
+    nlu_controller = NluController(rasa_path, "./tests", "test-project", "0.0.0", nlu_backend=utils.FakeNluBackend())
+    assert nlu_controller.reused is False
+    save_previous_overview(nlu_controller)
+    backend = utils.FakeNluBackend()
+    reused_controller = NluController(rasa_path, "./tests", "test-project", "0.0.0", nlu_backend=backend, **kwargs)
+    assert reused_controller.reused is True
+    assert backend.parsed == []
+    assert reused_controller.overall_score == nlu_controller.overall_score
+    assert reused_controller.problem_sentences == nlu_controller.problem_sentences
+    assert reused_controller.performance is None
+    if not nlu_streaming:
+        assert reused_controller.data == nlu_controller.data
+
+
+@pytest.mark.parametrize("previous, kwargs", [
+    ({"nlu_data_hash": "changed"}, {}),
+    ({"nlu_model": {"fingerprint": "another model"}}, {}),
+    ({"nlu_partial": {"reason": "time_budget"}}, {}),
+    ({}, {"no_nlu_cache": True}),
+    ({}, {"nlu_sample_rate": 0.5})
+])
+def test_dont_reuse_previous_run(rasa_path, previous, kwargs):
+    nlu_controller = NluController(rasa_path, "./tests", "test-project", "0.0.0", nlu_backend=utils.FakeNluBackend())
+    save_previous_overview(nlu_controller, **previous)
+    os.remove(nlu_controller.nlu_cache_path)
+    backend = utils.FakeNluBackend()
+    controller = NluController(rasa_path, "./tests", "test-project", "0.0.0", nlu_backend=backend, **kwargs)
+    assert controller.reused is False
+    assert backend.parsed
+
+
+@responses.activate
+def test_generate_data_with_baseline(rasa_path):
+    utils.load_mock_payloads()
+    nlu_controller = NluController(
+        rasa_path, "./tests", "test-project", "0.0.0", baseline_url="http://localhost:5006", no_nlu_cache=True
+    )
+    baseline_requests = [call for call in responses.calls if call.request.url == "http://localhost:5006/model/parse"]
+    assert len(baseline_requests) == count_distinct_texts(nlu_controller.data)
+    assert nlu_controller.baseline_aggregator.total == len(nlu_controller.data)
+    assert nlu_controller.overall_score == pytest.nlu_controller.overall_score
+    assert nlu_controller.baseline_score == pytest.approx(
+        len([item for item in nlu_controller.data if item["intent"] == "affirm"]) / len(nlu_controller.data)
+    )
+    changes = nlu_controller.baseline_changes
+    assert len(changes) == len(nlu_controller.data)
+    assert {(item["baseline_predicted_intent"], item["predicted_intent"]) for item in changes} == {("affirm", "greet")}
+
+
+@responses.activate
+def test_generate_data_with_failed_baseline_request(rasa_path):
+    baseline_payload = utils.MOCK_PAYLOADS["test_generate_data_with_baseline"][1]["json"]
+    responses.add(responses.GET, "http://localhost:5006", json={})
+    responses.add(responses.POST, "http://localhost:5006/model/parse", body=requests.exceptions.ReadTimeout())
+    responses.add(responses.POST, "http://localhost:5006/model/parse", json=baseline_payload)
+    utils.load_mock_payloads()
+    nlu_controller = NluController(
+        rasa_path, "./tests", "test-project", "0.0.0", baseline_url="http://localhost:5006", no_nlu_cache=True
+    )
+    assert nlu_controller.partial is None
+    assert nlu_controller.baseline_missing >= 1
+    assert nlu_controller.baseline_aggregator.total == len(nlu_controller.data) - nlu_controller.baseline_missing
+    assert len(nlu_controller.baseline_changes) == nlu_controller.baseline_aggregator.total
+
+
+@responses.activate
+def test_generate_data_with_unavailable_baseline(rasa_path):
+    utils.load_mock_payloads()
+    nlu_controller = NluController(rasa_path, "./tests", "test-project", "0.0.0", baseline_url="http://localhost:5009")
+    assert nlu_controller.baseline is None
+    assert nlu_controller.baseline_score is None
+    assert nlu_controller.baseline_changes == []
+
+
+def test_init_nlu_controller_with_nlu_model(rasa_path):
+    nlu_controller = NluController(
+        rasa_path, "./tests", "test-project", "0.0.0", nlu_model="models/", nlu_batch_size=8
+    )
+    assert isinstance(nlu_controller.backend, RasaNluBackend)
+    assert nlu_controller.backend.batch_size == 8
+
+
+@responses.activate
+def test_performance_without_requests(rasa_path):
+    utils.load_mock_payloads()
+    nlu_controller = NluController(rasa_path, "./tests", "test-project", "0.0.0")
+    nlu_controller.backend.latency = LatencyHistogram()
+    assert nlu_controller.performance is None
+
+
+@responses.activate
+def test_generate_data_with_adaptive_concurrency(rasa_path):
+    utils.load_mock_payloads()
+    nlu_controller = NluController(
+        rasa_path, "./tests", "test-project", "0.0.0",
+        nlu_adaptive=True, nlu_concurrency=4, nlu_latency_target=10, no_nlu_cache=True, rasa_api_retries=0
+    )
+    assert nlu_controller.backend.concurrency.max_limit == 4
+    assert nlu_controller.backend.concurrency.limit > 1
+    assert nlu_controller.backend.concurrency.in_flight == 0
+    assert nlu_controller.backend.concurrency.requests == count_parse_requests()
+    assert nlu_controller.backend.session.get_adapter(nlu_controller.backend.url).max_retries.total == 0
+    assert nlu_controller.data == pytest.nlu_controller.data
+
+
+@responses.activate
+def test_request_nlu_reuses_session(rasa_path):
+    utils.load_mock_payloads()
+    nlu_controller = NluController(
+        rasa_path, "./tests", "test-project", "0.0.0", nlu_pool_size=2, rasa_api_timeout=5
+    )
+    assert nlu_controller.backend.pool_size == 2
+    assert nlu_controller.backend.timeout == 5
+    session = nlu_controller.backend.session
+    with mock.patch.object(session, "request", wraps=session.request) as request:
+        nlu_controller.request_nlu("test")
+        nlu_controller.request_nlu("another test")
+        assert request.call_count == 2
+        assert request.call_args.kwargs["timeout"] == 5
+
+
+def count_parse_requests():
+    return len([call for call in responses.calls if call.request.url.endswith("/model/parse")])
+
+
+def write_incremental_state(filename, header, items):
+    file = open(filename, "w", encoding="utf-8")
+    for line in [header] + items:
+        file.write(json.dumps(line, ensure_ascii=False) + "\n")
+    file.close()
+
+
+def count_distinct_texts(data):
+    return len({NluCache.normalize(item["text"]) for item in data})
+
+
+@responses.activate
+def test_request_nlu_uses_cache(rasa_path):
+    utils.remove_generated_files(rasa_path)
+    utils.load_mock_payloads()
+    nlu_controller = NluController(rasa_path, "./tests", "test-project", "0.0.0")
+    assert nlu_controller.cache is not None
+    assert os.path.isfile(nlu_controller.nlu_cache_path)
+    parse_requests = count_parse_requests()
+    assert parse_requests > 0
+    cached_controller = NluController(rasa_path, "./tests", "test-project", "0.0.0")
+    assert count_parse_requests() == parse_requests
+    assert cached_controller.cache.hits == count_distinct_texts(cached_controller.data)
+    assert cached_controller.data == nlu_controller.data
+
+
+@responses.activate
+def test_request_nlu_without_cache(rasa_path):
+    utils.remove_generated_files(rasa_path)
+    utils.load_mock_payloads()
+    nlu_controller = NluController(rasa_path, "./tests", "test-project", "0.0.0", no_nlu_cache=True)
+    assert nlu_controller.cache is None
+    assert not os.path.isfile(nlu_controller.nlu_cache_path)
+    assert count_parse_requests() == count_distinct_texts(nlu_controller.data)
+
+
+@responses.activate
+def test_generate_data_incremental(rasa_path):
+    utils.remove_generated_files(rasa_path)
+    utils.load_mock_payloads()
+    kwargs = {"nlu_incremental": True, "no_nlu_cache": True}
+    nlu_controller = NluController(rasa_path, "./tests", "test-project", "0.0.0", **kwargs)
+    assert os.path.isfile(nlu_controller.nlu_incremental_path)
+    parse_requests = count_parse_requests()
+    assert parse_requests == count_distinct_texts(nlu_controller.data)
+
+    incremental_controller = NluController(rasa_path, "./tests", "test-project", "0.0.0", **kwargs)
+    assert count_parse_requests() == parse_requests
+    assert incremental_controller.data == nlu_controller.data
+
+    header, items = NluPredictions.read(nlu_controller.nlu_incremental_path)
+    assert len(items) == len(nlu_controller.data)
+    changed_intent = list(header["intents"])[0]
+    header["intents"][changed_intent] = "changed"
+    write_incremental_state(nlu_controller.nlu_incremental_path, header, items)
+    incremental_controller = NluController(rasa_path, "./tests", "test-project", "0.0.0", **kwargs)
+    changed_items = [item for item in items if item["intent"] == changed_intent]
+    assert count_parse_requests() == parse_requests + count_distinct_texts(changed_items)
+    assert incremental_controller.data == nlu_controller.data
+
+    header["fingerprint"] = "another model"
+    write_incremental_state(nlu_controller.nlu_incremental_path, header, items)
+    parse_requests = count_parse_requests()
+    NluController(rasa_path, "./tests", "test-project", "0.0.0", **kwargs)
+    assert count_parse_requests() == parse_requests + count_distinct_texts(nlu_controller.data)
+
+
+@responses.activate
+def test_generate_data_incremental_streaming(rasa_path):
+    utils.remove_generated_files(rasa_path)
+    utils.load_mock_payloads()
+    kwargs = {"nlu_incremental": True, "no_nlu_cache": True}
+    nlu_controller = NluController(rasa_path, "./tests", "test-project", "0.0.0", **kwargs)
+    header, items = NluPredictions.read(nlu_controller.nlu_incremental_path)
+    parse_requests = count_parse_requests()
+    streaming_controller = NluController(rasa_path, "./tests", "test-project", "0.0.0", nlu_streaming=True, **kwargs)
+    assert count_parse_requests() == parse_requests
+    streaming_header, streaming_items = NluPredictions.read(streaming_controller.nlu_incremental_path)
+    assert streaming_header == header
+    assert sorted(streaming_items, key=lambda item: (item["intent"], item["text"])) == \
+        sorted(items, key=lambda item: (item["intent"], item["text"]))
+
+
+@responses.activate
+def test_generate_data_resume(rasa_path):
+    utils.remove_generated_files(rasa_path)
+    utils.load_mock_payloads()
+    nlu_controller = NluController(rasa_path, "./tests", "test-project", "0.0.0", no_nlu_cache=True)
+    assert os.path.isfile(nlu_controller.nlu_predictions_path)
+    lines = open(nlu_controller.nlu_predictions_path, encoding="utf-8").readlines()
+    assert len(lines) == len(nlu_controller.data) + 1
+    file = open(nlu_controller.nlu_predictions_path, "w", encoding="utf-8")
+    file.writelines(lines[:4])
+    file.close()
+    parse_requests = count_parse_requests()
+    resumed_controller = NluController(
+        rasa_path, "./tests", "test-project", "0.0.0", no_nlu_cache=True, resume=True
+    )
+    pending = [json.loads(line) for line in lines[4:]]
+    assert count_parse_requests() - parse_requests == count_distinct_texts(pending)
+    assert resumed_controller.data == nlu_controller.data
+
+
+@responses.activate
+def test_generate_data_with_shards(rasa_path):
+    utils.remove_generated_files(rasa_path)
+    utils.load_mock_payloads()
+    shards = [
+        NluController(rasa_path, "./tests", "test-project", "0.0.0", no_nlu_cache=True, shard=(index, 2))
+        for index in [1, 2]
+    ]
+    intents = [{item["intent"] for item in shard.data} for shard in shards]
+    assert not intents[0] & intents[1]
+    assert intents[0] | intents[1] == {item["intent"] for item in pytest.nlu_controller.data}
+    assert shards[0].nlu_predictions_path == f"{rasa_path}/results/nlu_predictions.shard-1-of-2.jsonl"
+    assert os.path.isfile(shards[0].nlu_predictions_path)
+    assert os.path.isfile(shards[1].nlu_predictions_path)
+
+    merged_controller = NluController(
+        rasa_path,
+        "./tests",
+        "test-project",
+        "0.0.0",
+        nlu_predictions=[shard.nlu_predictions_path for shard in shards]
+    )
+    assert merged_controller.is_connected() is True
+    assert merged_controller.data == pytest.nlu_controller.data
+    assert merged_controller.overall_score == pytest.nlu_controller.overall_score
+    assert os.path.isfile(merged_controller.nlu_predictions_path)
+
+
+@responses.activate
+def test_generate_data_with_sampling(rasa_path):
+    utils.load_mock_payloads()
+    kwargs = {"nlu_sample_rate": 0.5, "nlu_max_per_intent": 2, "no_nlu_cache": True}
+    nlu_controller = NluController(rasa_path, "./tests", "test-project", "0.0.0", **kwargs)
+    assert nlu_controller.is_sampled() is True
+    intents = {}
+    for item in nlu_controller.data:
+        intents[item["intent"]] = intents.get(item["intent"], 0) + 1
+    assert all(0 < total <= 2 for total in intents.values())
+    assert len(nlu_controller.data) < len(pytest.nlu_controller.data)
+    lower, upper = nlu_controller.confidence_interval
+    assert 0 <= lower <= nlu_controller.overall_score <= upper <= 1
+
+    same_sample_controller = NluController(rasa_path, "./tests", "test-project", "0.0.0", **kwargs)
+    assert same_sample_controller.data == nlu_controller.data
+    assert same_sample_controller.confidence_interval == nlu_controller.confidence_interval
+
+
+def test_calculate_overall_score_with_sampling():
+    nlu_controller = pytest.nlu_controller
+    nlu_controller.nlu_sample_rate = 0.5
+    nlu_controller._population = {"greet": 10, "goodbye": 30}
+    nlu_controller._data = [
+        {"intent": "greet", "understood": False},
+        {"intent": "greet", "understood": True},
+        {"intent": "goodbye", "understood": False},
+        {"intent": "goodbye", "understood": False}
+    ]
+    assert nlu_controller._calculate_overall_score() == pytest.approx(1 - 0.25 * 0.5)
+    lower, upper = nlu_controller.confidence_interval
+    assert lower < nlu_controller.overall_score < upper
+
+
+def test_calculate_overall_score_with_sampling_and_no_problems():
+    nlu_controller = pytest.nlu_controller
+    nlu_controller.nlu_sample_rate = 0.5
+    nlu_controller._population = {"greet": 10, "goodbye": 30}
+    nlu_controller._data = [
+        {"intent": "greet", "understood": False},
+        {"intent": "greet", "understood": False},
+        {"intent": "goodbye", "understood": False},
+        {"intent": "goodbye", "understood": False}
+    ]
+    assert nlu_controller._calculate_overall_score() == 1
+    lower, upper = nlu_controller.confidence_interval
+    assert lower < nlu_controller.overall_score == upper
+
+
+def test_calculate_overall_score_with_sampling_and_uniform_intents():
+    nlu_controller = pytest.nlu_controller
+    nlu_controller.nlu_sample_rate = 0.5
+    nlu_controller._population = {"greet": 10, "goodbye": 30}
+    nlu_controller._data = [
+        {"intent": "greet", "understood": True},
+        {"intent": "greet", "understood": True},
+        {"intent": "goodbye", "understood": False},
+        {"intent": "goodbye", "understood": False}
+    ]
+    assert nlu_controller._calculate_overall_score() == pytest.approx(0.75)
+    lower, upper = nlu_controller.confidence_interval
+    assert lower < nlu_controller.overall_score < upper
+
+
+def test_check_fail_threshold_with_sampling():
+    nlu_controller = pytest.nlu_controller
+    nlu_controller.nlu_max_per_intent = 4
+    nlu_controller.nlu_fail_threshold = 0.9
+    nlu_controller._population = {"a": 100, "b": 4}
+    nlu_controller._stop_reason = None
+    sentences = [("a", f"a {index}") for index in range(4)] + [("b", f"b {index}") for index in range(4)]
+    weights = nlu_controller._problem_weights(sentences)
+    assert weights == pytest.approx({"a": 100 / 104 / 4, "b": 1 / 104})
+    nlu_controller._check_fail_threshold(4 * weights["b"])
+    assert nlu_controller._stop_reason is None
+    nlu_controller._check_fail_threshold(4 * weights["b"] + weights["a"])
+    assert nlu_controller._stop_reason == "fail_threshold"
+
+
+def test_check_fail_threshold_without_sampling():
+    nlu_controller = pytest.nlu_controller
+    nlu_controller.nlu_fail_threshold = 0.9
+    nlu_controller._stop_reason = None
+    weights = nlu_controller._problem_weights([("a", f"a {index}") for index in range(10)])
+    nlu_controller._check_fail_threshold(weights["a"])
+    assert nlu_controller._stop_reason is None
+    nlu_controller._check_fail_threshold(2 * weights["a"])
+    assert nlu_controller._stop_reason == "fail_threshold"
+
+
+def test_sample_examples():
+    nlu_controller = pytest.nlu_controller
+    nlu_controller.nlu_sample_rate = 0.3
+    examples = [f"example {index}" for index in range(10)]
+    sample = nlu_controller._sample_examples("greet", examples)
+    assert len(sample) == 3
+    assert sample == sorted(sample, key=examples.index)
+    assert sample == nlu_controller._sample_examples("greet", examples)
+    nlu_controller.nlu_max_per_intent = 1
+    assert len(nlu_controller._sample_examples("greet", examples)) == 1
+
+
+@responses.activate
+def test_get_model_fingerprint(rasa_path):
+    utils.load_mock_payloads()
+    fingerprint = pytest.nlu_controller.get_model_fingerprint()
+    assert isinstance(fingerprint, str)
+    assert len(fingerprint) == 40
+
+
+@responses.activate
+def test_model_status_requested_once(rasa_path):
+    utils.load_mock_payloads()
+    nlu_controller = NluController(rasa_path, "./tests", "test-project", "0.0.0", no_nlu_cache=True)
+    assert nlu_controller.fingerprint == nlu_controller.get_model_fingerprint()
+    assert nlu_controller.model_file == "models/20230101-000000-test-model.tar.gz"
+    assert len([call for call in responses.calls if call.request.url.endswith("/status")]) == 1
+
+
+@responses.activate
+def test_get_model_fingerprint_error():
+    utils.load_mock_payloads()
+    assert pytest.nlu_controller.get_model_fingerprint() is None
+
+
+@responses.activate
+def test_init_nlu_controller_with_several_endpoints(rasa_path):
+    utils.load_mock_payloads()
+    urls = ["http://localhost:5005", "http://localhost:5006", "http://localhost:5007"]
+    nlu_controller = NluController(rasa_path, "./tests", "test-project", "0.0.0", url=urls, no_nlu_cache=True)
+    assert nlu_controller.is_connected() is True
+    assert nlu_controller.backend.endpoints.healthy == ["http://localhost:5005", "http://localhost:5006"]
+    served = nlu_controller.backend.endpoints.served
+    assert served["http://localhost:5005"] > 0
+    assert served["http://localhost:5006"] > 0
+    assert served["http://localhost:5007"] == 0
+    assert nlu_controller.data == pytest.nlu_controller.data
+
+
 def test_init_nlu_controller_when_no_rasa():
     nlu_controller = pytest.nlu_controller
     assert nlu_controller.is_connected() is False
@@ -79,8 +718,8 @@ def test_request_nlu():
 def test_request_nlu_error():
     utils.load_mock_payloads()
     nlu_controller = pytest.nlu_controller
-    data = nlu_controller.request_nlu("test")
-    assert data == {}
+    with pytest.raises(NluBackendUnavailableError):
+        nlu_controller.request_nlu("test")
 
 
 def test_remove_entities_from_text():
@@ -97,6 +736,34 @@ def test_remove_entities_from_text():
         assert nlu_controller.remove_entities_from_text(test_text) == expected
 
 
+def test_score_entities():
+    entities = [
+        {"entity": "city", "start": 0, "end": 5, "value": "Paris", "role": "departure"},
+        {"entity": "day", "start": 10, "end": 15, "value": "today"}
+    ]
+    payload = {"entities": [
+        {"entity": "city", "start": 0, "end": 5, "value": "Paris", "role": "departure", "extractor": "DIET"},
+        {"entity": "day", "start": 9, "end": 15, "value": " today"},
+        {"entity": "name", "start": 20, "end": 24, "value": "John"}
+    ]}
+    scores = NluController._score_entities(entities, payload)
+    assert scores == {"city": [1, 0, 0], "day": [0, 1, 1], "name": [0, 1, 0]}
+    assert NluController._score_entities([], {}) == {}
+
+
+@responses.activate
+def test_calculate_entity_scores(rasa_path):
+    utils.load_mock_payloads()
+    nlu_controller = NluController(rasa_path, "./tests", "test-project", "0.0.0")
+    items = [item for item in nlu_controller.data if item.get("entity_scores")]
+    assert {item["text"] for item in items} == {"good morning", "good evening", "good afternoon"}
+    assert nlu_controller.entity_scores == [
+        {"name": "day", "precision": 0, "recall": 0, "f1-score": 0, "support": len(items)}
+    ]
+    streaming_controller = NluController(rasa_path, "./tests", "test-project", "0.0.0", nlu_streaming=True)
+    assert streaming_controller.entity_scores == nlu_controller.entity_scores
+
+
 def test_select_normal_intent():
     nlu_controller = pytest.nlu_controller
     payload = {
@@ -0,0 +1,113 @@
+import os.path
+
+import pytest
+
+from rasa_model_report.helpers.nlu_predictions import NluPredictions
+
+
+@pytest.fixture
+def predictions_path(rasa_path):
+    filename = f"{rasa_path}/results/nlu_predictions.jsonl"
+    yield filename
+    if os.path.isfile(filename):
+        os.remove(filename)
+
+
+def test_write_and_load_predictions(predictions_path):
+    predictions = NluPredictions(predictions_path, "fingerprint", checkpoint_interval=2)
+    assert predictions.open() == 0
+    predictions.write({"intent": "greet", "text": "hi"})
+    predictions.write({"intent": "greet", "text": "hello"})
+    predictions.write({"intent": "goodbye", "text": "bye"})
+    predictions.close()
+    header, items = NluPredictions.read(predictions_path)
+    assert header == {"fingerprint": "fingerprint"}
+    assert len(items) == 3
+    assert predictions.load() == items
+    assert NluPredictions(predictions_path, "another fingerprint").load() == []
+
+
+def test_resume_predictions(predictions_path):
+    predictions = NluPredictions(predictions_path, "fingerprint")
+    predictions.open()
+    predictions.write({"intent": "greet", "text": "hi"})
+    predictions.close()
+    file = open(predictions_path, "a", encoding="utf-8")
+    file.write("{\"intent\": \"greet\", \"te")
+    file.close()
+    resumed = NluPredictions(predictions_path, "fingerprint")
+    assert resumed.open(resume=True) == 1
+    assert list(resumed.stream()) == [{"intent": "greet", "text": "hi"}]
+    resumed.write({"intent": "greet", "text": "hello"})
+    resumed.close()
+    assert resumed.load() == [{"intent": "greet", "text": "hi"}, {"intent": "greet", "text": "hello"}]
+
+
+def test_resume_predictions_keeps_valid_lines(predictions_path):
+    predictions = NluPredictions(predictions_path, "fingerprint")
+    predictions.open()
+    predictions.write({"intent": "greet", "text": "hi"})
+    predictions.close()
+    file = open(predictions_path, "rb+")
+    file.truncate(os.path.getsize(predictions_path) - 1)
+    file.close()
+    valid_size = os.path.getsize(predictions_path)
+    resumed = NluPredictions(predictions_path, "fingerprint")
+    resumed.open(resume=True)
+    assert os.path.getsize(predictions_path) == valid_size + 1
+    resumed.write({"intent": "greet", "text": "hello"})
+    resumed.close()
+    assert resumed.load() == [{"intent": "greet", "text": "hi"}, {"intent": "greet", "text": "hello"}]
+
+
+def test_read_predictions_header(predictions_path):
+    assert NluPredictions("invalid/path/nlu_predictions.jsonl", "fingerprint").read_header() == {}
+    predictions = NluPredictions(predictions_path, "fingerprint")
+    predictions.open()
+    predictions.write({"intent": "greet", "text": "hi"})
+    predictions.close()
+    assert predictions.read_header() == {"fingerprint": "fingerprint"}
+
+
+def test_stream_predictions(predictions_path):
+    predictions = NluPredictions(predictions_path, "fingerprint")
+    predictions.open()
+    predictions.write({"intent": "greet", "text": "hi"})
+    predictions.write({"intent": "greet", "text": "hello"})
+    predictions.close()
+    assert list(predictions.stream()) == predictions.load()
+    assert list(NluPredictions(predictions_path, "another fingerprint").stream()) == []
+    assert list(NluPredictions("invalid/path/nlu_predictions.jsonl", "fingerprint").stream()) == []
+
+
+def test_read_predictions_by_position(predictions_path):
+    predictions = NluPredictions(predictions_path, "fingerprint")
+    predictions.open()
+    predictions.write({"intent": "greet", "text": "olá"})
+    predictions.write({"intent": "greet", "text": "hello"})
+    predictions.close()
+    positions = [position for position, _ in predictions.stream_positions()]
+    assert [item for _, item in predictions.stream_positions()] == predictions.load()
+    assert list(predictions.read_positions(positions[::-1])) == predictions.load()[::-1]
+    unsaved = NluPredictions("invalid/path/nlu_predictions.jsonl", "fingerprint")
+    unsaved.open()
+    unsaved.write({"intent": "greet", "text": "hi"})
+    assert list(unsaved.read_positions([position for position, _ in unsaved.stream_positions()])) == unsaved.load()
+
+
+def test_dont_resume_predictions_of_another_model(predictions_path):
+    predictions = NluPredictions(predictions_path, "fingerprint")
+    predictions.open()
+    predictions.write({"intent": "greet", "text": "hi"})
+    predictions.close()
+    assert NluPredictions(predictions_path, "another fingerprint").open(resume=True) == 0
+    assert NluPredictions(predictions_path, None).open(resume=True) == 0
+
+
+def test_predictions_without_results_path():
+    predictions = NluPredictions("invalid/path/nlu_predictions.jsonl", "fingerprint")
+    predictions.open()
+    predictions.write({"intent": "greet", "text": "hi"})
+    predictions.close()
+    assert not os.path.isfile("invalid/path/nlu_predictions.jsonl")
+    assert predictions.load() == [{"intent": "greet", "text": "hi"}]
@@ -0,0 +1,56 @@
+import pytest
+
+from rasa_model_report.helpers.nlu_record import NluRecord
+
+
+@pytest.fixture
+def item():
+    return {
+        "intent": "greet",
+        "text": "hello there",
+        "confidence": 0.75,
+        "predicted_intent": "goodbye",
+        "intent_ranking": [{"name": "goodbye", "confidence": 0.75}, {"name": "greet", "confidence": 0.25}],
+        "understood": True
+    }
+
+
+def test_nlu_record_from_item(item):
+    record = NluRecord.from_item(item)
+    assert record.intent == "greet"
+    assert record.predicted_intent == "goodbye"
+    assert record.intent_ranking == item["intent_ranking"]
+    assert record["confidence"] == 0.75
+    assert record.get("understood") is True
+    assert record.get("invalid", "default") == "default"
+    assert record.get("_intent") is None
+    assert record.to_item() == item
+    assert dict(record) == item
+    assert record == item
+    assert record == NluRecord.from_item(item)
+    assert record != NluRecord.from_item(dict(item, understood=False))
+    with pytest.raises(KeyError):
+        record["invalid"]
+
+
+def test_nlu_record_with_entity_scores(item):
+    record = NluRecord.from_item(dict(item, entity_scores={"day": [1, 0, 0]}))
+    assert record["entity_scores"] == {"day": [1, 0, 0]}
+    assert "entity_scores" in record.to_item()
+    assert "entity_scores" not in NluRecord.from_item(item).to_item()
+    assert NluRecord.from_item(item).get("entity_scores") is None
+
+
+def test_nlu_record_intent_codes(item):
+    record = NluRecord.from_item(item)
+    other = NluRecord.from_item(dict(item, intent="goodbye", predicted_intent="greet"))
+    assert record._intent == other._predicted_intent
+    assert record._predicted_intent == other._intent
+    assert NluRecord.decode(NluRecord.encode("greet")) == "greet"
+    assert NluRecord.decode(NluRecord.encode(None)) is None
+
+
+def test_nlu_record_is_compact(item):
+    record = NluRecord.from_item(item)
+    assert not hasattr(record, "__dict__")
+    assert list(record._ranking_confidences) == [0.75, 0.25]
@@ -0,0 +1,95 @@
+import glob
+from unittest import mock
+
+from rasa_model_report.controllers.e2e_coverage_controller import E2ECoverageController
+from rasa_model_report.helpers import utils
+from rasa_model_report.helpers.project_index import ProjectIndex
+from rasa_model_report.helpers.yaml_cache import YamlCache
+
+
+def test_project_index_files(rasa_path):
+    project_index = ProjectIndex(rasa_path)
+    assert f"{rasa_path}/data/nlu.yml" in project_index.files["nlu"]
+    assert f"{rasa_path}/domain.yml" in project_index.files["domain"]
+    assert f"{rasa_path}/data/stories.yml" in project_index.files["data"]
+    assert project_index.parsed_files == 0
+
+
+def test_project_index_lists_domain_files_once(rasa_path):
+    with mock.patch("glob.glob", wraps=glob.glob) as glob_mock:
+        files = ProjectIndex(rasa_path).files
+    patterns = [call.args[0] for call in glob_mock.call_args_list]
+    assert len(patterns) == len(set(patterns)) == 4
+    assert files["domain"][:len(files["nlu"])] == files["nlu"]
+
+
+def test_project_index_parses_each_file_once(rasa_path):
+    project_index = ProjectIndex(rasa_path)
+    with mock.patch.object(project_index.reader, "read", wraps=project_index.reader.read) as read:
+        project_index.nlu_examples
+        project_index.domain_elements
+        project_index.count_stories_and_rules()
+        project_index.nlu_examples
+    filenames = [call.args[0] for call in read.call_args_list]
+    assert len(filenames) == len(set(filenames))
+    assert project_index.parsed_files == len(filenames)
+
+
+def test_project_index_nlu_examples(rasa_path):
+    nlu = ProjectIndex(rasa_path).nlu_examples
+    assert list(nlu) == [f"{rasa_path}/data/nlu.yml"]
+    assert "greet" in nlu[f"{rasa_path}/data/nlu.yml"]
+    assert isinstance(nlu[f"{rasa_path}/data/nlu.yml"]["greet"], str)
+
+
+def test_project_index_domain_elements(rasa_path):
+    elements = ProjectIndex(rasa_path).domain_elements
+    assert list(elements) == ["intents", "entities", "responses", "actions"]
+    assert "greet" in elements["intents"]
+    assert all(isinstance(item, str) for items in elements.values() for item in items)
+
+
+def test_project_index_stories_and_rules(rasa_path):
+    project_index = ProjectIndex(rasa_path)
+    files_data = [utils.load_yaml_file(filename) or {} for filename in project_index.files["data"]]
+    assert project_index.count_stories_and_rules() == {
+        "rules": sum(len(data.get("rules") or []) for data in files_data),
+        "stories": sum(len(data.get("stories") or []) for data in files_data)
+    }
+    assert all("story" in story for story in project_index.stories)
+    assert all("rule" in rule for rule in project_index.rules)
+
+
+def test_project_index_shared_by_controllers(rasa_path):
+    project_index = ProjectIndex(rasa_path)
+    controller = E2ECoverageController(
+        rasa_path, "./tests", None, [], "test-project", "0.0.0", project_index=project_index
+    )
+    assert controller.project_index is project_index
+    parsed_files = project_index.parsed_files
+    controller._load_domain_elements()
+    assert project_index.parsed_files == parsed_files
+
+
+def test_project_index_parallel_parsing(rasa_path):
+    sequential = ProjectIndex(rasa_path)
+    parallel = ProjectIndex(rasa_path, jobs=2)
+    assert parallel.nlu_examples == sequential.nlu_examples
+    assert parallel.parsed_files == len({file for files in parallel.files.values() for file in files})
+    assert list(parallel.nlu_examples) == list(sequential.nlu_examples)
+    assert parallel.domain_elements == sequential.domain_elements
+    assert parallel.stories == sequential.stories
+    assert parallel.rules == sequential.rules
+
+
+def test_project_index_parallel_parsing_with_cache(rasa_path, tmp_path):
+    cache = YamlCache(str(tmp_path / "yaml_cache.bin"))
+    project_index = ProjectIndex(rasa_path, cache, jobs=2)
+    project_index.nlu_examples
+    project_index.save_cache()
+    assert len(cache) == cache.misses
+    cache = YamlCache(str(tmp_path / "yaml_cache.bin"))
+    with mock.patch("rasa_model_report.helpers.project_index.ProcessPoolExecutor") as executor:
+        ProjectIndex(rasa_path, cache, jobs=2).nlu_examples
+    executor.assert_not_called()
+    assert cache.misses == 0
@@ -0,0 +1,84 @@
+import hashlib
+import os
+import types
+from unittest import mock
+
+import pytest
+
+from rasa_model_report.backends.rasa_nlu_backend import RasaNluBackend
+
+
+class FakeAgent:
+    @classmethod
+    def load(cls, model_path):
+        if model_path.endswith("broken.tar.gz"):
+            raise ValueError("invalid model")
+        return cls()
+
+    async def parse_message(self, text):
+        if text == "fail":
+            raise RuntimeError("parse error")
+        return {"text": text, "intent": {"name": "greet", "confidence": 0.9}}
+
+
+@pytest.fixture
+def fake_rasa():
+    agent_module = types.ModuleType("rasa.core.agent")
+    agent_module.Agent = FakeAgent
+    modules = {
+        "rasa": types.ModuleType("rasa"),
+        "rasa.core": types.ModuleType("rasa.core"),
+        "rasa.core.agent": agent_module
+    }
+    with mock.patch.dict("sys.modules", modules), mock.patch("importlib.util.find_spec", return_value=object()):
+        yield
+
+
+def create_model(directory, name="model.tar.gz", content=b"model"):
+    filename = os.path.join(directory, name)
+    file = open(filename, "wb")
+    file.write(content)
+    file.close()
+    return filename
+
+
+def test_rasa_nlu_backend_without_rasa(tmp_path):
+    backend = RasaNluBackend(create_model(tmp_path))
+    with mock.patch("importlib.util.find_spec", return_value=None):
+        assert backend.is_available() is False
+
+
+def test_rasa_nlu_backend_without_model(tmp_path, fake_rasa):
+    backend = RasaNluBackend(str(tmp_path))
+    assert backend.model_file is None
+    assert backend.get_model_fingerprint() is None
+    assert backend.is_available() is False
+
+
+def test_rasa_nlu_backend_with_broken_model(tmp_path, fake_rasa):
+    backend = RasaNluBackend(create_model(tmp_path, "broken.tar.gz"))
+    assert backend.is_available() is False
+
+
+def test_rasa_nlu_backend_parse(tmp_path, fake_rasa):
+    backend = RasaNluBackend(create_model(tmp_path), batch_size=2)
+    assert backend.is_available() is True
+    assert backend.parse("oi")["intent"]["name"] == "greet"
+    payloads = backend.parse_batch(["oi", "tudo bem"])
+    assert [payload["text"] for payload in payloads] == ["oi", "tudo bem"]
+    assert backend.latency.requests == 2
+    payloads = backend.parse_batch(["oi", "fail"])
+    assert payloads[0]["text"] == "oi"
+    assert payloads[1] is None
+    assert backend.parse("fail") == {}
+    assert backend.latency.errors == 2
+
+
+def test_rasa_nlu_backend_latest_model(tmp_path):
+    old_model = create_model(tmp_path, "old.tar.gz", b"old")
+    new_model = create_model(tmp_path, "new.tar.gz", b"new")
+    os.utime(old_model, (1, 1))
+    backend = RasaNluBackend(str(tmp_path))
+    assert backend.model_file == new_model
+    assert backend.get_model_fingerprint() == hashlib.sha1(b"new").hexdigest()
+    assert backend.get_model_file() == "new.tar.gz"
@@ -4,9 +4,13 @@ from unittest import mock
 import pytest
 import requests.exceptions
 import responses
+import yaml
 from freezegun import freeze_time
 
+from rasa_model_report.controllers.e2e_coverage_controller import E2ECoverageController
+from rasa_model_report.controllers.nlu_controller import NluController
 from rasa_model_report.helpers import utils
+from rasa_model_report.helpers.project_index import ProjectIndex
 from tests import utils as test_utils
 
 
@@ -179,6 +183,50 @@ def test_request_connection_error():
         assert response is None
 
 
+def test_create_session():
+    session = utils.create_session(pool_size=4, retries=1)
+    adapter = session.get_adapter("http://localhost:5005")
+    assert session.headers["Connection"] == "keep-alive"
+    assert adapter._pool_maxsize == 4
+    assert adapter.max_retries.total == 1
+    assert adapter.max_retries.is_retry("POST", 503) is True
+    assert adapter.max_retries.is_retry("GET", 502) is True
+    assert adapter.max_retries.is_retry("POST", 500) is False
+    assert adapter.max_retries.raise_on_status is False
+    assert session.get_adapter("https://localhost:5005") is adapter
+
+
+def test_create_session_backoff_factor():
+    session = utils.create_session(retries=2, backoff_factor=0.2)
+    assert session.get_adapter("http://localhost:5005").max_retries.backoff_factor == 0.2
+
+
+def test_count_retries():
+    assert utils.count_retries(None) == 0
+    assert utils.count_retries(None, 2) == 2
+    response = mock.Mock()
+    response.raw.retries.history = ("first", "second")
+    assert utils.count_retries(response) == 2
+    response.raw.retries = None
+    assert utils.count_retries(response) == 0
+
+
+@responses.activate
+def test_request_with_session():
+    test_utils.load_mock_payloads()
+    session = utils.create_session()
+    response = utils.request("http://localhost:5005", session=session, timeout=5)
+    assert response.status_code == 200
+
+
+@responses.activate
+def test_request_timeout():
+    with mock.patch("requests.Session.request", side_effect=requests.exceptions.Timeout()) as session_request:
+        response = utils.request("http://localhost:5005", timeout=5)
+        assert response is None
+        assert session_request.call_args.kwargs["timeout"] == 5
+
+
 def test_load_yaml_file(rasa_path):
     # When file exist is expected a dict.
     assert isinstance(utils.load_yaml_file(f"{rasa_path}/domain.yml"), dict)
@@ -191,6 +239,28 @@ def test_load_yaml_file(rasa_path):
         utils.load_yaml_file(f"{rasa_path}/file.not.exist")
 
 
+def load_controller_results(rasa_path):
+    nlu_controller = NluController(rasa_path, "./tests", "test-project", "0.0.0", disable_nlu=True)
+    e2e_coverage_controller = E2ECoverageController(rasa_path, "./tests", None, [], "test-project", "0.0.0")
+    return (
+        nlu_controller._load_nlu(),
+        nlu_controller.nlu_data_hash,
+        e2e_coverage_controller.items,
+        e2e_coverage_controller.total_rate,
+        ProjectIndex(rasa_path).count_stories_and_rules()
+    )
+
+
+@pytest.mark.skipif(not hasattr(yaml, "CSafeLoader"), reason="PyYAML was built without libyaml.")
+def test_yaml_loaders_give_identical_results(rasa_path):
+    with mock.patch.object(utils, "YAML_LOADER", yaml.SafeLoader):
+        python_results = load_controller_results(rasa_path)
+    with mock.patch.object(utils, "YAML_LOADER", yaml.CSafeLoader):
+        c_results = load_controller_results(rasa_path)
+    assert python_results == c_results
+    assert python_results[0]
+
+
 def test_list_diff():
     list_1 = [1, 2, 3, 4, 5]
     list_2 = [7, 6, 5, 4]
@@ -245,8 +315,63 @@ def test_remove_duplicate_slash(path, expected):
     assert utils.remove_duplicate_slashs(path) == expected
 
 
-def test_count_stories_and_rules(rasa_path):
-    data = utils.count_stories_and_rules(rasa_path)
-    assert data.keys() == {"stories", "rules"}
-    assert isinstance(data["stories"], int)
-    assert isinstance(data["rules"], int)
+@pytest.mark.parametrize(
+    "shard, expected",
+    [
+        pytest.param("1/4", (1, 4), id="first shard"),
+        pytest.param(" 4 / 4 ", (4, 4), id="last shard with spaces"),
+        pytest.param("0/4", None, id="index zero"),
+        pytest.param("5/4", None, id="index greater than total"),
+        pytest.param("1-4", None, id="invalid format"),
+        pytest.param(None, None, id="none")
+    ]
+)
+def test_parse_shard(shard, expected):
+    if expected:
+        assert utils.parse_shard(shard) == expected
+    else:
+        with pytest.raises(ValueError):
+            utils.parse_shard(shard)
+
+
+@pytest.mark.parametrize(
+    "text, expected_text, expected_entities",
+    [
+        pytest.param(
+            "entity test [blue](color) and [red](color).",
+            "entity test blue and red.",
+            [
+                {"entity": "color", "start": 12, "end": 16, "value": "blue"},
+                {"entity": "color", "start": 21, "end": 24, "value": "red"}
+            ],
+            id="short"
+        ),
+        pytest.param(
+            "fly to [NYC](city:New York)",
+            "fly to NYC",
+            [{"entity": "city", "start": 7, "end": 10, "value": "New York"}],
+            id="short_with_value"
+        ),
+        pytest.param(
+            "from [Paris]{\"entity\": \"city\", \"role\": \"departure\", \"group\": \"1\"} to",
+            "from Paris to",
+            [{"entity": "city", "start": 5, "end": 10, "value": "Paris", "role": "departure", "group": "1"}],
+            id="json"
+        ),
+        pytest.param(
+            "[x][{\"entity\": \"a\"}, {\"entity\": \"b\", \"role\": \"r\"}] y",
+            "x y",
+            [
+                {"entity": "a", "start": 0, "end": 1, "value": "x"},
+                {"entity": "b", "start": 0, "end": 1, "value": "x", "role": "r"}
+            ],
+            id="json_list"
+        ),
+        pytest.param("[bad]{not json} and (parentheses)", "[bad]{not json} and (parentheses)", [], id="invalid"),
+        pytest.param("", "", [], id="empty")
+    ]
+)
+def test_parse_entity_annotations(text, expected_text, expected_entities):
+    clean_text, entities = utils.parse_entity_annotations(text)
+    assert clean_text == expected_text
+    assert entities == expected_entities
@@ -0,0 +1,100 @@
+import os.path
+from unittest import mock
+
+import pytest
+
+from rasa_model_report.helpers import utils
+from rasa_model_report.helpers.project_index import ProjectIndex
+from rasa_model_report.helpers.yaml_cache import YamlCache
+
+
+@pytest.fixture
+def cache_path(rasa_path):
+    filename = f"{rasa_path}/results/yaml_cache.bin"
+    yield filename
+    if os.path.isfile(filename):
+        os.remove(filename)
+
+
+@pytest.fixture
+def yaml_file(tmp_path):
+    filename = tmp_path / "nlu.yml"
+    filename.write_text("nlu:\n- intent: greet\n  examples: |\n    - hello\n", encoding="utf-8")
+    return str(filename)
+
+
+def test_yaml_cache_load_and_save(cache_path, yaml_file):
+    cache = YamlCache(cache_path)
+    data = cache.load(yaml_file, utils.load_yaml_file)
+    assert cache.misses == 1
+    cache.save()
+    assert os.path.isfile(cache_path)
+    cache = YamlCache(cache_path)
+    loader = mock.Mock(side_effect=utils.load_yaml_file)
+    assert cache.load(yaml_file, loader) == data
+    assert cache.hits == 1
+    loader.assert_not_called()
+
+
+def test_yaml_cache_invalidated_by_changes(cache_path, yaml_file):
+    cache = YamlCache(cache_path)
+    cache.load(yaml_file, utils.load_yaml_file)
+    with open(yaml_file, "a", encoding="utf-8") as file:
+        file.write("    - hi\n")
+    data = cache.load(yaml_file, utils.load_yaml_file)
+    assert data["nlu"][0]["examples"] == "- hello\n- hi\n"
+    assert cache.misses == 2
+
+
+def test_yaml_cache_verify_hash(cache_path, yaml_file):
+    cache = YamlCache(cache_path, verify_hash=True)
+    cache.load(yaml_file, utils.load_yaml_file)
+    os.utime(yaml_file, (0, 0))
+    cache.load(yaml_file, utils.load_yaml_file)
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_yaml_cache_returns_copies(cache_path, yaml_file):
+    cache = YamlCache(cache_path)
+    cache.load(yaml_file, utils.load_yaml_file)
+    cache.load(yaml_file, utils.load_yaml_file)["nlu"].clear()
+    assert cache.load(yaml_file, utils.load_yaml_file)["nlu"]
+
+
+def test_yaml_cache_size_limit(cache_path, yaml_file, tmp_path):
+    another_file = tmp_path / "domain.yml"
+    another_file.write_text("intents:\n- greet\n", encoding="utf-8")
+    cache = YamlCache(cache_path, max_bytes=60)
+    cache.load(yaml_file, utils.load_yaml_file)
+    cache.load(str(another_file), utils.load_yaml_file)
+    cache.save()
+    assert len(cache) == 1
+    assert cache.size <= 60
+    assert len(YamlCache(cache_path)) == 1
+
+
+def test_yaml_cache_clear(cache_path, yaml_file):
+    cache = YamlCache(cache_path)
+    cache.load(yaml_file, utils.load_yaml_file)
+    cache.save()
+    cache.clear()
+    assert len(cache) == 0
+    assert os.path.isfile(cache_path) is False
+
+
+def test_yaml_cache_invalid_file(cache_path):
+    file = open(cache_path, "wb")
+    file.write(b"invalid")
+    file.close()
+    assert len(YamlCache(cache_path)) == 0
+
+
+def test_yaml_cache_in_project_index(rasa_path, cache_path):
+    project_index = ProjectIndex(rasa_path, YamlCache(cache_path))
+    nlu = project_index.nlu_examples
+    project_index.save_cache()
+    project_index = ProjectIndex(rasa_path, YamlCache(cache_path))
+    assert project_index.nlu_examples == nlu
+    assert project_index.cache.hits == len(project_index.files["nlu"])
+    assert project_index.cache.misses == 0
@@ -0,0 +1,146 @@
+import glob
+
+import pytest
+import yaml
+
+from rasa_model_report.helpers import utils
+from rasa_model_report.helpers.project_index import ProjectIndex
+from rasa_model_report.helpers.yaml_reader import YamlReader
+
+
+@pytest.fixture
+def write_yaml(tmp_path):
+    def write(text):
+        filename = tmp_path / "file.yml"
+        filename.write_text(text, encoding="utf-8")
+        return str(filename)
+    return write
+
+
+def test_yaml_reader_skips_lookup_synonym_and_regex(write_yaml):
+    filename = write_yaml(
+        "version: '3.1'\n"
+        "nlu:\n"
+        "- intent: greet\n"
+        "  examples: |\n"
+        "    - hello\n"
+        "- lookup: city\n"
+        "  examples: |\n"
+        "    - Paris\n"
+        "- synonym: NYC\n"
+        "  examples: |\n"
+        "    - New York\n"
+        "- regex: zipcode\n"
+        "  examples: |\n"
+        "    - \\d{5}\n"
+        "- intent: goodbye\n"
+        "  metadata:\n"
+        "    sentiment: neutral\n"
+        "  examples: |\n"
+        "    - bye\n"
+    )
+    data = YamlReader({"nlu": "intents"}).read(filename)
+    assert data == {
+        "nlu": [
+            {"intent": "greet", "examples": "- hello\n"},
+            {"intent": "goodbye", "metadata": {"sentiment": "neutral"}, "examples": "- bye\n"}
+        ]
+    }
+
+
+def test_yaml_reader_names(write_yaml):
+    filename = write_yaml(
+        "intents:\n"
+        "- greet\n"
+        "- inform:\n"
+        "    use_entities: [city]\n"
+        "responses:\n"
+        "  utter_greet:\n"
+        "  - text: Hello!\n"
+        "  utter_goodbye:\n"
+        "  - text: Bye!\n"
+        "slots:\n"
+        "  city:\n"
+        "    type: text\n"
+    )
+    data = YamlReader({"intents": "names", "responses": "names"}).read(filename)
+    assert data == {"intents": ["greet", {"inform": None}], "responses": {"utter_greet": None, "utter_goodbye": None}}
+
+
+def test_yaml_reader_scalars_anchors_and_merge_keys(write_yaml):
+    filename = write_yaml(
+        "base: &base\n"
+        "  steps: []\n"
+        "  active: true\n"
+        "stories:\n"
+        "- story: first\n"
+        "  <<: *base\n"
+        "  count: 3\n"
+        "  ratio: 0.5\n"
+        "  empty: null\n"
+        "  quoted: 'true'\n"
+        "- story: second\n"
+        "  <<: *base\n"
+        "  active: false\n"
+    )
+    assert YamlReader({"stories": "all"}).read(filename) == {"stories": utils.load_yaml_file(filename)["stories"]}
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("", None),
+        ("- item\n", None),
+        ("version: '3.1'\n", {})
+    ]
+)
+def test_yaml_reader_documents(write_yaml, text, expected):
+    assert YamlReader({"nlu": "intents"}).read(write_yaml(text)) == expected
+
+
+@pytest.mark.parametrize("text", ["nlu: []\n---\nnlu: []\n", "- item\n---\n- item\n"])
+def test_yaml_reader_with_several_documents(write_yaml, text):
+    filename = write_yaml(text)
+    with pytest.raises(yaml.composer.ComposerError, match="expected a single document"):
+        utils.load_yaml_file(filename)
+    with pytest.raises(yaml.composer.ComposerError, match="expected a single document"):
+        YamlReader({"nlu": "intents"}).read(filename)
+
+
+def test_yaml_reader_file_not_found(rasa_path):
+    reader = YamlReader({"nlu": "intents"})
+    assert reader.read(f"{rasa_path}/file.not.exist", error_flag=False) == {}
+    with pytest.raises(Exception):
+        reader.read(f"{rasa_path}/file.not.exist")
+
+
+def test_yaml_reader_with_both_loaders(rasa_path, monkeypatch):
+    reader = YamlReader(ProjectIndex.KEYS)
+    for filename in glob.glob(f"{rasa_path}/**/*.yml", recursive=True):
+        monkeypatch.setattr(utils, "YAML_LOADER", yaml.SafeLoader)
+        python_data = reader.read(filename)
+        if hasattr(yaml, "CSafeLoader"):
+            monkeypatch.setattr(utils, "YAML_LOADER", yaml.CSafeLoader)
+            assert reader.read(filename) == python_data
+
+
+def get_names(items):
+    return [item if isinstance(item, str) else list(item)[0] for item in items or []]
+
+
+def test_yaml_reader_matches_the_full_loader(rasa_path):
+    reader = YamlReader(ProjectIndex.KEYS)
+    for filename in glob.glob(f"{rasa_path}/**/*.yml", recursive=True):
+        full_data = utils.load_yaml_file(filename)
+        data = reader.read(filename)
+        if not isinstance(full_data, dict):
+            assert data is None
+            continue
+        assert set(data) == set(full_data) & set(ProjectIndex.KEYS)
+        assert data.get("stories") == full_data.get("stories")
+        assert data.get("rules") == full_data.get("rules")
+        assert data.get("nlu") == [
+            item for item in full_data.get("nlu", []) if not set(item) & set(YamlReader.SKIPPED_NLU_KEYS)
+        ] or "nlu" not in full_data
+        for element in ProjectIndex.DOMAIN_ELEMENTS:
+            assert get_names(data.get(element)) == get_names(full_data.get(element))
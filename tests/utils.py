@@ -1,14 +1,44 @@
+import copy
 import glob
 import json
 import os.path
 import shutil
+import time
 
 import responses
 
+from rasa_model_report.backends.nlu_backend import NluBackend
 
 MOCK_PAYLOADS = json.load(open("tests/mocks/mock_payloads.json"))
 
 
+class FakeNluBackend(NluBackend):
+    name = "Fake backend"
+
+    def __init__(self, available=True, batch_size=None, delay=0):
+        super().__init__(batch_size)
+        self.available = available
+        self.delay = delay
+        self.parsed = []
+        self.batches = []
+
+    def is_available(self):
+        return self.available
+
+    def get_model_fingerprint(self):
+        return "fake-model"
+
+    def parse(self, text):
+        self.parsed.append(text)
+        time.sleep(self.delay)
+        self.latency.record(0, 0.01, text)
+        return dict(copy.deepcopy(MOCK_PAYLOADS["default"][2]["json"]), text=text)
+
+    def parse_batch(self, texts):
+        self.batches.append(texts)
+        return super().parse_batch(texts)
+
+
 def create_dir(dir_name):
     if not os.path.isdir(dir_name):
         os.mkdir(dir_name)
@@ -23,6 +53,13 @@ def remove_generated_files(rasa_path):
     files_to_find = (
         f"{rasa_path}/results/overview.json",
         f"{rasa_path}/results/e2e_coverage_report.txt",
+        f"{rasa_path}/results/nlu_cache.json",
+        f"{rasa_path}/results/nlu_incremental*.jsonl",
+        f"{rasa_path}/results/nlu_predictions*.jsonl",
+        f"{rasa_path}/results/load_test.json",
+        f"{rasa_path}/results/yaml_cache.bin",
+        "tests/load_test_report.md",
+        "load_test_report.md",
         "tests/model_report.md",
         "model_report.md",
         "test.csv",